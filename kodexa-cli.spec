@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    hiddenimports=['kodexa', 'kodexa.platform.client', 'kodexa.platform.manifest', 'kodexa.model', 'kodexa_cli.platform', 'better_exceptions'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
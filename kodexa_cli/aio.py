@@ -0,0 +1,299 @@
+"""
+An asyncio engine for running bulk operations against the Kodexa platform.
+
+The kodexa client makes a blocking ``requests`` call, on a new connection, for every operation, so the thread
+engine in :mod:`kodexa_cli.bulk` gets its concurrency from threads.  Past a few dozen threads the GIL and the
+connection set-up dominate.  This engine sends its requests with an ``httpx.AsyncClient`` instead, whose pool
+keeps connections alive (multiplexing requests over HTTP/2 where the platform offers it), so hundreds of
+requests can be in flight from a single thread.  The client takes its proxy from the environment, as
+``requests`` does, and times out with the retry policy's timeout.  Uploads and downloads are streamed in
+chunks, never held in memory.
+"""
+import asyncio
+import hashlib
+import os
+import time
+from collections.abc import Sequence
+from typing import Any, Awaitable, BinaryIO, Callable, Iterable, Optional
+
+import httpx
+
+from kodexa_cli.bulk import BulkSummary
+from kodexa_cli.metrics import current_worker
+from kodexa_cli.retry import IDEMPOTENT_METHODS, RetryPolicy, get_policy, raise_for_retry_after
+
+DEFAULT_CONCURRENCY = 50
+DEFAULT_KEEPALIVE_SECONDS = 30.0
+CHUNK_SIZE = 1024 * 1024
+
+# The messages kodexa's process_response raises for each status, so errors read (and retry) the same on both engines
+ERROR_MESSAGES = {
+    301: "Redirected",
+    302: "Redirected",
+    400: "Bad request",
+    401: "Unauthorized",
+    403: "Forbidden",
+    404: "Not found",
+    405: "Method not allowed",
+    409: "Conflict",
+    422: "Unprocessable entity",
+    429: "Too Many Requests",
+    500: "Internal server error",
+    502: "Bad gateway",
+    503: "Service unavailable",
+    504: "Gateway timeout",
+}
+
+
+class ResponseError(Exception):
+    """An error response, carrying its status code so it can be classified without parsing the message."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def check_response(response: httpx.Response) -> httpx.Response:
+    """Raise an exception for an error response, as kodexa's process_response does."""
+    if response.status_code < 300:
+        return response
+    raise_for_retry_after(response.status_code, response.headers, response.text)
+    message = ERROR_MESSAGES.get(response.status_code, f"Request failed with status {response.status_code}")
+    raise ResponseError(f"{message} ({response.text})", response.status_code)
+
+
+class _HashingReader:
+    """Reads a file for an upload, hashing what is read.
+
+    httpx seeks the file back to the start each time the upload is sent, which starts the hash over, so a resent
+    upload is hashed once.
+    """
+
+    def __init__(self, f: BinaryIO):
+        self.f = f
+        self.digest = hashlib.sha256()
+
+    def fileno(self) -> int:
+        return self.f.fileno()
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.f.read(size)
+        self.digest.update(chunk)
+        return chunk
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if (offset, whence) == (0, os.SEEK_SET):
+            self.digest = hashlib.sha256()
+        return self.f.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.f.tell()
+
+
+class AsyncPlatformClient:
+    """Makes authenticated requests to the platform over a connection pool, retrying transient failures."""
+
+    def __init__(self, url: str, access_token: str, max_connections: int = DEFAULT_CONCURRENCY,
+                 keepalive: float = DEFAULT_KEEPALIVE_SECONDS, policy: Optional[RetryPolicy] = None):
+        """
+        Args:
+            url (str): The URL of the platform
+            access_token (str): The access token
+            max_connections (int): The most connections open at once
+            keepalive (float): How long, in seconds, an idle connection is kept for reuse
+            policy (Optional[RetryPolicy]): How to time out and retry requests (defaults to the CLI's policy)
+        """
+        self.policy = policy if policy is not None else get_policy()
+        self.client = httpx.AsyncClient(
+            base_url=url.rstrip("/") + "/",
+            http2=True,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections,
+                                keepalive_expiry=keepalive),
+            timeout=httpx.Timeout(self.policy.timeout),
+            follow_redirects=True,
+            headers={
+                "x-access-token": access_token,
+                "cf-access-token": os.environ.get("CF_TOKEN", ""),
+                "X-Requested-With": "XMLHttpRequest",
+            },
+        )
+
+    async def request(self, method: str, path: str, params: Optional[dict] = None, **kwargs) -> httpx.Response:
+        """Send a request, retrying transient failures and raising kodexa's exceptions for error responses.
+
+        Args:
+            method (str): The HTTP method
+            path (str): The path, relative to the platform URL
+            params (Optional[dict]): Query parameters
+            **kwargs: Passed on to ``httpx.AsyncClient.request``, such as ``json`` or ``files``
+
+        Returns:
+            httpx.Response: The response
+        """
+        async def send() -> httpx.Response:
+            return check_response(await self.client.request(method, path.lstrip("/"), params=params, **kwargs))
+
+        return await self.policy.call_async(send, idempotent=method in IDEMPOTENT_METHODS)
+
+    async def get(self, path: str, params: Optional[dict] = None) -> httpx.Response:
+        return await self.request("GET", path, params)
+
+    async def put(self, path: str, params: Optional[dict] = None, body: Optional[Any] = None) -> httpx.Response:
+        return await self.request("PUT", path, params, json=body)
+
+    async def delete(self, path: str, params: Optional[dict] = None) -> httpx.Response:
+        return await self.request("DELETE", path, params)
+
+    async def download(self, path: str, destination: str, params: Optional[dict] = None) -> int:
+        """Stream content from the platform into a file.
+
+        The content is written to a ``.part`` file that replaces the destination once it is complete, so a failed
+        download never leaves a truncated file behind.
+
+        Args:
+            path (str): The path of the content, relative to the platform URL
+            destination (str): The file to write
+            params (Optional[dict]): Query parameters
+
+        Returns:
+            int: The number of bytes written
+        """
+        partial = destination + ".part"
+
+        async def send() -> int:
+            written = 0
+            async with self.client.stream("GET", path.lstrip("/"), params=params) as response:
+                if response.status_code >= 300:
+                    await response.aread()
+                    check_response(response)
+                with open(partial, "wb") as f:
+                    async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                        await asyncio.to_thread(f.write, chunk)
+                        written += len(chunk)
+            return written
+
+        try:
+            written = await self.policy.call_async(send)
+            os.replace(partial, destination)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        return written
+
+    async def post_file(self, path: str, params: Optional[dict], fields: dict[str, str], name: str,
+                        file_path: str, filename: Optional[str] = None) -> tuple[httpx.Response, str]:
+        """Post a file as a multipart form, as the kodexa client does when uploading, streaming it from disk.
+
+        Args:
+            path (str): The path, relative to the platform URL
+            params (Optional[dict]): Query parameters
+            fields (dict[str, str]): The form fields
+            name (str): The name of the file's form field
+            file_path (str): The file to upload
+            filename (Optional[str]): The file name sent with it (defaults to the file's own)
+
+        Returns:
+            tuple[httpx.Response, str]: The response, and the SHA-256 of the file as it was sent
+        """
+        with open(file_path, "rb") as f:
+            reader = _HashingReader(f)
+            response = await self.request(
+                "POST", path, params, data=fields,
+                files={name: (filename or os.path.basename(file_path), reader, "application/octet-stream")},
+            )
+        return response, reader.digest.hexdigest()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+_END = object()
+
+
+async def _run_async_bulk(summary: BulkSummary, items: Iterable[Any], action: Callable[[Any], Awaitable[Any]],
+                          describe: Callable[[Any], str], concurrency: int, policy: RetryPolicy,
+                          on_error: Optional[Callable[[Any, BaseException], None]],
+                          on_complete: Optional[Callable[[], Awaitable[None]]],
+                          on_done: Optional[Callable[[Any], None]]) -> None:
+    loop = asyncio.get_running_loop()
+    iterator = iter(items)
+    in_memory = isinstance(items, Sequence)
+
+    # Every action runs on the event loop's thread, so each is given one of ``concurrency`` slots to name its worker
+    free_slots = list(range(concurrency, 0, -1))
+
+    async def run_in_slot(item, slot: int):
+        current_worker.set(f"async-{slot}")
+        return await policy.call_async(lambda: action(item))
+
+    def record(item, slot: int, task: asyncio.Task):
+        free_slots.append(slot)
+        if on_done is not None:
+            on_done(item)
+        error = task.exception()
+        if error is None:
+            summary.succeeded += 1
+            return
+        summary.failed += 1
+        summary.errors.append({"id": describe(item), "error": str(error)})
+        if on_error is not None:
+            on_error(item, error)
+
+    in_flight: dict[asyncio.Task, tuple[Any, int]] = {}
+    try:
+        while True:
+            if len(in_flight) >= concurrency:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    record(*in_flight.pop(task), task)
+            # Streams (generators over pages) block while a page is fetched, so pull them from a worker thread
+            item = next(iterator, _END) if in_memory else await loop.run_in_executor(None, next, iterator, _END)
+            if item is _END:
+                break
+            slot = free_slots.pop()
+            in_flight[asyncio.create_task(run_in_slot(item, slot))] = item, slot
+
+        if in_flight:
+            done, _ = await asyncio.wait(in_flight)
+            for task in done:
+                record(*in_flight[task], task)
+    finally:
+        if on_complete is not None:
+            await on_complete()
+
+
+def run_async_bulk(operation: str, items: Iterable[Any], action: Callable[[Any], Awaitable[Any]],
+                   describe: Callable[[Any], str], concurrency: int = DEFAULT_CONCURRENCY,
+                   retries: Optional[int] = None, on_error: Optional[Callable[[Any, BaseException], None]] = None,
+                   summary: Optional[BulkSummary] = None,
+                   on_complete: Optional[Callable[[], Awaitable[None]]] = None,
+                   on_done: Optional[Callable[[Any], None]] = None) -> BulkSummary:
+    """Apply an async action to every item on an event loop, the asyncio counterpart of ``run_bulk``.
+
+    Args:
+        operation (str): The name of the operation, used in the summary
+        items (Iterable[Any]): The items to process, pulled only as slots free up
+        action (Callable[[Any], Awaitable[Any]]): Applied to each item
+        describe (Callable[[Any], str]): Describes an item in messages and the summary (typically its id)
+        concurrency (int): The most actions in flight at once
+        retries (Optional[int]): How many times a transient failure of an action is retried (defaults to the retry
+            policy's; pass 0 when the action's requests retry themselves)
+        on_error (Optional[Callable[[Any, BaseException], None]]): Called with each item that ultimately failed
+        summary (Optional[BulkSummary]): The summary to record into, if the action tracks its own operations
+        on_complete (Optional[Callable[[], Awaitable[None]]]): Awaited once all the actions are done, typically
+            to close the client's connections
+        on_done (Optional[Callable[[Any], None]]): Called with each item once it has succeeded or finally failed
+
+    Returns:
+        BulkSummary: The number of items that succeeded and failed, and the errors
+    """
+    summary = summary if summary is not None else BulkSummary(operation)
+    policy = get_policy()
+    if retries is not None:
+        policy = RetryPolicy(retries, policy.backoff, policy.max_wait, policy.timeout)
+    start = time.monotonic()
+    asyncio.run(_run_async_bulk(summary, items, action, describe, max(1, concurrency), policy, on_error,
+                                on_complete, on_done))
+    summary.elapsed = time.monotonic() - start
+    return summary
@@ -0,0 +1,275 @@
+"""
+A streaming zip writer whose output depends only on its inputs.
+
+``zipfile`` stamps each member with its file's modification time and the host's attributes, and deflates each
+member on the calling thread.  This writer instead gives every member a fixed timestamp (``SOURCE_DATE_EPOCH``
+if it is set, else 1980-01-01) and normalized permissions, so the same files added in the same order produce a
+byte-identical zip on any machine.  Files are streamed in blocks, never read whole, and each file is either
+stored or deflated depending on its type (there is no point deflating a file that is already compressed).
+
+Deflated members are compressed as a series of fixed-size blocks, each primed with the end of the block
+before it (as pigz does), so the blocks of a large file can be compressed on several threads at once.  The
+block boundaries don't depend on the number of threads, so neither does the output.
+"""
+import os
+import stat
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+STORED = 0
+DEFLATED = 8
+
+BLOCK_SIZE = 1024 * 1024
+DEFAULT_COMPRESSION_LEVEL = 6
+
+# Files that are already compressed, which are stored as they are
+DEFAULT_STORED_SUFFIXES = (
+    ".7z", ".bz2", ".gz", ".jar", ".jpeg", ".jpg", ".gif", ".mp3", ".mp4", ".npz", ".png", ".pt", ".pth",
+    ".tgz", ".webp", ".whl", ".xz", ".zip", ".zst",
+)
+
+_DICTIONARY_SIZE = 32 * 1024
+_ZIP64_LIMIT = 0xFFFFFFFF
+_ZIP_FILE_HEADER = struct.Struct("<4s2B4HL2L2H")
+_CENTRAL_DIRECTORY_HEADER = struct.Struct("<4s4B4HL2L5H2L")
+_END_OF_CENTRAL_DIRECTORY = struct.Struct("<4s4H2LH")
+_ZIP64_END_OF_CENTRAL_DIRECTORY = struct.Struct("<4sQ2H2L4Q")
+_ZIP64_END_OF_CENTRAL_DIRECTORY_LOCATOR = struct.Struct("<4sLQL")
+_UTF8_FLAG = 0x800
+_UNIX = 3
+
+
+def dos_timestamp(epoch: Optional[float] = None) -> tuple[int, int]:
+    """The DOS date and time every member is stamped with.
+
+    Args:
+        epoch (Optional[float]): Seconds since the epoch (defaults to ``SOURCE_DATE_EPOCH``, or 1980-01-01)
+
+    Returns:
+        tuple[int, int]: The DOS date and time
+    """
+    if epoch is None:
+        epoch = float(os.environ.get("SOURCE_DATE_EPOCH", 0))
+    year, month, day, hour, minute, second = time.gmtime(epoch)[:6]
+    if year < 1980:
+        return (1 << 5) | 1, 0
+    return ((min(year, 2107) - 1980) << 9) | (month << 5) | day, (hour << 11) | (minute << 5) | (second // 2)
+
+
+class CompressionPolicy:
+    """Chooses whether each file is stored or deflated, and at what level."""
+
+    def __init__(self, level: int = DEFAULT_COMPRESSION_LEVEL,
+                 stored_suffixes: Iterable[str] = DEFAULT_STORED_SUFFIXES):
+        """
+        Args:
+            level (int): The deflate level, from 1 (fastest) to 9 (smallest), or 0 to store every file
+            stored_suffixes (Iterable[str]): The suffixes of files that are stored rather than deflated
+        """
+        self.level = level
+        self.stored_suffixes = tuple(sorted(suffix.lower() for suffix in stored_suffixes))
+
+    def compression_for(self, name: str) -> int:
+        if self.level == 0 or name.lower().endswith(self.stored_suffixes):
+            return STORED
+        return DEFLATED
+
+    def key(self) -> str:
+        """Identifies the policy, so artifacts built with different policies aren't mistaken for each other."""
+        return f"level={self.level};stored={','.join(self.stored_suffixes)}"
+
+
+def _deflate_block(block: bytes, dictionary: bytes, level: int, last: bool) -> bytes:
+    if dictionary:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def _blocks(f: BinaryIO, block_size: int) -> Iterator[tuple[bytes, bytes, bool]]:
+    """Read a file in blocks, yielding each with the end of the block before it and whether it is the last."""
+    dictionary = b""
+    block = f.read(block_size)
+    while True:
+        following = f.read(block_size)
+        yield block, dictionary, not following
+        if not following:
+            return
+        dictionary = block[-_DICTIONARY_SIZE:]
+        block = following
+
+
+class ReproducibleZipWriter:
+    """Writes a zip to a seekable binary file, one member at a time."""
+
+    def __init__(self, fp: BinaryIO, policy: Optional[CompressionPolicy] = None, threads: int = 1,
+                 block_size: int = BLOCK_SIZE):
+        """
+        Args:
+            fp (BinaryIO): The file to write to, opened for writing in binary mode
+            policy (Optional[CompressionPolicy]): How each file is compressed (defaults to deflating at level 6,
+                storing files that are already compressed)
+            threads (int): The number of threads compressing the blocks of large files
+            block_size (int): The size of the blocks files are read and compressed in
+        """
+        self.fp = fp
+        self.policy = policy if policy is not None else CompressionPolicy()
+        self.threads = threads
+        self.block_size = block_size
+        self.date, self.time = dos_timestamp()
+        self.entries: list[tuple[bytes, int, int, int, int, int, int]] = []
+        self.executor = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+
+    def __enter__(self) -> "ReproducibleZipWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        elif self.executor is not None:
+            self.executor.shutdown()
+
+    def add_file(self, path: str, name: str) -> None:
+        """Add a file as a member of the zip.
+
+        Args:
+            path (str): The file to add
+            name (str): The name of the member
+        """
+        size = os.path.getsize(path)
+        mode = 0o755 if os.stat(path).st_mode & stat.S_IXUSR else 0o644
+        compression = self.policy.compression_for(name)
+        encoded_name = name.encode("utf-8")
+        # Deflate can grow incompressible data slightly, so leave room before the sizes no longer fit
+        zip64 = size + size // 100 + 1024 >= _ZIP64_LIMIT
+        offset = self.fp.tell()
+
+        self._write_local_header(encoded_name, compression, 0, 0, 0, zip64)
+        with open(path, "rb") as f:
+            crc, compressed_size = self._write_data(f, compression)
+        end = self.fp.tell()
+        if not zip64 and compressed_size >= _ZIP64_LIMIT:
+            raise Exception(f"{name} compressed to more than 4GB and can't be stored")
+
+        # Go back and fill in the CRC and sizes, now they are known
+        self.fp.seek(offset)
+        self._write_local_header(encoded_name, compression, crc, compressed_size, size, zip64)
+        self.fp.seek(end)
+        self.entries.append((encoded_name, compression, crc, compressed_size, size, offset, mode))
+
+    def _compressed_blocks(self, f: BinaryIO, compression: int) -> Iterator[tuple[bytes, bytes]]:
+        """Yield each block of a file along with the data written for it."""
+        if compression == STORED:
+            for block in iter(lambda: f.read(self.block_size), b""):
+                yield block, block
+            return
+
+        level = self.policy.level
+        if self.executor is None:
+            for block, dictionary, last in _blocks(f, self.block_size):
+                yield block, _deflate_block(block, dictionary, level, last)
+            return
+
+        # Keep a bounded window of blocks compressing ahead of the one being written
+        pending = deque()
+        for block, dictionary, last in _blocks(f, self.block_size):
+            pending.append((block, self.executor.submit(_deflate_block, block, dictionary, level, last)))
+            if len(pending) >= self.threads * 2:
+                block, future = pending.popleft()
+                yield block, future.result()
+        while pending:
+            block, future = pending.popleft()
+            yield block, future.result()
+
+    def _write_data(self, f: BinaryIO, compression: int) -> tuple[int, int]:
+        """Write a file's data, returning its CRC and the number of bytes written."""
+        crc = 0
+        written = 0
+        for block, data in self._compressed_blocks(f, compression):
+            crc = zlib.crc32(block, crc)
+            self.fp.write(data)
+            written += len(data)
+        return crc, written
+
+    def _write_local_header(self, name: bytes, compression: int, crc: int, compressed_size: int, size: int,
+                            zip64: bool) -> None:
+        extra = b""
+        if zip64:
+            extra = struct.pack("<HHQQ", 1, 16, size, compressed_size)
+            compressed_size = size = _ZIP64_LIMIT
+        self.fp.write(_ZIP_FILE_HEADER.pack(
+            b"PK\003\004", 45 if zip64 else 20, 0, _UTF8_FLAG, compression, self.time, self.date, crc,
+            compressed_size, size, len(name), len(extra),
+        ))
+        self.fp.write(name)
+        self.fp.write(extra)
+
+    def close(self) -> None:
+        """Write the central directory, completing the zip."""
+        if self.executor is not None:
+            self.executor.shutdown()
+        start = self.fp.tell()
+        for name, compression, crc, compressed_size, size, offset, mode in self.entries:
+            zip64_fields = []
+            if size >= _ZIP64_LIMIT or compressed_size >= _ZIP64_LIMIT:
+                zip64_fields += [size, compressed_size]
+                size = compressed_size = _ZIP64_LIMIT
+            if offset >= _ZIP64_LIMIT:
+                zip64_fields.append(offset)
+                offset = _ZIP64_LIMIT
+            extra = struct.pack(f"<HH{len(zip64_fields)}Q", 1, 8 * len(zip64_fields), *zip64_fields) \
+                if zip64_fields else b""
+            version = 45 if zip64_fields else 20
+            self.fp.write(_CENTRAL_DIRECTORY_HEADER.pack(
+                b"PK\001\002", version, _UNIX, version, 0, _UTF8_FLAG, compression, self.time, self.date, crc,
+                compressed_size, size, len(name), len(extra), 0, 0, 0, (stat.S_IFREG | mode) << 16, offset,
+            ))
+            self.fp.write(name)
+            self.fp.write(extra)
+        end = self.fp.tell()
+
+        count, directory_size, directory_offset = len(self.entries), end - start, start
+        if count > 0xFFFF or directory_size >= _ZIP64_LIMIT or directory_offset >= _ZIP64_LIMIT:
+            self.fp.write(_ZIP64_END_OF_CENTRAL_DIRECTORY.pack(
+                b"PK\006\006", 44, 45, 45, 0, 0, count, count, directory_size, directory_offset,
+            ))
+            self.fp.write(_ZIP64_END_OF_CENTRAL_DIRECTORY_LOCATOR.pack(b"PK\006\007", 0, end, 1))
+            count = min(count, 0xFFFF)
+            directory_size = min(directory_size, _ZIP64_LIMIT)
+            directory_offset = min(directory_offset, _ZIP64_LIMIT)
+        self.fp.write(_END_OF_CENTRAL_DIRECTORY.pack(
+            b"PK\005\006", 0, 0, count, count, directory_size, directory_offset, 0,
+        ))
+
+
+def write_reproducible_zip(files: Iterable[tuple[str, str]], destination: str,
+                           policy: Optional[CompressionPolicy] = None, threads: int = 1) -> int:
+    """Write files into a zip, in the order given, replacing the destination only once the zip is complete.
+
+    Args:
+        files (Iterable[tuple[str, str]]): The path of each file and its name in the zip
+        destination (str): The path of the zip
+        policy (Optional[CompressionPolicy]): How each file is compressed
+        threads (int): The number of threads compressing the blocks of large files
+
+    Returns:
+        int: The number of files written
+    """
+    partial = destination + ".part"
+    count = 0
+    try:
+        with open(partial, "wb") as fp, ReproducibleZipWriter(fp, policy, threads) as writer:
+            for path, name in files:
+                writer.add_file(path, name)
+                count += 1
+        os.replace(partial, destination)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return count
@@ -0,0 +1,308 @@
+"""
+Reproducible performance measurements of the CLI, against a local stand-in for the platform.
+
+``MockPlatform`` is a small HTTP server emulating the endpoints the bulk commands use (document stores and their
+families, uploads, labels, object lists and component deployment), with a configurable latency added to every
+request and a configurable number of objects behind the paged listings.  Each benchmark scenario runs a real CLI
+command in-process against it, so tuning can be measured before and after without touching a real platform.
+"""
+import contextlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from kodexa_cli.metrics import percentile
+
+SCENARIOS = ("get", "query", "upload", "deploy")
+BENCH_ORG = "bench"
+BENCH_STORE_REF = f"{BENCH_ORG}/documents:1.0.0"
+BENCH_TOKEN = "bench-token"
+
+_STORE_PATH = re.compile(r"^/api/stores/(?P<org>[^/]+)/(?P<slug>[^/]+)/(?P<version>[^/]+)(?P<rest>/.*)?$")
+
+
+def _page(items: list[dict[str, Any]], page: int, page_size: int) -> dict[str, Any]:
+    total_pages = (len(items) + page_size - 1) // page_size
+    content = items[(page - 1) * page_size:page * page_size]
+    return {
+        "content": content,
+        "number": page - 1,
+        "size": page_size,
+        "numberOfElements": len(content),
+        "totalPages": total_pages,
+        "totalElements": len(items),
+        "first": page == 1,
+        "last": page >= total_pages,
+        "empty": not content,
+    }
+
+
+class MockPlatform:
+    """A local HTTP server standing in for the platform, for benchmarks and tests.
+
+    It speaks HTTP/1.1 with keep-alive (as the platform does), handles each request on its own thread after
+    sleeping for ``latency`` seconds, and records the time it spent on each request.
+    """
+
+    def __init__(self, latency: float = 0.0, families: int = 1000, objects: int = 1000):
+        """
+        Args:
+            latency (float): Seconds added to every request
+            families (int): The number of document families in the bench store
+            objects (int): The number of objects (projects) in the object list
+        """
+        self.latency = latency
+        self.families = [
+            {
+                "id": f"family-{i}",
+                "path": f"documents/doc-{i}.pdf",
+                "storeRef": BENCH_STORE_REF,
+                "contentObjects": [{"id": f"content-{i}", "contentType": "NATIVE"}],
+            }
+            for i in range(families)
+        ]
+        self.objects = [{"id": f"project-{i}", "name": f"Project {i}"} for i in range(objects)]
+        self.components: dict[str, dict[str, Any]] = {}
+        self.uploads = 0
+        self.labels = 0
+        self.lock = threading.Lock()
+        self.latencies: list[float] = []
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self) -> "MockPlatform":
+        platform = self
+
+        class Handler(_MockPlatformHandler):
+            mock = platform
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler, bind_and_activate=False)
+        # The default backlog of 5 drops the bursts of connects a connection pool opens
+        self.server.request_queue_size = 128
+        self.server.daemon_threads = True
+        self.server.server_bind()
+        self.server.server_activate()
+        self.thread = threading.Thread(target=self.server.serve_forever, name="kodexa-mock-platform", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self) -> "MockPlatform":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.latencies = []
+
+    def record(self, latency: float) -> None:
+        with self.lock:
+            self.latencies.append(latency)
+
+    def handle(self, method: str, path: str, query: dict[str, str], body: bytes) -> tuple[int, Any]:
+        """Route a request, returning the status and the JSON response."""
+        if path == "/api/projects" and method == "GET":
+            return 200, _page(self.objects, int(query.get("page", 1)), int(query.get("pageSize", 10)))
+
+        match = _STORE_PATH.match(path)
+        if match is not None:
+            org, slug, version, rest = match.group("org", "slug", "version", "rest")
+            ref = f"{org}/{slug}:{version}"
+            if rest is None:
+                return self._component(method, "store", ref, body)
+            if ref != BENCH_STORE_REF:
+                return 404, {"message": f"No store {ref}"}
+            if rest == "/families" and method == "GET":
+                return 200, _page(self.families, int(query.get("page", 1)), int(query.get("pageSize", 10)))
+            if rest == "/fs" and method == "POST":
+                with self.lock:
+                    self.uploads += 1
+                return 200, {"id": str(uuid.uuid4()), "path": query.get("path", ""), "storeRef": BENCH_STORE_REF}
+            if rest.endswith(("/addLabel", "/removeLabel")) and method == "PUT":
+                with self.lock:
+                    self.labels += 1
+                return 200, {}
+
+        if re.match(r"^/api/stores/[^/]+$", path) and method == "POST":
+            component = json.loads(body)
+            return self._component("CREATE", "store", f"{component['orgSlug']}/{component['slug']}:"
+                                                      f"{component['version']}", body)
+        return 404, {"message": f"No mock for {method} {path}"}
+
+    def _component(self, method: str, component_type: str, ref: str, body: bytes) -> tuple[int, Any]:
+        with self.lock:
+            if method == "GET":
+                if ref == BENCH_STORE_REF:
+                    org, rest = ref.split("/")
+                    slug, version = rest.split(":")
+                    return 200, {"type": component_type, "storeType": "DOCUMENT", "orgSlug": org, "slug": slug,
+                                 "version": version, "name": "Bench documents", "ref": ref}
+                if ref in self.components:
+                    return 200, self.components[ref]
+                return 404, {"message": f"No {component_type} {ref}"}
+            if method in ("CREATE", "PUT"):
+                self.components[ref] = json.loads(body)
+                return 200, self.components[ref]
+        return 405, {"message": "Method not allowed"}
+
+
+class _MockPlatformHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    mock: MockPlatform
+
+    def _respond(self) -> None:
+        start = time.monotonic()
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        if self.mock.latency:
+            time.sleep(self.mock.latency)
+        parts = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        status, payload = self.mock.handle(self.command, parts.path, query, body)
+        content = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+        self.mock.record(time.monotonic() - start)
+
+    do_GET = do_PUT = do_POST = do_DELETE = _respond
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@dataclass
+class BenchResult:
+    """The outcome of one benchmark scenario."""
+
+    scenario: str
+    items: int
+    seconds: float
+    requests: int
+    latencies: list[float] = field(default_factory=list, repr=False)
+    exit_code: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        latencies = sorted(self.latencies)
+        return {
+            "scenario": self.scenario,
+            "items": self.items,
+            "seconds": round(self.seconds, 3),
+            "itemsPerSecond": round(self.items / self.seconds, 1) if self.seconds else 0.0,
+            "requests": self.requests,
+            "requestsPerSecond": round(self.requests / self.seconds, 1) if self.seconds else 0.0,
+            "latencyMs": {
+                "p50": round(percentile(latencies, 0.5) * 1000, 2),
+                "p95": round(percentile(latencies, 0.95) * 1000, 2),
+                "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            },
+            "exitCode": self.exit_code,
+        }
+
+
+def run_command(args: list[str]) -> tuple[int, str]:
+    """Run a CLI command in-process, capturing its output.
+
+    Returns:
+        tuple[int, str]: The exit code and the output
+    """
+    from kodexa_cli.cli import cli
+
+    output = io.StringIO()
+    exit_code = 0
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        try:
+            cli.main(args, prog_name="kodexa", standalone_mode=False)
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else 1
+    return exit_code, output.getvalue()
+
+
+def scenario_command(scenario: str, platform: MockPlatform, workdir: str, page_size: int, threads: int,
+                     files: int, file_size: int, components: int) -> tuple[list[str], int]:
+    """Prepare the inputs of a scenario and build its command line.
+
+    Returns:
+        tuple[list[str], int]: The command line and the number of items it works through
+    """
+    connection = ["--url", platform.url, "--token", BENCH_TOKEN]
+    if scenario == "get":
+        output_file = os.path.join(workdir, "objects.jsonl")
+        return ["get", "projects", *connection, "--stream", "--pageSize", str(page_size),
+                "--output-file", output_file], len(platform.objects)
+    if scenario == "query":
+        return ["query", BENCH_STORE_REF, *connection, "--stream", "--pageSize", str(page_size),
+                "--threads", str(threads), "--add-label", "bench"], len(platform.families)
+    if scenario == "upload":
+        upload_dir = os.path.join(workdir, "upload")
+        os.makedirs(upload_dir, exist_ok=True)
+        content = os.urandom(file_size)
+        for i in range(files):
+            with open(os.path.join(upload_dir, f"file-{i}.bin"), "wb") as f:
+                f.write(content)
+        return ["upload", BENCH_STORE_REF, upload_dir, *connection, "--threads", str(threads),
+                "--no-journal"], files
+    if scenario == "deploy":
+        deploy_dir = os.path.join(workdir, "deploy")
+        os.makedirs(deploy_dir, exist_ok=True)
+        paths = []
+        for i in range(components):
+            path = os.path.join(deploy_dir, f"store-{i}.json")
+            with open(path, "w") as f:
+                json.dump({"type": "store", "storeType": "DOCUMENT", "orgSlug": BENCH_ORG, "slug": f"store-{i}",
+                           "version": "1.0.0", "name": f"Store {i}"}, f)
+            paths.append(path)
+        return ["deploy", *paths, *connection, "--update"], components
+    raise ValueError(f"Unknown scenario {scenario}, choose from {', '.join(SCENARIOS)}")
+
+
+def run_scenario(scenario: str, platform: MockPlatform, page_size: int = 100, threads: int = 5,
+                 files: int = 100, file_size: int = 64 * 1024, components: int = 20) -> BenchResult:
+    """Run one scenario against the mock platform and measure it.
+
+    Args:
+        scenario (str): One of ``SCENARIOS``
+        platform (MockPlatform): The running mock platform
+        page_size (int): The page size the listings are streamed with
+        threads (int): The number of threads the command uses, where it has the option
+        files (int): The number of files uploaded
+        file_size (int): The size in bytes of each uploaded file
+        components (int): The number of components deployed
+
+    Returns:
+        BenchResult: The throughput and latency of the run
+    """
+    with tempfile.TemporaryDirectory(prefix="kodexa-bench-") as workdir:
+        args, items = scenario_command(scenario, platform, workdir, page_size, threads, files, file_size,
+                                       components)
+        platform.reset_stats()
+        start = time.monotonic()
+        exit_code, output = run_command(args)
+        seconds = time.monotonic() - start
+    with platform.lock:
+        latencies = list(platform.latencies)
+    if exit_code != 0:
+        raise Exception(f"The {scenario} benchmark failed (exit code {exit_code}):\n{output[-2000:]}")
+    return BenchResult(scenario, items, seconds, len(latencies), latencies, exit_code)
@@ -0,0 +1,278 @@
+"""
+Support for running an operation against a large number of platform objects concurrently.
+
+Bulk operations run on a bounded worker pool, optionally throttled by a token bucket so we don't overwhelm the
+platform, and retry transient failures with the CLI's retry policy.  Each run produces a summary that can be
+reported to the user or written out as JSON.
+"""
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional
+
+from kodexa_cli.retry import RetryPolicy, get_policy, is_transient_error
+
+
+class TokenBucket:
+    """A thread-safe token bucket limiting how many operations are started per second."""
+
+    def __init__(self, rate: Optional[float], capacity: Optional[float] = None):
+        """
+        Args:
+            rate (Optional[float]): Tokens added per second, or None for no limit
+            capacity (Optional[float]): Largest burst allowed (defaults to one second's worth of tokens)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate or 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then take it."""
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+
+class AdaptiveLimiter:
+    """An AIMD concurrency limit, grown while requests are healthy and cut back when the platform pushes back.
+
+    Every completed request is reported with its latency.  While latency stays within ``tolerance`` times the
+    best latency seen, the limit grows by about one per limit's worth of completions (additive increase).  A
+    throttling, timeout or server error halves it (multiplicative decrease, at most once per round trip so one
+    burst of errors isn't counted many times), and latency beyond the tolerance eases it down gradually.
+    """
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 64, tolerance: float = 2.0,
+                 backoff: float = 0.5):
+        """
+        Args:
+            initial (int): The starting limit
+            min_limit (int): The limit never drops below this
+            max_limit (int): The limit never grows beyond this
+            tolerance (float): How many times the best latency seen still counts as healthy
+            backoff (float): The factor the limit is multiplied by on an error
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.limit = float(max(min_limit, min(initial, max_limit)))
+        self.peak = int(self.limit)
+        self.in_flight = 0
+        self.best_latency: Optional[float] = None
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+
+    @property
+    def current(self) -> int:
+        return int(self.limit)
+
+    def acquire(self) -> None:
+        """Block until there is room under the limit, then take a slot."""
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self) -> None:
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def observe(self, latency: float, error: Optional[BaseException] = None) -> None:
+        """Adjust the limit for a completed request.
+
+        Args:
+            latency (float): How long the request took, in seconds
+            error (Optional[BaseException]): The error it failed with, if any
+        """
+        with self.condition:
+            now = time.monotonic()
+            if error is not None:
+                if not is_transient_error(error):
+                    return
+                if now - self.last_decrease >= (self.best_latency or latency):
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self.last_decrease = now
+            else:
+                self.best_latency = latency if self.best_latency is None else min(self.best_latency, latency)
+                if latency <= self.best_latency * self.tolerance:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                else:
+                    self.limit = max(self.min_limit, self.limit * 0.95)
+            self.peak = max(self.peak, int(self.limit))
+            self.condition.notify_all()
+
+
+def call_with_retry(operation: Callable[[], Any], retries: Optional[int] = None, backoff: Optional[float] = None,
+                    max_backoff: Optional[float] = None, idempotent: bool = True) -> Any:
+    """Call an operation, retrying transient errors with the CLI's retry policy.
+
+    Args:
+        operation (Callable[[], Any]): The operation to call
+        retries (Optional[int]): How many times to retry after the first attempt (defaults to the policy's)
+        backoff (Optional[float]): Base delay in seconds, doubled on each retry (defaults to the policy's)
+        max_backoff (Optional[float]): Upper bound on any single delay (defaults to the policy's)
+        idempotent (bool): Whether the operation can safely be repeated even if the platform acted on it
+
+    Returns:
+        Any: Whatever the operation returns
+    """
+    policy = get_policy()
+    return RetryPolicy(
+        retries=policy.retries if retries is None else retries,
+        backoff=policy.backoff if backoff is None else backoff,
+        max_wait=policy.max_wait if max_backoff is None else max_backoff,
+        timeout=policy.timeout,
+    ).call(operation, idempotent)
+
+
+@dataclass
+class BulkSummary:
+    """The outcome of a bulk operation."""
+
+    operation: str
+    succeeded: int = 0
+    failed: int = 0
+    errors: list[dict[str, str]] = field(default_factory=list)
+    elapsed: float = 0.0
+    operations: dict[str, dict[str, int]] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[None]:
+        """Count the enclosed step of an action as a success or failure of the named operation.
+
+        Actions that do several things to each item (download, then label, say) use this so the summary shows
+        how each of them fared; it is safe to use from the worker threads.
+        """
+        try:
+            yield
+        except Exception:
+            self.count_operation(name, "failed")
+            raise
+        self.count_operation(name, "succeeded")
+
+    def count_operation(self, name: str, outcome: str, count: int = 1) -> None:
+        """Count items as succeeded or failed for the named operation, for steps done outside the action."""
+        with self.lock:
+            counts = self.operations.setdefault(name, {"succeeded": 0, "failed": 0})
+            counts[outcome] += count
+
+    @property
+    def operations_failed(self) -> int:
+        with self.lock:
+            return sum(counts["failed"] for counts in self.operations.values())
+
+    def to_dict(self) -> dict[str, Any]:
+        summary = {
+            "operation": self.operation,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "errors": self.errors,
+            "elapsedSeconds": round(self.elapsed, 3),
+        }
+        if self.operations:
+            summary["operations"] = self.operations
+        return summary
+
+
+def run_bulk(operation: str, items: Iterable[Any], action: Callable[[Any], Any], describe: Callable[[Any], str],
+             threads: int = 5, max_rps: Optional[float] = None, retries: Optional[int] = None,
+             on_error: Optional[Callable[[Any, BaseException], None]] = None, max_in_flight: Optional[int] = None,
+             summary: Optional[BulkSummary] = None, on_done: Optional[Callable[[Any], None]] = None,
+             limiter: Optional[AdaptiveLimiter] = None, idempotent: bool = True) -> BulkSummary:
+    """Apply an action to every item on a bounded worker pool.
+
+    Items are pulled from the iterable only as workers free up, so streams of any size can be processed without
+    being materialized.
+
+    Args:
+        operation (str): The name of the operation, used in the summary
+        items (Iterable[Any]): The items to process
+        action (Callable[[Any], Any]): Applied to each item
+        describe (Callable[[Any], str]): Describes an item in messages and the summary (typically its id)
+        threads (int): The number of workers
+        max_rps (Optional[float]): The maximum number of actions started per second, or None for no limit
+        retries (Optional[int]): How many times a transient failure is retried (defaults to the retry policy's; pass
+            0 when the action's requests retry themselves)
+        on_error (Optional[Callable[[Any, BaseException], None]]): Called with each item that ultimately failed
+        max_in_flight (Optional[int]): The most items submitted but not yet finished (defaults to twice the threads)
+        summary (Optional[BulkSummary]): The summary to record into, if the action tracks its own operations
+        on_done (Optional[Callable[[Any], None]]): Called with each item once it has succeeded or finally failed
+        limiter (Optional[AdaptiveLimiter]): Adapt the number of actions in flight rather than using ``threads``
+        idempotent (bool): Whether the action can safely be repeated even if the platform acted on it
+
+    Returns:
+        BulkSummary: The number of items that succeeded and failed, and the errors
+    """
+    summary = summary if summary is not None else BulkSummary(operation)
+    max_in_flight = max(threads, max_in_flight or threads * 2)
+    bucket = TokenBucket(max_rps)
+    start = time.monotonic()
+
+    def process(item):
+        def attempt():
+            bucket.acquire()
+            if limiter is None:
+                return action(item)
+            attempt_start = time.monotonic()
+            try:
+                result = action(item)
+            except Exception as e:
+                limiter.observe(time.monotonic() - attempt_start, e)
+                raise
+            limiter.observe(time.monotonic() - attempt_start)
+            return result
+
+        try:
+            call_with_retry(attempt, retries, idempotent=idempotent)
+        finally:
+            if limiter is not None:
+                limiter.release()
+
+    def record(item, future: Future):
+        # Results are only ever recorded on the calling thread
+        if on_done is not None:
+            on_done(item)
+        error = future.exception()
+        if error is None:
+            summary.succeeded += 1
+            return
+        summary.failed += 1
+        summary.errors.append({"id": describe(item), "error": str(error)})
+        if on_error is not None:
+            on_error(item, error)
+
+    with ThreadPoolExecutor(max_workers=limiter.max_limit if limiter is not None else threads) as executor:
+        in_flight: dict[Future, Any] = {}
+        for item in items:
+            if limiter is not None:
+                limiter.acquire()
+                for future in [future for future in in_flight if future.done()]:
+                    record(in_flight.pop(future), future)
+            elif len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(in_flight.pop(future), future)
+            in_flight[executor.submit(process, item)] = item
+
+        for future in wait(in_flight).done:
+            record(in_flight[future], future)
+
+    summary.elapsed = time.monotonic() - start
+    return summary
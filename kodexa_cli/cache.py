@@ -0,0 +1,185 @@
+"""
+A persistent, size-bounded cache of platform objects fetched by the CLI.
+
+Entries are keyed by the platform URL, the object type and the ref, and hold the serialized object along with
+any ``ETag``/``Last-Modified`` validators the platform returned so stale entries can be revalidated with a
+conditional request rather than downloaded again.  The cache is kept under a size limit (50MB unless
+``--cache-max-mb`` or the profile's ``cache_max_mb`` setting says otherwise) by evicting the least recently
+used entries.
+"""
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from kodexa_cli.profiles import get_config_path
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+
+def get_cache_path() -> str:
+    """
+    :return: the path of the object cache, which lives next to the profile configuration
+    """
+    return os.path.join(os.path.dirname(get_config_path()), "cache", "objects.db")
+
+
+@dataclass
+class CacheEntry:
+    """An object held in the cache, along with the validators needed to revalidate it."""
+
+    data: Any
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def is_fresh(self, ttl: int) -> bool:
+        return time.time() - self.fetched_at < ttl
+
+    def validator_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ObjectCache:
+    """An on-disk LRU cache of platform objects, backed by SQLite so concurrent CLI runs can share it."""
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path if path is not None else get_cache_path()
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.connection = sqlite3.connect(self.path, timeout=10)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS objects ("
+                "url TEXT, object_type TEXT, ref TEXT, data TEXT, etag TEXT, last_modified TEXT, "
+                "fetched_at REAL, last_access REAL, size INTEGER, PRIMARY KEY (url, object_type, ref))"
+            )
+            self.connection.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def _count(self, name: str) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO stats (name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+                (name,),
+            )
+
+    def get(self, url: str, object_type: str, ref: str) -> Optional[CacheEntry]:
+        """Look up an entry, marking it as recently used.
+
+        Returns:
+            Optional[CacheEntry]: The entry, or None if nothing is cached for the key
+        """
+        row = self.connection.execute(
+            "SELECT data, etag, last_modified, fetched_at FROM objects WHERE url = ? AND object_type = ? AND ref = ?",
+            (url, object_type, ref),
+        ).fetchone()
+        if row is None:
+            return None
+        with self.connection:
+            self.connection.execute(
+                "UPDATE objects SET last_access = ? WHERE url = ? AND object_type = ? AND ref = ?",
+                (time.time(), url, object_type, ref),
+            )
+        return CacheEntry(json.loads(row[0]), row[1], row[2], row[3])
+
+    def put(self, url: str, object_type: str, ref: str, data: Any, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> None:
+        """Store an object, evicting the least recently used entries if the cache is over its size limit."""
+        serialized = json.dumps(data)
+        now = time.time()
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, object_type, ref, serialized, etag, last_modified, now, now, len(serialized)),
+            )
+        self._evict()
+
+    def touch(self, url: str, object_type: str, ref: str) -> None:
+        """Restart the TTL of an entry the platform has confirmed is unchanged."""
+        with self.connection:
+            self.connection.execute(
+                "UPDATE objects SET fetched_at = ? WHERE url = ? AND object_type = ? AND ref = ?",
+                (time.time(), url, object_type, ref),
+            )
+
+    def _evict(self) -> None:
+        total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        with self.connection:
+            for url, object_type, ref, size in self.connection.execute(
+                    "SELECT url, object_type, ref, size FROM objects ORDER BY last_access"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                self.connection.execute(
+                    "DELETE FROM objects WHERE url = ? AND object_type = ? AND ref = ?", (url, object_type, ref)
+                )
+                total -= size
+                self.connection.execute(
+                    "INSERT INTO stats (name, value) VALUES ('evictions', 1) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + 1"
+                )
+
+    def fetch(self, url: str, object_type: str, ref: str, load, ttl: int = DEFAULT_TTL_SECONDS) -> Any:
+        """Return the cached object if it is fresh, otherwise load (or revalidate) it.
+
+        Args:
+            url (str): The platform URL the object belongs to
+            object_type (str): The object type
+            ref (str): The object reference
+            load: Called with the conditional request headers; returns ``(data, etag, last_modified)``,
+                or None if the platform answered 304 Not Modified
+            ttl (int): How long, in seconds, an entry is served without asking the platform
+
+        Returns:
+            Any: The object data
+        """
+        entry = self.get(url, object_type, ref)
+        if entry is not None and entry.is_fresh(ttl):
+            self._count("hits")
+            return entry.data
+
+        result = load(entry.validator_headers() if entry is not None else {})
+        if result is None and entry is not None:
+            self._count("revalidations")
+            self.touch(url, object_type, ref)
+            return entry.data
+
+        self._count("misses")
+        data, etag, last_modified = result
+        self.put(url, object_type, ref, data, etag, last_modified)
+        return data
+
+    def stats(self) -> dict[str, Any]:
+        entries, size = self.connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects").fetchone()
+        counters = dict(self.connection.execute("SELECT name, value FROM stats").fetchall())
+        hits = counters.get("hits", 0) + counters.get("revalidations", 0)
+        lookups = hits + counters.get("misses", 0)
+        return {
+            "path": self.path,
+            "entries": entries,
+            "size": size,
+            "max_size": self.max_bytes,
+            "hits": counters.get("hits", 0),
+            "revalidations": counters.get("revalidations", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        with self.connection:
+            self.connection.execute("DELETE FROM objects")
+            self.connection.execute("DELETE FROM stats")
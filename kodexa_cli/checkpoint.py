@@ -0,0 +1,112 @@
+"""
+Durable progress tracking for long running bulk operations, so they can be resumed after a failure.
+
+A checkpoint is an append-only JSON lines file.  The first line describes the run (the store, the query and the
+offset it started at) and every following line records one completed item as ``{"position": n, "id": "..."}``.
+Completed items are buffered and written in batches, each batch fsync'd, so recording progress doesn't become
+the bottleneck of the operation it is tracking.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any
+
+DEFAULT_FLUSH_EVERY = 100
+DEFAULT_FLUSH_INTERVAL_SECONDS = 5.0
+
+
+class Checkpoint:
+    """Records the positions and ids of completed items, and reloads them on resume."""
+
+    def __init__(self, path: str, run: dict[str, Any], resume: bool = False, flush_every: int = DEFAULT_FLUSH_EVERY,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL_SECONDS):
+        """
+        Args:
+            path (str): The checkpoint file
+            run (dict[str, Any]): Describes the run; a resumed checkpoint must have been written by the same run
+            resume (bool): Load the progress already recorded in the file rather than starting again
+            flush_every (int): Write buffered records once this many have built up
+            flush_interval (float): Write buffered records at least this often, in seconds
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.completed_ids: set[str] = set()
+        self.completed_positions: set[int] = set()
+        self.buffer: list[dict[str, Any]] = []
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+
+        if resume and os.path.exists(path):
+            self.run = self._load(run)
+            self.file = open(path, "a")
+        else:
+            self.run = run
+            self.file = open(path, "w")
+            self.file.write(json.dumps({"run": run}) + "\n")
+            self._sync()
+
+    def _load(self, run: dict[str, Any]) -> dict[str, Any]:
+        with open(self.path) as f:
+            lines = f.readlines()
+        if not lines:
+            raise Exception(f"Checkpoint {self.path} is empty")
+        recorded_run = json.loads(lines[0])["run"]
+        for key in ("ref", "query"):
+            if recorded_run.get(key) != run.get(key):
+                raise Exception(
+                    f"Checkpoint {self.path} was written for {key} {recorded_run.get(key)!r}, not {run.get(key)!r}"
+                )
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn final line from a crash mid-write, the item will simply be processed again
+                continue
+            self.completed_ids.add(record["id"])
+            self.completed_positions.add(record["position"])
+        return recorded_run
+
+    def is_completed(self, family_id: str) -> bool:
+        return family_id in self.completed_ids
+
+    def resume_offset(self) -> int:
+        """
+        :return: the offset up to which every position has been completed, i.e. where a resumed stream can start
+        """
+        offset = self.run.get("startingOffset") or 0
+        while offset + 1 in self.completed_positions:
+            offset += 1
+        return offset
+
+    def record(self, position: int, family_id: str) -> None:
+        """Record an item as completed; it is written to disk with the next batch."""
+        with self.lock:
+            self.completed_ids.add(family_id)
+            self.completed_positions.add(position)
+            self.buffer.append({"position": position, "id": family_id})
+            if len(self.buffer) >= self.flush_every or time.monotonic() - self.last_flush >= self.flush_interval:
+                self._flush()
+
+    def _flush(self) -> None:
+        if self.buffer:
+            self.file.write("".join(json.dumps(record) + "\n" for record in self.buffer))
+            self.buffer = []
+            self._sync()
+        self.last_flush = time.monotonic()
+
+    def _sync(self) -> None:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        with self.lock:
+            self._flush()
+            self.file.close()
+
+    def __enter__(self) -> "Checkpoint":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
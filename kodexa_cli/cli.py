@@ -12,37 +12,69 @@ import json
 import logging
 import os
 import os.path
-import sys
-from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from shutil import copyfile
-from typing import Any, Optional
-from kodexa.platform.manifest import ManifestManager
+from typing import Any, Callable, Iterable, Optional
 
 import click
 from importlib import metadata
-import requests
 import yaml
-from functional import seq
-from kodexa.model import ModelContentMetadata
-from kodexa.platform.client import (
-    ModelStoreEndpoint,
-    PageDocumentFamilyEndpoint,
-    DocumentFamilyEndpoint,
-)
 from rich import print
 from rich.prompt import Confirm
 import concurrent.futures
+import copy
 import csv
-import better_exceptions
 import time
-better_exceptions.hook()
+
+from kodexa_cli.cache import DEFAULT_TTL_SECONDS as DEFAULT_CACHE_TTL_SECONDS
+from kodexa_cli.profiles import ProfileStore
+from kodexa_cli.streaming import DEFAULT_PREFETCH_PAGES
 
 logging.root.addHandler(logging.StreamHandler(sys.stdout))
 
-from kodexa import KodexaClient, Taxonomy
-from kodexa.platform.kodexa import KodexaPlatform
+
+class LazyImport:
+    """A stand-in for a module (or a name within a module) that is only imported when first used.
+
+    Importing the kodexa library pulls in the whole platform object model, which dominates the start-up
+    time of the CLI, so we hold on to these proxies and only pay for the import in the commands that need it.
+    """
+
+    def __init__(self, module: str, name: Optional[str] = None):
+        self._module = module
+        self._name = name
+        self._target = None
+
+    def _resolve(self) -> Any:
+        if self._target is None:
+            target = importlib.import_module(self._module)
+            if self._name is not None:
+                target = getattr(target, self._name)
+            self._target = target
+        return self._target
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self._resolve(), item)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        target = f"{self._module}.{self._name}" if self._name else self._module
+        return f"<LazyImport {target}>"
+
+
+KodexaClient = LazyImport("kodexa_cli.platform", "RetryingKodexaClient")
+Taxonomy = LazyImport("kodexa", "Taxonomy")
+ManifestManager = LazyImport("kodexa.platform.manifest", "ManifestManager")
+ModelContentMetadata = LazyImport("kodexa.model", "ModelContentMetadata")
+ModelStoreEndpoint = LazyImport("kodexa.platform.client", "ModelStoreEndpoint")
+PageDocumentFamilyEndpoint = LazyImport("kodexa.platform.client", "PageDocumentFamilyEndpoint")
+DocumentFamilyEndpoint = LazyImport("kodexa.platform.client", "DocumentFamilyEndpoint")
+
+# Profile lookups are served from the CLI's memoized copy of the profile configuration
+KodexaPlatform = ProfileStore
 
 global GLOBAL_IGNORE_COMPLETE
 
@@ -253,19 +285,6 @@ def config_check(url, token) -> bool:
 
 
 
-@contextmanager
-def set_directory(path: Path):
-    """Sets the cwd within the context
-    """
-
-    origin = Path().absolute()
-    try:
-        os.chdir(path)
-        yield
-    finally:
-        os.chdir(origin)
-
-
 class Info(object):
     """An information object to pass data between CLI functions."""
 
@@ -273,6 +292,74 @@ class Info(object):
         """Create a new instance."""
         self.verbose: int = 0
         self.profile: Optional[str] = None
+        self.show_profile: bool = False
+
+
+class ThreadCount(click.ParamType):
+    """A number of threads, or 'auto' to adapt the number to how the platform is responding."""
+
+    name = "threads"
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, int) or value == "auto":
+            return value
+        try:
+            return int(value)
+        except ValueError:
+            self.fail(f"{value!r} is not a number or 'auto'", param, ctx)
+
+
+def configure_retries(profile: Optional[str], retries: Optional[int], retry_max_wait: Optional[float],
+                      timeout: Optional[float] = None) -> None:
+    """Set up the retry policy every client uses, from the command line or else the profile's settings.
+
+    Args:
+        profile (Optional[str]): The profile in use (None for the current one)
+        retries (Optional[int]): The number of retries given on the command line
+        retry_max_wait (Optional[float]): The longest wait given on the command line
+        timeout (Optional[float]): The request timeout given on the command line
+    """
+    from kodexa_cli.retry import DEFAULT_MAX_WAIT, DEFAULT_RETRIES, DEFAULT_TIMEOUT, RetryPolicy, set_policy
+
+    if retries is None:
+        retries = KodexaPlatform.get_setting("retries", profile)
+    if retry_max_wait is None:
+        retry_max_wait = KodexaPlatform.get_setting("retry_max_wait", profile)
+    if timeout is None:
+        timeout = KodexaPlatform.get_setting("timeout", profile)
+    set_policy(RetryPolicy(
+        retries=int(retries) if retries is not None else DEFAULT_RETRIES,
+        max_wait=float(retry_max_wait) if retry_max_wait is not None else DEFAULT_MAX_WAIT,
+        timeout=float(timeout) if timeout is not None else DEFAULT_TIMEOUT,
+    ))
+
+
+def cache_max_bytes(profile: Optional[str], cache_max_mb: Optional[float]) -> int:
+    """Work out the size limit of the object cache, from the command line or else the profile's settings.
+
+    Args:
+        profile (Optional[str]): The profile in use (None for the current one)
+        cache_max_mb (Optional[float]): The limit in megabytes given on the command line
+
+    Returns:
+        int: The limit in bytes
+    """
+    from kodexa_cli.cache import DEFAULT_MAX_BYTES
+
+    if cache_max_mb is None:
+        cache_max_mb = KodexaPlatform.get_setting("cache_max_mb", profile)
+    return int(float(cache_max_mb) * 1024 * 1024) if cache_max_mb is not None else DEFAULT_MAX_BYTES
+
+
+def make_limiter(threads: Any) -> Any:
+    """
+    :return: an AdaptiveLimiter if threads is 'auto', otherwise None
+    """
+    if threads != "auto":
+        return None
+    from kodexa_cli.bulk import AdaptiveLimiter
+
+    return AdaptiveLimiter()
 
 
 # pass_info is a decorator for functions that pass 'Info' objects.
@@ -337,14 +424,38 @@ class MetadataHelper:
 @click.group()
 @click.option("--verbose", "-v", count=True, help="Enable verbose output.")
 @click.option("--profile", help="Override the profile to use for this command")
+@click.option(
+    "--retries",
+    type=click.IntRange(0),
+    default=None,
+    help="Number of times to retry a request that failed with a transient error (defaults to the profile's "
+         "'retries' setting, or 3)",
+)
+@click.option(
+    "--retry-max-wait",
+    type=click.FloatRange(0),
+    default=None,
+    help="Longest wait in seconds before any retry (defaults to the profile's 'retry_max_wait' setting, or 30)",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(0, min_open=True),
+    default=None,
+    help="Seconds to wait for the platform to connect or send data before a request fails (defaults to the "
+         "profile's 'timeout' setting, or 300)",
+)
 @pass_info
-def cli(info: Info, verbose: int, profile: Optional[str] = None) -> None:
+def cli(info: Info, verbose: int, profile: Optional[str] = None, retries: Optional[int] = None,
+        retry_max_wait: Optional[float] = None, timeout: Optional[float] = None) -> None:
     """Initialize the CLI with the specified verbosity level.
 
     Args:
         info (Info): Information object to pass data between CLI functions
         verbose (int): Verbosity level for logging output
         profile (Optional[str]): Override the profile to use for this command
+        retries (Optional[int]): Override the number of retries of transient failures
+        retry_max_wait (Optional[float]): Override the longest wait before a retry
+        timeout (Optional[float]): Override how long a request waits for the platform
 
     Returns:
         None
@@ -371,6 +482,21 @@ def cli(info: Info, verbose: int, profile: Optional[str] = None) -> None:
             sys.exit(1)
         info.profile = profile
 
+    configure_retries(info.profile, retries, retry_max_wait, timeout)
+
+    if info.show_profile:
+        try:
+            current_kodexa_profile = get_current_kodexa_profile()
+            current_kodexa_url = get_current_kodexa_url()
+            if current_kodexa_profile and current_kodexa_url:
+                print(f"Using profile {current_kodexa_profile} @ {current_kodexa_url}\n")
+        except Exception as e:
+            print_error_message(
+                "Profile Error",
+                "Unable to load your Kodexa profile.",
+                str(e)
+            )
+
 
 def safe_entry_point() -> None:
     """Safe entry point for the CLI that handles exceptions and timing.
@@ -383,6 +509,9 @@ def safe_entry_point() -> None:
     Returns:
         None
     """
+    import better_exceptions
+    better_exceptions.hook()
+
     # Assuming that execution is successful initially
     success = True
     global GLOBAL_IGNORE_COMPLETE
@@ -392,20 +521,10 @@ def safe_entry_point() -> None:
         # Record the starting time of the function execution
         start_time = datetime.now().replace(microsecond=0)
 
-        try:
-            current_kodexa_profile = get_current_kodexa_profile()
-            current_kodexa_url = get_current_kodexa_url()
-            if current_kodexa_profile and current_kodexa_url:
-                print(f"Using profile {current_kodexa_profile} @ {current_kodexa_url}\n")
-        except Exception as e:
-            print_error_message(
-                "Profile Error",
-                "Unable to load your Kodexa profile.",
-                str(e)
-            )
-
-        # Call the cli() function
-        cli()
+        # The profile banner is printed by the group once --profile has been applied
+        info = Info()
+        info.show_profile = True
+        cli(obj=info)
     except Exception as e:
         # If an exception occurs, mark success as False and print the exception
         success = False
@@ -430,27 +549,34 @@ def safe_entry_point() -> None:
 @click.argument("object_type", required=False)
 @click.argument("ref", required=False)
 @click.option(
-    "--url", default=get_current_kodexa_url(), help="The URL to the Kodexa server"
+    "--url", default=get_current_kodexa_url, help="The URL to the Kodexa server"
 )
-@click.option("--token", default=get_current_access_token(), help="Access token")
+@click.option("--token", default=get_current_access_token, help="Access token")
 @click.option("--query", default="*", help="Limit the results using a query")
 @click.option("--filter/--no-filter", default=False, help="Switch from query to filter syntax")
-@click.option("--format", default=None, help="The format to output (json, yaml)")
+@click.option("--format", default=None, help="The format to output (json, yaml, or jsonl when streaming to a file)")
 @click.option("--page", default=1, help="Page number")
-@click.option("--pageSize", default=10, help="Page size")
+@click.option("--pageSize", default=10, help="Page size (also used when streaming)")
 @click.option("--sort", default=None, help="Sort by (ie. startDate:desc)")
 @click.option("--truncate/--no-truncate", default=True, help="Truncate the output or not")
 @click.option("--stream/--no-stream", default=False, help="Stream results instead of using table output")
 @click.option("--delete/--no-delete", default=False, help="Delete streamed objects")
+@click.option("--threads", default=5, help="Number of threads to use when deleting streamed objects")
+@click.option("--max-rps", default=None, type=float, help="Maximum number of deletes to start per second")
 @click.option("--output-path", default=None, help="Output directory to save the results")
 @click.option("--output-file", default=None, help="Output file to save the results")
+@click.option("--prefetch-pages", default=DEFAULT_PREFETCH_PAGES, help="Number of pages to fetch ahead when streaming")
+@click.option("--cache/--no-cache", default=False, help="Serve single objects from the local object cache")
+@click.option("--cache-ttl", default=DEFAULT_CACHE_TTL_SECONDS, help="Seconds a cached object is used before it is revalidated")
+@click.option("--cache-max-mb", default=None, type=float,
+              help="Size limit of the object cache in MB (defaults to the profile's 'cache_max_mb' setting, or 50)")
 @pass_info
 def get(
-        _: Info,
+        info: Info,
         object_type: Optional[str] = None,
         ref: Optional[str] = None,
-        url: str = get_current_kodexa_url(),
-        token: str = get_current_access_token(),
+        url: str = "",
+        token: str = "",
         query: str = "*",
         filter: bool = False,
         format: Optional[str] = None,
@@ -460,8 +586,14 @@ def get(
         truncate: bool = True,
         stream: bool = False,
         delete: bool = False,
+        threads: int = 5,
+        max_rps: Optional[float] = None,
         output_path: Optional[str] = None,
-        output_file: Optional[str] = None
+        output_file: Optional[str] = None,
+        prefetch_pages: int = DEFAULT_PREFETCH_PAGES,
+        cache: bool = False,
+        cache_ttl: int = DEFAULT_CACHE_TTL_SECONDS,
+        cache_max_mb: Optional[float] = None
 ) -> None:
     """List or retrieve Kodexa platform objects.
     
@@ -484,9 +616,15 @@ def get(
         
         # Stream and delete matching objects (use with caution)
         kodexa get documentFamily my-org --stream --delete
+
+        # Delete with 10 threads, at most 20 deletes a second, and a JSON summary
+        kodexa get executions my-org --stream --delete --threads 10 --max-rps 20 --format json
         
         # Export results to a file
         kodexa get assistants --output-file assistants.json --format json
+
+        # Reuse a locally cached copy of an object for up to 10 minutes
+        kodexa get stores my-org/my-store --cache --cache-ttl 600
     """
 
     if not config_check(url, token):
@@ -499,24 +637,33 @@ def get(
     
 
     # Handle file output setup
-    def save_to_file(data, output_format=None):
-        if output_file is None:
-            return False
-        
+    def get_output_file_path():
         # Determine the full file path
         file_path = output_file
         if output_path:
             os.makedirs(output_path, exist_ok=True)
             file_path = os.path.join(output_path, output_file)
-        
+        return file_path
+
+    def get_output_format(file_path, output_format=None):
         # Determine format based on file extension if not specified
         if output_format is None:
             if file_path.lower().endswith('.json'):
                 output_format = 'json'
+            elif file_path.lower().endswith(('.jsonl', '.ndjson')):
+                output_format = 'jsonl'
             elif file_path.lower().endswith(('.yaml', '.yml')):
                 output_format = 'yaml'
             else:
                 output_format = format or 'json'  # Default to json if no extension hint
+        return output_format
+
+    def save_to_file(data, output_format=None):
+        if output_file is None:
+            return False
+        
+        file_path = get_output_file_path()
+        output_format = get_output_format(file_path, output_format)
         
         # Write data to file in appropriate format
         with open(file_path, 'w') as f:
@@ -536,6 +683,21 @@ def get(
         print(f"Output written to {file_path}")
         return True
 
+    def stream_to_file(objects):
+        # Write each object as it arrives rather than collecting them all in memory
+        from kodexa_cli.streaming import StreamingObjectWriter
+
+        file_path = get_output_file_path()
+        with StreamingObjectWriter(file_path, get_output_format(file_path, format)) as writer:
+            for obj in objects:
+                try:
+                    writer.write(obj.model_dump(by_alias=True, mode="json"))
+                    print(f"Processing {obj.id}")
+                except Exception as e:
+                    print(f"Error processing {obj.id}: {e}")
+
+        print(f"Output written to {file_path} ({writer.count} objects)")
+
     try:
         client = KodexaClient(url=url, access_token=token)
         from kodexa.platform.client import resolve_object_type
@@ -545,8 +707,16 @@ def get(
         if "global" in object_metadata and object_metadata["global"]:
             objects_endpoint = client.get_object_type(object_type)
             if ref and not ref.isspace():
-                object_instance = objects_endpoint.get(ref)
-                object_dict = object_instance.model_dump(by_alias=True)
+                if cache:
+                    object_dict = get_cached_object(
+                        client, url, object_type, ref, f"/api/{objects_endpoint.get_type()}/{ref}",
+                        lambda data: objects_endpoint.get_instance_class().model_validate(data), cache_ttl,
+                        cache_max_bytes(info.profile, cache_max_mb)
+                    )
+                    object_instance = object_dict
+                else:
+                    object_instance = objects_endpoint.get(ref)
+                    object_dict = object_instance.model_dump(by_alias=True)
                 
                 # Save to file if output_file is specified
                 if output_file and save_to_file(object_dict, format):
@@ -580,10 +750,9 @@ def get(
                 if stream:
                     if filter:
                         print(f"Streaming filter: {query}\n")
-                        all_objects = objects_endpoint.stream(filters=[query], sort=sort)
                     else:
                         print(f"Streaming query: {query}\n")
-                        all_objects = objects_endpoint.stream(query=query, sort=sort)
+                    all_objects = stream_objects(objects_endpoint, query, filter, sort, pagesize, prefetch_pages)
 
                     if delete and not Confirm.ask(
                             "Are you sure you want to delete these objects? This action cannot be undone."
@@ -591,32 +760,18 @@ def get(
                         print("Aborting delete")
                         exit(1)
 
-                    # Collect objects for file output if needed
-                    collected_objects = []
-                    if output_file:
-                        for obj in all_objects:
-                            try:
-                                if delete:
-                                    obj.delete()
-                                    print(f"Deleted {obj.id}")
-                                else:
-                                    collected_objects.append(obj.model_dump(by_alias=True))
-                                    print(f"Processing {obj.id}")
-                            except Exception as e:
-                                print(f"Error processing {obj.id}: {e}")
-                        
-                        if collected_objects and save_to_file(collected_objects, format):
+                    if delete:
+                        if delete_objects(all_objects, threads, max_rps, format):
                             GLOBAL_IGNORE_COMPLETE = True
-                            return
+                    elif output_file:
+                        stream_to_file(all_objects)
+                        GLOBAL_IGNORE_COMPLETE = True
+                        return
                     else:
                         for obj in all_objects:
                             try:
                                 print(f"Processing {obj.id}")
-                                if delete:
-                                    obj.delete()
-                                    print(f"Deleted {obj.id}")
-                                else:
-                                    print(obj)
+                                print(obj)
                             except Exception as e:
                                 print(f"Error processing {obj.id}: {e}")
                 else:
@@ -646,8 +801,16 @@ def get(
         else:
             if ref and not ref.isspace():
                 if "/" in ref:
-                    object_instance = client.get_object_by_ref(object_metadata["plural"], ref)
-                    object_dict = object_instance.model_dump(by_alias=True)
+                    if cache:
+                        object_dict = get_cached_object(
+                            client, url, object_type, ref, f"/api/{object_metadata['plural']}/{ref.replace(':', '/')}",
+                            lambda data: client.deserialize(data) if "type" not in object_metadata else object_metadata["type"](**data),
+                            cache_ttl, cache_max_bytes(info.profile, cache_max_mb)
+                        )
+                        object_instance = object_dict
+                    else:
+                        object_instance = client.get_object_by_ref(object_metadata["plural"], ref)
+                        object_dict = object_instance.model_dump(by_alias=True)
                     
                     # Save to file if output_file is specified
                     if output_file and save_to_file(object_dict, format):
@@ -681,10 +844,7 @@ def get(
 
                     objects_endpoint = client.get_object_type(object_type, organization)
                     if stream:
-                        if filter:
-                            all_objects = objects_endpoint.stream(filters=[query], sort=sort)
-                        else:
-                            all_objects = objects_endpoint.stream(query=query, sort=sort)
+                        all_objects = stream_objects(objects_endpoint, query, filter, sort, pagesize, prefetch_pages)
 
                         if delete and not Confirm.ask(
                                 "Are you sure you want to delete these objects? This action cannot be undone."
@@ -692,50 +852,36 @@ def get(
                             print("Aborting delete")
                             exit(1)
 
-                        # Collect objects for file output if needed
-                        collected_objects = []
-                        if output_file:
-                            for obj in all_objects:
-                                try:
-                                    if delete:
-                                        obj.delete()
-                                        print(f"Deleted {obj.id}")
-                                    else:
-                                        collected_objects.append(obj.model_dump(by_alias=True))
-                                        print(f"Processing {obj.id}")
-                                except Exception as e:
-                                    print(f"Error processing {obj.id}: {e}")
-                            
-                            if collected_objects and save_to_file(collected_objects, format):
+                        if delete:
+                            if delete_objects(all_objects, threads, max_rps, format):
                                 GLOBAL_IGNORE_COMPLETE = True
-                                return
+                        elif output_file:
+                            stream_to_file(all_objects)
+                            GLOBAL_IGNORE_COMPLETE = True
+                            return
                         else:
                             for obj in all_objects:
                                 try:
                                     print(f"Processing {obj.id}")
-                                    if delete:
-                                        obj.delete()
-                                        print(f"Deleted {obj.id}")
+                                    # Get column list for the referenced object
+                                    if object_metadata["plural"] in DEFAULT_COLUMNS:
+                                        column_list = DEFAULT_COLUMNS[object_metadata["plural"]]
                                     else:
-                                        # Get column list for the referenced object
-                                        if object_metadata["plural"] in DEFAULT_COLUMNS:
-                                            column_list = DEFAULT_COLUMNS[object_metadata["plural"]]
-                                        else:
-                                            column_list = DEFAULT_COLUMNS["default"]
-
-                                        # Print values for each column
-                                        values = []
-                                        for col in column_list:
-                                            try:
-                                                # Handle dot notation by splitting and traversing
-                                                parts = col.split('.')
-                                                value = obj
-                                                for part in parts:
-                                                    value = getattr(value, part)
-                                                values.append(str(value))
-                                            except AttributeError:
-                                                values.append("")
-                                        print(" | ".join(values))
+                                        column_list = DEFAULT_COLUMNS["default"]
+
+                                    # Print values for each column
+                                    values = []
+                                    for col in column_list:
+                                        try:
+                                            # Handle dot notation by splitting and traversing
+                                            parts = col.split('.')
+                                            value = obj
+                                            for part in parts:
+                                                value = getattr(value, part)
+                                            values.append(str(value))
+                                        except AttributeError:
+                                            values.append("")
+                                    print(" | ".join(values))
                                 except Exception as e:
                                     print(f"Error processing {obj.id}: {e}")
                     else:
@@ -797,6 +943,293 @@ def get(
             sys.exit(1)
 
 
+def delete_objects(objects: Any, threads: int, max_rps: Optional[float], format: Optional[str] = None) -> bool:
+    """Delete the streamed objects concurrently and report how many were deleted.
+
+    The stream is read to the end before anything is deleted.  Its pages are fetched by page number, so deleting
+    objects while later pages are still being read would shift the remaining objects onto pages already read, and
+    they would be skipped.
+
+    Args:
+        objects (Any): The objects to delete
+        threads (int): Number of deletes to run at the same time
+        max_rps (Optional[float]): Maximum number of deletes to start per second
+        format (Optional[str]): Print the summary as JSON if this is 'json'
+
+    Returns:
+        bool: True if the summary was printed as JSON
+    """
+    from kodexa_cli.bulk import run_bulk
+
+    def delete_object(obj):
+        obj.delete()
+        print(f"Deleted {obj.id}")
+
+    objects = list(objects)
+
+    # The client retries each request itself
+    summary = run_bulk(
+        "delete", objects, delete_object, lambda obj: str(obj.id), threads=threads, max_rps=max_rps, retries=0,
+        on_error=lambda obj, e: print(f"Error deleting {obj.id}: {e}")
+    )
+
+    if format == "json":
+        print(json.dumps(summary.to_dict(), indent=4))
+        return True
+
+    print(f"\nDeleted {summary.succeeded} objects ({summary.failed} failed) in {summary.elapsed:.1f}s")
+    return False
+
+
+def upload_files_async(store_ref: str, url: str, token: str, paths: Iterable[str], external_data: bool,
+                       concurrency: int, retries: Optional[int] = None, journal: Optional[Any] = None,
+                       on_done: Optional[Callable[[str], None]] = None, metrics: Optional[Any] = None,
+                       content_hash: Optional[Callable[[str], Optional[str]]] = None) -> Any:
+    """Upload files on the asyncio engine, with up to ``concurrency`` uploads in flight.
+
+    Args:
+        store_ref (str): The ref of the document store
+        url (str): The URL of the platform
+        token (str): The access token
+        paths (Iterable[str]): The files to upload, pulled as uploads finish
+        external_data (bool): Attach the .json file next to each upload as its external data
+        concurrency (int): Number of uploads in flight
+        retries (Optional[int]): Number of times to retry an upload that failed with a transient error (defaults to
+            the retry policy's)
+        journal (Optional[Any]): The UploadJournal to skip already uploaded files with, and record uploads in
+        on_done (Optional[Callable[[str], None]]): Called with each path once it is finished with
+        metrics (Optional[Any]): The UploadMetrics to time each upload with
+        content_hash (Optional[Callable[[str], Optional[str]]]): Gives the content hash already computed for a path
+            (by the deduplicator), so the journal doesn't hash the file again
+    Returns:
+        Any: The BulkSummary of the uploads
+    """
+    import asyncio
+    from contextlib import nullcontext
+
+    from kodexa_cli.aio import AsyncPlatformClient, run_async_bulk
+    from kodexa_cli.journal import FileFingerprint
+    from kodexa_cli.retry import RetryPolicy, get_policy
+
+    # Each upload is streamed from its file, which is read again if the client resends it
+    policy = get_policy()
+    if retries is not None:
+        policy = RetryPolicy(retries, policy.backoff, policy.max_wait, policy.timeout)
+    client = AsyncPlatformClient(url, token, max_connections=concurrency, policy=policy)
+    store_path = f"/api/stores/{store_ref.replace(':', '/')}/fs"
+
+    def prepare_upload(path):
+        fingerprint = FileFingerprint.of(path)
+        known_hash = content_hash(path) if content_hash is not None else None
+        if journal is not None and journal.is_uploaded(fingerprint, known_hash):
+            return fingerprint, None, f"Skipping {path}, already uploaded"
+        fields = {}
+        if external_data:
+            external_data_path = f"{os.path.splitext(path)[0]}.json"
+            if not os.path.exists(external_data_path):
+                return fingerprint, None, f"External data file not found for {path}"
+            with open(external_data_path, "r") as f:
+                fields["externalData"] = json.dumps(json.load(f))
+        return fingerprint, fields, None
+
+    async def upload_file(path):
+        fingerprint, fields, skipped = await asyncio.to_thread(prepare_upload, path)
+        if skipped is not None:
+            print(skipped)
+            return
+
+        with metrics.track(fingerprint.size) if metrics is not None else nullcontext():
+            response, sent_hash = await client.post_file(store_path, {"path": path}, fields, "file", path)
+        if journal is not None:
+            journal.record(fingerprint, response.json().get("id"), sent_hash)
+        print(f"Successfully uploaded {path}")
+
+    return run_async_bulk(
+        "upload", paths, upload_file, str, concurrency=concurrency, retries=0,
+        on_error=lambda path, e: print(f"Error uploading {path}: {e}"), on_complete=client.close, on_done=on_done
+    )
+
+
+def upload_files(document_store: Any, paths: Iterable[str], external_data: bool, threads: Any,
+                 retries: Optional[int] = None,
+                 journal: Optional[Any] = None, on_done: Optional[Callable[[str], None]] = None,
+                 metrics: Optional[Any] = None, limiter: Optional[Any] = None,
+                 content_hash: Optional[Callable[[str], Optional[str]]] = None) -> Any:
+    """Upload files on a thread pool, with the kodexa client.
+
+    Args:
+        document_store (Any): The DocumentStoreEndpoint to upload to
+        paths (Iterable[str]): The files to upload, pulled as uploads finish
+        external_data (bool): Attach the .json file next to each upload as its external data
+        threads (Any): Number of uploads in flight (ignored with a limiter)
+        retries (Optional[int]): Number of times to retry an upload that failed with a transient error (defaults to
+            the retry policy's)
+        journal (Optional[Any]): The UploadJournal to skip already uploaded files with, and record uploads in
+        on_done (Optional[Callable[[str], None]]): Called with each path once it is finished with
+        metrics (Optional[Any]): The UploadMetrics to time each upload with
+        limiter (Optional[Any]): An AdaptiveLimiter to adapt the number of uploads in flight, instead of threads
+        content_hash (Optional[Callable[[str], Optional[str]]]): Gives the content hash already computed for a path
+            (by the deduplicator), so the journal doesn't hash the file again
+
+    Returns:
+        Any: The BulkSummary of the uploads
+    """
+    from contextlib import nullcontext
+
+    from kodexa_cli.bulk import run_bulk
+    from kodexa_cli.journal import FileFingerprint
+
+    def upload_file(path):
+        fingerprint = FileFingerprint.of(path)
+        known_hash = content_hash(path) if content_hash is not None else None
+        if journal is not None and journal.is_uploaded(fingerprint, known_hash):
+            print(f"Skipping {path}, already uploaded")
+            return
+
+        if external_data:
+            external_data_path = f"{os.path.splitext(path)[0]}.json"
+            if not os.path.exists(external_data_path):
+                print(f"External data file not found for {path}")
+                return
+            with open(external_data_path, "r") as f:
+                file_external_data = json.load(f)
+            with metrics.track(fingerprint.size) if metrics is not None else nullcontext():
+                family = document_store.upload_file(path, external_data=file_external_data)
+            print(f"Successfully uploaded {path} with external data {json.dumps(file_external_data)}")
+        else:
+            with metrics.track(fingerprint.size) if metrics is not None else nullcontext():
+                family = document_store.upload_file(path)
+            print(f"Successfully uploaded {path}")
+
+        if journal is not None:
+            journal.record(fingerprint, family.id, known_hash)
+
+    return run_bulk(
+        "upload", paths, upload_file, str, threads=threads if limiter is None else limiter.max_limit,
+        retries=retries, on_error=lambda path, e: print(f"Error uploading {path}: {e}"), on_done=on_done,
+        limiter=limiter, idempotent=False
+    )
+
+
+def print_query_summary(summary: Any) -> None:
+    """Print how many document families were processed, and how each operation fared.
+
+    Args:
+        summary (Any): The BulkSummary of the run
+    """
+    from rich.table import Table
+
+    print(
+        f"\nProcessed {summary.succeeded} document families ({summary.failed} failed) in {summary.elapsed:.1f}s"
+    )
+    if summary.operations:
+        table = Table(title="Operations", title_style="bold blue")
+        table.add_column("Operation")
+        table.add_column("Succeeded")
+        table.add_column("Failed")
+        table.add_column("Per second")
+        for name, counts in summary.operations.items():
+            rate = counts["succeeded"] / summary.elapsed if summary.elapsed else 0.0
+            table.add_row(name, str(counts["succeeded"]), str(counts["failed"]), f"{rate:.1f}", style="yellow")
+        print(table)
+
+
+def stream_objects(objects_endpoint: Any, query: str, filter: bool, sort: Optional[str], page_size: int,
+                   prefetch: int) -> Any:
+    """Stream the objects from an endpoint, fetching the next pages while the current one is processed.
+
+    Args:
+        objects_endpoint (Any): The endpoint to list the objects from
+        query (str): The query (or filter, if filter is set) to apply
+        filter (bool): Whether the query is in filter syntax
+        sort (Optional[str]): Sort field and direction (defaults to id, so pages are stable)
+        page_size (int): Number of objects to request per page
+        prefetch (int): Number of pages to keep in flight
+
+    Returns:
+        Any: An iterator over the objects, in order
+    """
+    from kodexa_cli.streaming import prefetch_pages
+
+    def fetch_page(page_number: int):
+        if filter:
+            page = objects_endpoint.list(page=page_number, page_size=page_size, sort=sort or "id", filters=[query])
+        else:
+            page = objects_endpoint.list(query=query, page=page_number, page_size=page_size, sort=sort or "id")
+        return page.content
+
+    return prefetch_pages(fetch_page, prefetch=prefetch, page_size=page_size)
+
+
+def stream_document_families(document_store: Any, query: str, filter: bool, sort: Optional[str], page_size: int,
+                             prefetch: int, limit: Optional[int] = None, starting_offset: int = 0) -> Any:
+    """Stream the document families matching a query, fetching the next pages while the current one is processed.
+
+    Args:
+        document_store (Any): The document store to query
+        query (str): The query (or filter, if filter is set) to apply
+        filter (bool): Whether the query is in filter syntax
+        sort (Optional[str]): Sort field and direction (defaults to id, so pages are stable)
+        page_size (int): Number of document families to request per page
+        prefetch (int): Number of pages to keep in flight
+        limit (Optional[int]): Maximum number of document families to return
+        starting_offset (int): Number of matching document families to skip
+
+    Returns:
+        Any: An iterator over the document families, in order
+    """
+    import itertools
+    from kodexa_cli.streaming import prefetch_pages
+
+    def fetch_page(page_number: int):
+        if filter:
+            return document_store.filter(query, page_number, page_size, sort or "id").content
+        return document_store.query(query, page_number, page_size, sort or "id").content
+
+    # Start from the page holding the offset, and skip what comes before it on that page
+    skip = starting_offset % page_size
+    families = prefetch_pages(fetch_page, first_page=starting_offset // page_size + 1, prefetch=prefetch,
+                              page_size=page_size)
+    return itertools.islice(families, skip, None if limit is None else skip + limit)
+
+
+def get_cached_object(client: Any, url: str, object_type: str, ref: str, path: str, build, ttl: int,
+                      max_bytes: Optional[int] = None) -> dict[str, Any]:
+    """Get an object through the local object cache, revalidating stale entries with a conditional request.
+
+    Args:
+        client (Any): The KodexaClient to use
+        url (str): The URL of the Kodexa server, which scopes the cache entry
+        object_type (str): The object type requested
+        ref (str): The reference of the object
+        path (str): The API path of the object
+        build: Turns the JSON returned by the platform into the platform object
+        ttl (int): Seconds a cached object is used before it is revalidated
+        max_bytes (Optional[int]): The size limit of the cache (defaults to 50MB)
+
+    Returns:
+        dict[str, Any]: The object, as it would be dumped by the platform model
+    """
+    from kodexa_cli.cache import DEFAULT_MAX_BYTES, ObjectCache
+
+    def load(validators: dict[str, str]):
+        response = client.get(path, headers=validators)
+        if response.status_code == 304:
+            return None
+        object_instance = build(response.json())
+        return (
+            object_instance.model_dump(by_alias=True, mode="json"),
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+
+    object_cache = ObjectCache(max_bytes=max_bytes if max_bytes is not None else DEFAULT_MAX_BYTES)
+    try:
+        return object_cache.fetch(url, object_type, ref, load, ttl)
+    finally:
+        object_cache.close()
+
+
 def print_object_table(object_metadata: dict[str, Any], objects_endpoint_page: Any, query: str, page: int,
                        pagesize: int,
                        sort: Optional[str], truncate: bool) -> None:
@@ -886,9 +1319,9 @@ def print_object_table(object_metadata: dict[str, Any], objects_endpoint_page: A
 @click.argument("ref", required=True)
 @click.argument("query", nargs=-1)
 @click.option(
-    "--url", default=get_current_kodexa_url(), help="The URL to the Kodexa server"
+    "--url", default=get_current_kodexa_url, help="The URL to the Kodexa server"
 )
-@click.option("--token", default=get_current_access_token(), help="Access token")
+@click.option("--token", default=get_current_access_token, help="Access token")
 @click.option(
     "--download/--no-download",
     default=False,
@@ -911,7 +1344,7 @@ def print_object_table(object_metadata: dict[str, Any], objects_endpoint_page: A
     "--project-id", default=None, help="The project ID to use for the extracted data"
 )
 @click.option("--page", default=1, help="Page number")
-@click.option("--pageSize", default=10, help="Page size", type=int)
+@click.option("--pageSize", default=10, help="Page size (also used when streaming)", type=int)
 @click.option(
     "--limit", default=None, help="Limit the number of results in streaming", type=int
 )
@@ -927,6 +1360,36 @@ def print_object_table(object_metadata: dict[str, Any], objects_endpoint_page: A
 @click.option(
     "--reprocess", default=None, help="Reprocess using the provided assistant ID"
 )
+@click.option(
+    "--output-dir",
+    default=None,
+    help="Save downloads under this directory, sharded into subdirectories (defaults to next to each path)",
+    type=click.Path(file_okay=False),
+)
+@click.option(
+    "--sync-to",
+    default=None,
+    help="Mirror the downloads into this directory, only fetching document families changed since the last sync",
+    type=click.Path(file_okay=False),
+)
+@click.option(
+    "--shard-depth",
+    default=2,
+    help="Number of levels of subdirectories to shard downloads into under --output-dir",
+    type=click.IntRange(0, 8),
+)
+@click.option(
+    "--reprocess-batch-size",
+    default=100,
+    help="Number of document families submitted for reprocessing in each request",
+    type=int,
+)
+@click.option(
+    "--max-inflight-executions",
+    default=None,
+    help="Hold back reprocessing while this many executions are pending or running",
+    type=int,
+)
 @click.option("--add-label", default=None, help="Add a label to the matching document families")
 @click.option("--remove-label", default=None, help="Remove a label from the matching document families")
 @click.option(
@@ -938,9 +1401,44 @@ def print_object_table(object_metadata: dict[str, Any], objects_endpoint_page: A
 @click.option(
     "--threads",
     default=5,
-    help="Number of threads to use (only in streaming)",
+    help="Number of threads to use, or 'auto' to adapt to the platform (only in streaming)",
+    type=ThreadCount(),
+)
+@click.option(
+    "--engine",
+    type=click.Choice(["threads", "async"]),
+    default="threads",
+    help="Run the operations on a thread pool or on an asyncio connection pool",
+)
+@click.option(
+    "--concurrency",
+    default=50,
+    help="Number of operations in flight (async engine only)",
+    type=int,
+)
+@click.option(
+    "--max-in-flight",
+    default=None,
+    help="Maximum number of document families queued for the threads (defaults to twice the threads)",
+    type=int,
+)
+@click.option(
+    "--prefetch-pages",
+    default=DEFAULT_PREFETCH_PAGES,
+    help="Number of pages to fetch ahead (only in streaming)",
     type=int,
 )
+@click.option(
+    "--checkpoint",
+    "checkpoint_path",
+    default=None,
+    help="Record completed document families in this file (only in streaming)",
+)
+@click.option(
+    "--resume/--no-resume",
+    default=False,
+    help="Skip the document families already completed in the checkpoint",
+)
 @click.option("--sort", default=None, help="Sort by ie. name:asc")
 @pass_info
 def query(
@@ -962,10 +1460,21 @@ def query(
         remove_label: Optional[str] = None,
         delete: bool = False,
         stream: bool = False,
-        threads: int = 5,
+        threads: int | str = 5,
         limit: Optional[int] = None,
         watch: Optional[int] = None,
         project_id: Optional[str] = None,
+        prefetch_pages: int = DEFAULT_PREFETCH_PAGES,
+        max_in_flight: Optional[int] = None,
+        engine: str = "threads",
+        concurrency: int = 50,
+        checkpoint_path: Optional[str] = None,
+        resume: bool = False,
+        reprocess_batch_size: int = 100,
+        max_inflight_executions: Optional[int] = None,
+        output_dir: Optional[str] = None,
+        shard_depth: int = 2,
+        sync_to: Optional[str] = None,
 ) -> None:
     """Query and manipulate documents in a document store.
     
@@ -985,15 +1494,31 @@ def query(
         
         # Download documents matching a query
         kodexa query my-org/my-store "type:invoice" --download
+
+        # Download the native files and extracted data of a whole store into a sharded directory
+        kodexa query my-org/my-store --stream --download-native --download-extracted-data --output-dir exports
+
+        # Keep a nightly mirror of a store, fetching only what changed since the last run
+        kodexa query my-org/my-store --stream --download-native --sync-to /data/mirror
         
         # Reprocess documents with a specific assistant
         kodexa query my-org/my-store --stream --reprocess assistant-id
+
+        # Reprocess failed documents, without more than 500 executions queued at a time
+        kodexa query my-org/my-store --stream --reprocess failed --max-inflight-executions 500
         
         # Add labels to matching documents
         kodexa query my-org/my-store "status:pending" --add-label reviewed
         
         # Stream and delete documents (use with caution!)
         kodexa query my-org/my-store "created:<2023-01-01" --stream --delete
+
+        # Label a large store with hundreds of requests in flight
+        kodexa query my-org/my-store --stream --add-label reviewed --engine async --concurrency 200
+
+        # Record progress so an interrupted run can pick up where it left off
+        kodexa query my-org/my-store --stream --download --checkpoint progress.jsonl
+        kodexa query my-org/my-store --stream --download --checkpoint progress.jsonl --resume
         
         # Watch for new documents (refresh every 10 seconds)
         kodexa query my-org/my-store --watch 10
@@ -1008,19 +1533,54 @@ def query(
 
     document_store: DocumentStoreEndpoint = client.get_object_by_ref("store", ref)
 
+    if resume and checkpoint_path is None:
+        print("You can't resume without a checkpoint")
+        exit(1)
+
+    if checkpoint_path is not None and not stream:
+        print("You can't checkpoint without streaming")
+        exit(1)
+
+    if engine == "async" and (download_extracted_data or sync_to is not None):
+        print("The async engine can't download extracted data or sync, use --engine threads")
+        exit(1)
+
+    if sync_to is not None:
+        if not (download or download_native or download_extracted_data):
+            print("Choose what to sync with --download, --download-native or --download-extracted-data")
+            exit(1)
+        if output_dir is not None and os.path.abspath(output_dir) != os.path.abspath(sync_to):
+            print("You can't use a different --output-dir when syncing")
+            exit(1)
+        output_dir = sync_to
+
     while True:
+        checkpoint = None
+        if checkpoint_path is not None:
+            from kodexa_cli.checkpoint import Checkpoint
+
+            checkpoint = Checkpoint(
+                checkpoint_path,
+                {"ref": ref, "query": query_str, "filter": filter, "startingOffset": starting_offset},
+                resume=resume,
+            )
+            # Deleting or labelling can change which families match, so positions are only reliable for
+            # the other operations; completed families are always skipped by id
+            if resume and starting_offset is None and not (delete or add_label or remove_label):
+                starting_offset = checkpoint.resume_offset() or None
+            if resume:
+                print(f"Resuming from checkpoint {checkpoint_path} ({len(checkpoint.completed_ids)} completed)")
+
         if isinstance(document_store, DocumentStoreEndpoint):
             if stream:
                 if filter:
                     print(f"Streaming filter: {query_str}\n")
-                    page_of_document_families = document_store.stream_filter(
-                        query_str, sort, limit, threads, starting_offset=starting_offset if starting_offset else 0
-                    )
                 else:
                     print(f"Streaming query: {query_str}\n")
-                    page_of_document_families = document_store.stream_query(
-                        query_str, sort, limit, threads, starting_offset=starting_offset if starting_offset else 0
-                    )
+                page_of_document_families = stream_document_families(
+                    document_store, query_str, filter, sort, pagesize, prefetch_pages,
+                    limit=limit, starting_offset=starting_offset if starting_offset else 0
+                )
             else:
                 if filter:
                     print(f"Using filter: {query_str}\n")
@@ -1080,8 +1640,6 @@ def query(
                 print("Aborting delete")
                 exit(1)
 
-            import concurrent.futures
-
             if reprocess is not None:
                 
                 if not stream:
@@ -1105,88 +1663,283 @@ def query(
             if stream:
                 print(f"Streaming document families (with {threads} threads)")
             
-            with concurrent.futures.ThreadPoolExecutor(
-                    max_workers=threads
-            ) as executor:
-                def process_family(args) -> None:
-                    idx, df = args
-                    doc_family: DocumentFamilyEndpoint = df
-                    position = starting_offset + idx + 1 if starting_offset else idx + 1
-                    if download:
-                        print(f"Downloading document for {doc_family.path} (position {position})")
-                        doc_family.get_document().to_kddb(doc_family.path + ".kddb")
+            from kodexa_cli.bulk import BulkSummary, run_bulk
 
-                    if download_native:
-                        print(
-                            f"Downloading native object for {doc_family.path} (position {position})"
-                        )
-                        with open(doc_family.path + ".native", "wb") as f:
-                            f.write(doc_family.get_native())
-                            
-                    if download_extracted_data:
-                        if Path(doc_family.path + "-extracted_data.json").exists():
-                            print(f"Extracted data already exists for {doc_family.path} (position {position})")
-                        else:
-                            print(f"Downloading extracted data for {doc_family.path} (position {position})")
-                            # Retry logic for downloading and writing extracted data
-                            max_retries = 3
-                            retry_delay = 2  # seconds
-                            
-                            for attempt in range(max_retries):
-                                try:
-                                    # Get the JSON data
-                                    json_data = doc_family.get_json(
-                                        project_id=project_id, 
-                                        friendly_names=False, 
-                                        include_ids=True, 
-                                        include_exceptions=True, 
-                                        inline_audits=False
-                                    )
-                                    
-                                    # Write the JSON file with the extracted data
-                                    with open(doc_family.path + "-extracted_data.json", "w") as f:
-                                        f.write(json_data)
-                                    
-                                    # Success - break out of retry loop
-                                    break
-                                    
-                                except Exception as e:
-                                    if attempt < max_retries - 1:
-                                        print(f"  Retry {attempt + 1}/{max_retries} failed for {doc_family.path}: {str(e)}")
-                                        print(f"  Waiting {retry_delay} seconds before retrying...")
-                                        time.sleep(retry_delay)
-                                    else:
-                                        print(f"  Failed to download extracted data for {doc_family.path} after {max_retries} attempts: {str(e)}")
-                                        raise
+            summary = BulkSummary("query")
+            label_client = None
+            if add_label is not None or remove_label is not None:
+                from kodexa_cli.sessions import KeepAliveClient
 
-                    if delete:
-                        print(f"Deleting {doc_family.path} (position {position})")
+                label_client = KeepAliveClient(url, token)
+
+            batcher = None
+            if reprocess is not None:
+                import functools
+
+                from kodexa_cli.reprocess import ReprocessBatcher, failed_assistant
+                from kodexa_cli.sessions import KeepAliveClient
+
+                def count_inflight_executions() -> int:
+                    return sum(
+                        client.executions.list(page_size=1, filters=[f"status: '{status}'"]).total_elements
+                        for status in ("PENDING", "RUNNING")
+                    )
+
+                def report_batch_error(assistant_id, family_ids, e) -> None:
+                    print(f"Error reprocessing {len(family_ids)} document families with assistant {assistant_id}: {e}")
+
+                batcher = ReprocessBatcher(
+                    KeepAliveClient(url, token), batch_size=reprocess_batch_size,
+                    max_inflight_executions=max_inflight_executions,
+                    count_inflight_executions=count_inflight_executions, summary=summary,
+                    on_error=report_batch_error,
+                )
+
+            def queue_reprocess(doc_family, position) -> bool:
+                """Queue a family for batched reprocessing, recording it in the checkpoint once submitted.
+
+                Returns:
+                    bool: Whether the family was queued (otherwise it is complete as it is)
+                """
+                target = failed_assistant(doc_family) if assistant == "failed" else assistant
+                if target is None:
+                    print(f"Skipping reprocessing {doc_family.path} (position {position}) because it has no failed executions")
+                    return False
+                print(f"Queueing {doc_family.path} (position {position}) for reprocessing with {target.name}")
+                on_submitted = None
+                if checkpoint is not None:
+                    on_submitted = functools.partial(checkpoint.record, position, doc_family.id)
+                if not batcher.add(doc_family, target.id, on_submitted):
+                    print(f"Skipping reprocessing {doc_family.path} (position {position}) because it is locked")
+                    return False
+                return True
+
+            limiter = make_limiter(threads) if engine == "threads" else None
+            download_kinds = [
+                kind for kind, wanted in (
+                    ("download", download),
+                    ("download-native", download_native),
+                    ("download-extracted-data", download_extracted_data),
+                ) if wanted
+            ]
+            download_client = None
+            download_pool = None
+            manifest = None
+            if download_kinds:
+                import hashlib
+
+                from kodexa_cli.downloads import (ARTIFACT_SUFFIXES, content_path, download_to_file,
+                                                  extracted_data_params, native_content_object, output_path)
+                from kodexa_cli.retry import RetryPolicy, get_policy
+                from kodexa_cli.sessions import KeepAliveClient
+
+                retry_policy = get_policy()
+                download_client = KeepAliveClient(
+                    url, token, policy=RetryPolicy(retries=0, timeout=retry_policy.timeout)
+                )
+                if sync_to is not None:
+                    from kodexa_cli.sync import SyncManifest
+
+                    manifest = SyncManifest(sync_to)
+                if len(download_kinds) > 1 and engine == "threads":
+                    # Each family's worker fetches one artifact itself and the others on this pool
+                    workers = threads if limiter is None else limiter.max_limit
+                    download_pool = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=(len(download_kinds) - 1) * workers, thread_name_prefix="kodexa-download"
+                    )
+
+            def download_artifact(doc_family, kind: str, position: int) -> Optional[dict[str, Any]]:
+                """Download one artifact of a family.
+
+                Returns:
+                    Optional[dict[str, Any]]: The path, size and sha256 of the file saved, or None if it was kept
+                """
+                destination = output_path(
+                    doc_family.id, doc_family.path, ARTIFACT_SUFFIXES[kind], output_dir, shard_depth
+                )
+                if kind == "download":
+                    print(f"Downloading document for {doc_family.path} (position {position})")
+                    path, params = content_path(doc_family, doc_family.content_objects[-1]), None
+                elif kind == "download-native":
+                    print(f"Downloading native object for {doc_family.path} (position {position})")
+                    path, params = content_path(doc_family, native_content_object(doc_family)), None
+                elif manifest is None and os.path.exists(destination):
+                    # When syncing, the manifest has already decided the extracted data is out of date
+                    print(f"Extracted data already exists for {doc_family.path} (position {position})")
+                    return None
+                else:
+                    print(f"Downloading extracted data for {doc_family.path} (position {position})")
+                    path, params = f"/api/document-families/{doc_family.id}/data", extracted_data_params()
+
+                def fetch() -> tuple[int, Any]:
+                    digest = hashlib.sha256()
+                    return download_to_file(download_client, path, destination, params=params, digest=digest), digest
+
+                def report_retry(e: BaseException, retry: int, delay: float) -> None:
+                    print(f"  Retry {retry}/{retry_policy.retries} of {kind} for {doc_family.path} in {delay:.1f}s: {e}")
+
+                # Retry the whole download, so a connection dropped part way through the content is retried too
+                with summary.track(kind):
+                    size, digest = retry_policy.call(fetch, on_retry=report_retry)
+                return {"path": destination, "size": size, "sha256": digest.hexdigest()}
+
+            def download_artifacts(doc_family, position: int) -> None:
+                """Stream each requested artifact of a family to disk, concurrently when there are several."""
+                if manifest is not None and manifest.is_current(doc_family, download_kinds):
+                    print(f"Skipping {doc_family.path} (position {position}), unchanged since the last sync")
+                    summary.count_operation("unchanged", "succeeded")
+                    return
+
+                if download_pool is None:
+                    files = [download_artifact(doc_family, kind, position) for kind in download_kinds]
+                else:
+                    futures = [
+                        download_pool.submit(download_artifact, doc_family, kind, position)
+                        for kind in download_kinds[1:]
+                    ]
+                    try:
+                        files = [download_artifact(doc_family, download_kinds[0], position)]
+                    finally:
+                        errors = [future.exception() for future in futures]
+                    error = next((error for error in errors if error is not None), None)
+                    if error is not None:
+                        raise error
+                    files.extend(future.result() for future in futures)
+
+                if manifest is not None:
+                    manifest.record(
+                        doc_family, {kind: file for kind, file in zip(download_kinds, files) if file is not None}
+                    )
+
+            def process_family(args) -> None:
+                idx, df = args
+                doc_family: DocumentFamilyEndpoint = df
+                position = starting_offset + idx + 1 if starting_offset else idx + 1
+                if checkpoint is not None and checkpoint.is_completed(doc_family.id):
+                    print(f"Skipping {doc_family.path} (position {position}), already completed")
+                    return
+
+                if download_kinds:
+                    download_artifacts(doc_family, position)
+
+                if delete:
+                    print(f"Deleting {doc_family.path} (position {position})")
+                    with summary.track("delete"):
                         doc_family.delete()
 
-                    if reprocess is not None:
-                        print(f"Reprocessing {doc_family.path} (position {position})")
-                        if assistant == "failed":
-                            if doc_family.statistics.recent_executions is None:
-                                print(f"Skipping reprocessing {doc_family.path} (position {position}) because it has no recent executions")
-                            else:
-                                for execution in doc_family.statistics.recent_executions:
-                                    if execution.execution.status == "FAILED":
-                                        print(f"Reprocessing {doc_family.path} (position {position}) with failed assistant {execution.assistant.name}")
-                                        doc_family.reprocess(execution.assistant)
-                                        break
-                        else:
-                            doc_family.reprocess(assistant)
+                # Reprocessing is submitted in batches, so the family is only complete once its batch is
+                queued = reprocess is not None and queue_reprocess(doc_family, position)
 
-                    if add_label is not None:
-                        print(f"Adding label {add_label} to {doc_family.path} (position {position})")
-                        doc_family.add_label(add_label)
+                # Labels are one request per family (there is no batch endpoint), so they go over kept-alive
+                # connections rather than a new connection each
+                family_url = f"/api/stores/{doc_family.store_ref.replace(':', '/')}/families/{doc_family.id}"
+                if add_label is not None:
+                    print(f"Adding label {add_label} to {doc_family.path} (position {position})")
+                    with summary.track("add-label"):
+                        label_client.put(f"{family_url}/addLabel", params={"label": add_label})
 
-                    if remove_label is not None:
-                        print(f"Removing label {remove_label} from {doc_family.path} (position {position})")
-                        doc_family.remove_label(remove_label)
-                
-                # Use enumerate to pass index along with doc_family
-                executor.map(process_family, enumerate(document_families))                    
+                if remove_label is not None:
+                    print(f"Removing label {remove_label} from {doc_family.path} (position {position})")
+                    with summary.track("remove-label"):
+                        label_client.put(f"{family_url}/removeLabel", params={"label": remove_label})
+
+                if checkpoint is not None and not queued:
+                    checkpoint.record(position, doc_family.id)
+
+            async def process_family_async(args) -> None:
+                import asyncio
+
+                idx, doc_family = args
+                position = starting_offset + idx + 1 if starting_offset else idx + 1
+                if checkpoint is not None and checkpoint.is_completed(doc_family.id):
+                    print(f"Skipping {doc_family.path} (position {position}), already completed")
+                    return
+
+                family_url = f"/api/stores/{doc_family.store_ref.replace(':', '/')}/families/{doc_family.id}"
+
+                async def download_artifact_async(kind: str) -> None:
+                    destination = Path(output_path(
+                        doc_family.id, doc_family.path, ARTIFACT_SUFFIXES[kind], output_dir, shard_depth
+                    ))
+                    if kind == "download":
+                        print(f"Downloading document for {doc_family.path} (position {position})")
+                    else:
+                        print(f"Downloading native object for {doc_family.path} (position {position})")
+                    with summary.track(kind):
+                        content_object = (
+                            doc_family.content_objects[-1] if kind == "download" else native_content_object(doc_family)
+                        )
+                        destination.parent.mkdir(parents=True, exist_ok=True)
+                        await async_client.download(content_path(doc_family, content_object), str(destination))
+
+                if download_kinds:
+                    results = await asyncio.gather(
+                        *(download_artifact_async(kind) for kind in download_kinds), return_exceptions=True
+                    )
+                    error = next((result for result in results if isinstance(result, BaseException)), None)
+                    if error is not None:
+                        raise error
+
+                if delete:
+                    print(f"Deleting {doc_family.path} (position {position})")
+                    with summary.track("delete"):
+                        await async_client.delete(f"/api/document-families/{doc_family.id}")
+
+                queued = reprocess is not None and await asyncio.to_thread(queue_reprocess, doc_family, position)
+
+                if add_label is not None:
+                    print(f"Adding label {add_label} to {doc_family.path} (position {position})")
+                    with summary.track("add-label"):
+                        await async_client.put(f"{family_url}/addLabel", params={"label": add_label})
+
+                if remove_label is not None:
+                    print(f"Removing label {remove_label} from {doc_family.path} (position {position})")
+                    with summary.track("remove-label"):
+                        await async_client.put(f"{family_url}/removeLabel", params={"label": remove_label})
+
+                if checkpoint is not None and not queued:
+                    checkpoint.record(position, doc_family.id)
+
+            def describe_family(args) -> str:
+                return f"{args[1].path} (position {args[0] + 1 + (starting_offset or 0)})"
+
+            def report_error(args, e) -> None:
+                print(f"Error processing {args[1].path}: {e}")
+
+            try:
+                if engine == "async":
+                    from kodexa_cli.aio import AsyncPlatformClient, run_async_bulk
+
+                    async_client = AsyncPlatformClient(url, token, max_connections=concurrency)
+                    run_async_bulk(
+                        "query", enumerate(document_families), process_family_async, describe_family,
+                        concurrency=concurrency, retries=0, on_error=report_error, summary=summary,
+                        on_complete=async_client.close,
+                    )
+                else:
+                    run_bulk(
+                        "query", enumerate(document_families), process_family, describe_family,
+                        threads=threads if limiter is None else limiter.max_limit, retries=0,
+                        max_in_flight=max_in_flight, summary=summary, on_error=report_error, limiter=limiter,
+                    )
+                    if limiter is not None:
+                        print(f"Adaptive concurrency finished at {limiter.current} threads (peak {limiter.peak})")
+                if batcher is not None:
+                    batcher.flush()
+                    print(f"Submitted {batcher.submitted} document families for reprocessing in {batcher.batches} "
+                          f"batches ({batcher.skipped_locked} locked)")
+            finally:
+                if download_pool is not None:
+                    download_pool.shutdown()
+                if manifest is not None:
+                    manifest.close()
+                if checkpoint is not None:
+                    checkpoint.close()
+
+            if summary.operations or summary.failed:
+                print_query_summary(summary)
+                if summary.failed or summary.operations_failed:
+                    exit(1)
 
         else:
             raise Exception("Unable to find document store with ref " + ref)
@@ -1202,9 +1955,9 @@ def query(
 @cli.command()
 @click.argument("project_id", required=True)
 @click.option(
-    "--url", default=get_current_kodexa_url(), help="The URL to the Kodexa server"
+    "--url", default=get_current_kodexa_url, help="The URL to the Kodexa server"
 )
-@click.option("--token", default=get_current_access_token(), help="Access token")
+@click.option("--token", default=get_current_access_token, help="Access token")
 @click.option("--output", help="The path to export to")
 @pass_info
 def export_project(_: Info, project_id: str, url: str, token: str, output: str) -> None:
@@ -1244,9 +1997,9 @@ def export_project(_: Info, project_id: str, url: str, token: str, output: str)
 @cli.command()
 @click.argument("path", required=True)
 @click.option(
-    "--url", default=get_current_kodexa_url(), help="The URL to the Kodexa server"
+    "--url", default=get_current_kodexa_url, help="The URL to the Kodexa server"
 )
-@click.option("--token", default=get_current_access_token(), help="Access token")
+@click.option("--token", default=get_current_access_token, help="Access token")
 @pass_info
 def import_project(_: Info, path: str, url: str, token: str) -> None:
     """Import a project and associated resources from a local zip file.
@@ -1280,9 +2033,9 @@ def import_project(_: Info, path: str, url: str, token: str) -> None:
 @cli.command()
 @click.argument("project_id", required=True)
 @click.option(
-    "--url", default=get_current_kodexa_url(), help="The URL to the Kodexa server"
+    "--url", default=get_current_kodexa_url, help="The URL to the Kodexa server"
 )
-@click.option("--token", default=get_current_access_token(), help="Access token")
+@click.option("--token", default=get_current_access_token, help="Access token")
 @pass_info
 def bootstrap(_: Info, project_id: str, url: str, token: str) -> None:
     """Bootstrap a new project with default structure and configuration.
@@ -1321,9 +2074,9 @@ def bootstrap(_: Info, project_id: str, url: str, token: str) -> None:
 @click.argument("manifest_path", required=True)
 @click.argument("command", type=click.Choice(["deploy", "undeploy", "sync"]), default="deploy")
 @click.option(
-    "--url", default=get_current_kodexa_url(), help="The URL to the Kodexa server"
+    "--url", default=get_current_kodexa_url, help="The URL to the Kodexa server"
 )
-@click.option("--token", default=get_current_access_token(), help="Access token")
+@click.option("--token", default=get_current_access_token, help="Access token")
 @pass_info
 def manifest(
         _: Info,
@@ -1383,9 +2136,9 @@ def manifest(
 @click.option("--type", required=True, help="The type of event")
 @click.option("--data", required=True, help="The data for the event")
 @click.option(
-    "--url", default=get_current_kodexa_url(), help="The URL to the Kodexa server"
+    "--url", default=get_current_kodexa_url, help="The URL to the Kodexa server"
 )
-@click.option("--token", default=get_current_access_token(), help="Access token")
+@click.option("--token", default=get_current_access_token, help="Access token")
 @pass_info
 def send_event(
         _: Info,
@@ -1528,9 +2281,9 @@ def platform(_: Info, python: bool, show_token: bool) -> None:
 @cli.command()
 @click.argument("ref")
 @click.option(
-    "--url", default=get_current_kodexa_url(), help="The URL to the Kodexa server"
+    "--url", default=get_current_kodexa_url, help="The URL to the Kodexa server"
 )
-@click.option("--token", default=get_current_access_token(), help="Access token")
+@click.option("--token", default=get_current_access_token, help="Access token")
 @click.option("-y", "--yes", is_flag=True, help="Don't ask for confirmation")
 @pass_info
 def delete(_: Info, ref: str, url: str, token: str, yes: bool) -> None:
@@ -1774,6 +2527,65 @@ def profiles(_: Info) -> None:
         sys.exit(1)
 
 
+@cli.command()
+@click.argument("command", type=click.Choice(["stats", "clear"]), default="stats")
+@click.option("--cache-max-mb", default=None, type=float,
+              help="Size limit of the object cache in MB (defaults to the profile's 'cache_max_mb' setting, or 50)")
+@pass_info
+def cache(info: Info, command: str, cache_max_mb: Optional[float] = None) -> None:
+    """Inspect or clear the local object cache.
+
+    The cache is used by 'kodexa get --cache' to avoid fetching the same objects
+    from the platform over and over again.
+
+    Arguments:
+        COMMAND: Operation to perform (stats/clear)
+
+    Examples:
+        # Show the size of the cache and its hit rate
+        kodexa cache
+
+        # Remove everything from the cache
+        kodexa cache clear
+    """
+    from kodexa_cli.cache import ObjectCache
+
+    try:
+        object_cache = ObjectCache(max_bytes=cache_max_bytes(info.profile, cache_max_mb))
+        try:
+            if command == "clear":
+                object_cache.clear()
+                print("Object cache cleared")
+                return
+
+            stats = object_cache.stats()
+        finally:
+            object_cache.close()
+
+        from rich.table import Table
+        from rich.console import Console
+
+        table = Table(title="Object Cache", title_style="bold blue")
+        table.add_column("Property", style="cyan")
+        table.add_column("Value", style="white")
+        table.add_row("Location", stats["path"])
+        table.add_row("Entries", f"{stats['entries']:,}")
+        table.add_row("Size", f"{stats['size']:,} of {stats['max_size']:,} bytes")
+        table.add_row("Hits", f"{stats['hits']:,}")
+        table.add_row("Revalidated", f"{stats['revalidations']:,}")
+        table.add_row("Misses", f"{stats['misses']:,}")
+        table.add_row("Evictions", f"{stats['evictions']:,}")
+        table.add_row("Hit Rate", f"{stats['hit_rate']:.1%}")
+        Console().print(table)
+    except Exception as e:
+        print_error_message(
+            "Cache Error",
+            "Could not access the object cache.",
+            str(e)
+        )
+        sys.exit(1)
+
+
 @cli.command()
 @click.option(
     "--path",
@@ -1805,6 +2617,36 @@ def profiles(_: Info) -> None:
     help="Determine whether to update the resources to match the resource pack version",
 )
 @click.option("--helm/--no-helm", default=False, help="Generate a helm chart")
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="Reuse a model implementation already packaged from the same sources",
+)
+@click.option(
+    "--jobs",
+    default=1,
+    type=click.IntRange(1),
+    help="Number of resources packaged at once, each in its own process",
+)
+@click.option(
+    "--compression-level",
+    default=6,
+    type=click.IntRange(0, 9),
+    help="Deflate level of model implementation files, from 1 (fastest) to 9 (smallest), or 0 to store them",
+)
+@click.option(
+    "--store-suffix",
+    "store_suffixes",
+    multiple=True,
+    help="Store files with this suffix without compressing them, as already compressed files (.zip, .gz, .png, "
+         ".pt, ...) are",
+)
+@click.option(
+    "--compress-threads",
+    default=1,
+    type=click.IntRange(1),
+    help="Number of threads compressing large model implementation files",
+)
 @click.argument("files", nargs=-1)
 @pass_info
 def package(
@@ -1818,12 +2660,23 @@ def package(
         repository: str = "kodexa",
         strip_version_build: bool = False,
         update_resource_versions: bool = True,
+        cache: bool = True,
+        jobs: int = 1,
+        compression_level: int = 6,
+        store_suffixes: tuple[str] = (),
+        compress_threads: int = 1,
 ) -> None:
     """Package Kodexa components for deployment.
     
     Creates deployment packages from kodexa.yml definitions, including support
     for extension packs, model stores, and other component types. Can generate
     Helm charts for Kubernetes deployments.
+
+    Model implementations are fingerprinted from the model definition and the content
+    of their files, which also becomes the model's state hash. An implementation
+    already packaged in the output folder from the same fingerprint is reused rather
+    than rebuilt. Implementation zips are reproducible: the same sources always give
+    a byte-identical zip.
     
     Arguments:
         FILES: Optional list of kodexa.yml files to package (default: kodexa.yml)
@@ -1837,6 +2690,9 @@ def package(
         
         # Package multiple components
         kodexa package assistant.yml model.yml store.yml
+
+        # Package every model in a monorepo, eight at a time
+        kodexa package models/*/kodexa.yml --jobs 8
         
         # Generate Helm chart for Kubernetes
         kodexa package --helm --package-name my-app --version 1.0.0
@@ -1850,9 +2706,14 @@ def package(
     if files is None or len(files) == 0:
         files = ["kodexa.yml"]
 
-    packaged_resources = []
+    from kodexa_cli.archive import DEFAULT_STORED_SUFFIXES, CompressionPolicy
+    from kodexa_cli.packaging import BuildCache, is_model_store, package_resource
+
+    resources = []
+    metadata_obj = {}
 
     for file in files:
+        metadata_file = os.path.join(path, file)
         metadata_obj = MetadataHelper.load_metadata(path, file)
 
         if "type" not in metadata_obj:
@@ -1861,13 +2722,7 @@ def package(
 
         print("Processing ", file)
 
-        try:
-            os.makedirs(output)
-        except OSError as e:
-            import errno
-
-            if e.errno != errno.EEXIST:
-                raise
+        os.makedirs(output, exist_ok=True)
 
         if update_resource_versions:
             if strip_version_build:
@@ -1882,36 +2737,45 @@ def package(
             else:
                 metadata_obj["version"] = version if version is not None else "1.0.0"
 
-        unversioned_metadata = os.path.join(output, "kodexa.json")
+        # Model implementations are relative to their kodexa.yml, wherever we are run from
+        resources.append((file, metadata_obj, os.path.dirname(os.path.abspath(metadata_file)), output))
 
-        def build_json():
-            versioned_metadata = os.path.join(
-                output,
-                f"{metadata_obj['type']}-{metadata_obj['slug']}-{metadata_obj['version']}.json",
-            )
-            with open(versioned_metadata, "w") as outfile:
-                json.dump(metadata_obj, outfile)
+    if not resources:
+        return
 
-            copyfile(versioned_metadata, unversioned_metadata)
-            return Path(versioned_metadata).name
+    build_cache = BuildCache(output)
+    options = (
+        build_cache if cache else None,
+        CompressionPolicy(compression_level, DEFAULT_STORED_SUFFIXES + tuple(store_suffixes)),
+        compress_threads,
+    )
+    if jobs > 1 and len(resources) > 1:
+        from concurrent.futures import ProcessPoolExecutor
 
-        if "type" not in metadata_obj:
-            metadata_obj["type"] = "extensionPack"
+        with ProcessPoolExecutor(max_workers=min(jobs, len(resources))) as executor:
+            futures = [executor.submit(package_resource, *resource, *options) for resource in resources]
+            results = [future.result() for future in futures]
+    else:
+        results = [package_resource(*resource, *options) for resource in resources]
 
-        if metadata_obj["type"] == "extensionPack":
-            if "source" in metadata_obj and "location" in metadata_obj["source"]:
-                metadata_obj["source"]["location"] = metadata_obj["source"][
-                    "location"
-                ].format(**metadata_obj)
-            build_json()
+    packaged_resources = []
+    unversioned_metadata = os.path.join(output, "kodexa.json")
 
+    for result in results:
+        metadata_obj = result.metadata_obj
+        for message in result.messages:
+            print(message)
+        copyfile(result.metadata_path, unversioned_metadata)
+        if result.implementation is not None:
+            build_cache.record(result.build_key, result.implementation)
+
+        if metadata_obj["type"] == "extensionPack":
             if helm:
                 # We will generate a helm chart using a template chart using the JSON we just created
                 import subprocess
 
-                unversioned_metadata = os.path.join(output, "kodexa.json")
                 copyfile(
-                    unversioned_metadata,
+                    result.metadata_path,
                     f"{os.path.dirname(get_path())}/charts/extension-pack/resources/extension.json",
                 )
 
@@ -1946,45 +2810,18 @@ def package(
 
             print("Extension pack has been packaged :tada:")
 
-        elif (
-                metadata_obj["type"].upper() == "STORE"
-                and metadata_obj["storeType"].upper() == "MODEL"
-        ):
-            model_content_metadata = ModelContentMetadata.model_validate(
-                metadata_obj["metadata"]
-            )
-
-            import uuid
-
-            model_content_metadata.state_hash = str(uuid.uuid4())
-            metadata_obj["metadata"] = model_content_metadata.model_dump(by_alias=True)
-            name = build_json()
-
-            # We need to work out the parent directory
-            parent_directory = os.path.dirname(file)
-            print("Going to build the implementation zip in", parent_directory)
-            with set_directory(Path(parent_directory)):
-                # This will create the implementation.zip - we will then need to change the filename
-                ModelStoreEndpoint.build_implementation_zip(model_content_metadata)
-                versioned_implementation = os.path.join(
-                    output,
-                    f"{metadata_obj['type']}-{metadata_obj['slug']}-{metadata_obj['version']}.zip",
-                )
-                copyfile("implementation.zip", versioned_implementation)
-
-                # Delete the implementation
-                os.remove("implementation.zip")
-
+        elif is_model_store(metadata_obj):
             print(
                 f"Model has been prepared {metadata_obj['type']}-{metadata_obj['slug']}-{metadata_obj['version']}"
             )
-            packaged_resources.append(name)
+            packaged_resources.append(result.name)
         else:
             print(
                 f"{metadata_obj['type']}-{metadata_obj['slug']}-{metadata_obj['version']} has been prepared"
             )
-            name = build_json()
-            packaged_resources.append(name)
+            packaged_resources.append(result.name)
+
+    build_cache.save()
 
     if len(packaged_resources) > 0:
         if helm:
@@ -2067,15 +2904,32 @@ def package(
 @click.argument("ref", required=True)
 @click.argument("paths", required=True, nargs=-1)
 @click.option(
-    "--url", default=get_current_kodexa_url(), help="The URL to the Kodexa server"
+    "--url", default=get_current_kodexa_url, help="The URL to the Kodexa server"
 )
-@click.option("--threads", default=5, help="Number of threads to use")
-@click.option("--token", default=get_current_access_token(), help="Access token")
+@click.option("--threads", default=5, type=ThreadCount(),
+              help="Number of threads to use, or 'auto' to adapt to the platform")
+@click.option("--token", default=get_current_access_token, help="Access token")
 @click.option("--external-data/--no-external-data", default=False,
               help="Look for a .json file that has the same name as the upload and attach this as external data")
+@click.option("--engine", type=click.Choice(["threads", "async"]), default="threads",
+              help="Run the uploads on a thread pool or on an asyncio connection pool")
+@click.option("--concurrency", default=50, help="Number of uploads in flight (async engine only)", type=int)
+@click.option("--retries", default=None, type=click.IntRange(0),
+              help="Number of times to retry an upload that failed with a transient error (defaults to the retry "
+                   "policy's)")
+@click.option("--journal/--no-journal", default=True,
+              help="Skip files the journal shows are already uploaded to this store, and record new uploads")
+@click.option("--dedupe/--no-dedupe", default=False, help="Skip files with the same content as one already uploaded")
+@click.option("--dedupe-store/--no-dedupe-store", default=False,
+              help="With --dedupe, also skip content the journal shows is already in the store (from any path)")
+@click.option("--dedupe-processes", default=None, help="Number of processes hashing files (defaults to the CPUs)",
+              type=int)
+@click.option("--metrics-json", default=None, help="Write the upload throughput and latency metrics to this file")
 @pass_info
-def upload(_: Info, ref: str, paths: list[str], token: str, url: str, threads: int,
-           external_data: bool = False) -> None:
+def upload(_: Info, ref: str, paths: list[str], token: str, url: str, threads: int | str,
+           external_data: bool = False, engine: str = "threads", concurrency: int = 50, retries: Optional[int] = None,
+           journal: bool = True, dedupe: bool = False, dedupe_store: bool = False,
+           dedupe_processes: Optional[int] = None, metrics_json: Optional[str] = None) -> None:
     """Upload files to a document store.
     
     Uploads one or more files to a specified document store for processing.
@@ -2083,7 +2937,7 @@ def upload(_: Info, ref: str, paths: list[str], token: str, url: str, threads: i
     
     Arguments:
         REF: Reference to the target document store (e.g., 'org-slug/store-slug')
-        PATHS: One or more file paths to upload
+        PATHS: Files, directories or (quoted) glob patterns to upload
     
     Examples:
         # Upload a single file
@@ -2098,52 +2952,111 @@ def upload(_: Info, ref: str, paths: list[str], token: str, url: str, threads: i
         
         # Upload with multiple threads for speed
         kodexa upload my-org/my-store /path/to/files/* --threads 10
+
+        # Let the number of threads adapt to the file sizes and platform load
+        kodexa upload my-org/my-store /path/to/files --threads auto
+
+        # Upload thousands of files over a pool of keep-alive connections
+        kodexa upload my-org/my-store /path/to/files/* --engine async --concurrency 200
         
         # Upload all PDFs in a directory
         kodexa upload my-org/documents ~/Documents/*.pdf
+
+        # Upload everything under a directory, or every PDF beneath it
+        kodexa upload my-org/documents ~/Documents
+        kodexa upload my-org/documents '~/Documents/**/*.pdf'
+
+        # Skip scans that appear more than once under different names
+        kodexa upload my-org/documents ~/Scans --dedupe
+
+        # Record throughput and latency so CI can trend ingest performance
+        kodexa upload my-org/documents ~/Scans --metrics-json upload-metrics.json
+
+        # Upload again, even the files the journal shows are already in the store
+        kodexa upload my-org/documents ~/Documents/*.pdf --no-journal
     """
 
     if not config_check(url, token):
         return
 
+    if dedupe_store and not (dedupe and journal):
+        print("--dedupe-store needs --dedupe and the upload journal")
+        sys.exit(1)
+
     try:
         client = KodexaClient(url=url, access_token=token)
         document_store = client.get_object_by_ref("store", ref)
 
         from kodexa.platform.client import DocumentStoreEndpoint
 
-        print(f"Uploading {len(paths)} files to {ref}\n")
         if isinstance(document_store, DocumentStoreEndpoint):
-            from rich.progress import track
+            from rich.progress import BarColumn, MofNCompleteColumn, TextColumn, TimeElapsedColumn
+
+            from kodexa_cli.metrics import MetricsProgress, UploadMetrics
+            from kodexa_cli.walk import enqueue_files
+
+            upload_journal = None
+            if journal:
+                from kodexa_cli.journal import UploadJournal
+
+                upload_journal = UploadJournal(url, document_store.ref)
+
+            print(f"Uploading files to {ref}\n")
+            metrics = UploadMetrics()
+            with MetricsProgress(
+                    TextColumn("[progress.description]{task.description}"), BarColumn(), MofNCompleteColumn(),
+                    TimeElapsedColumn(), metrics=metrics
+            ) as progress:
+                task = progress.add_task("Uploading files", total=None)
+                # The total grows as the directories and patterns are walked, ahead of the uploads
+                files = enqueue_files(paths, skip_json=external_data,
+                                      on_found=lambda count: progress.update(task, total=count))
+                deduplicator = None
+                if dedupe:
+                    from kodexa_cli.dedupe import Deduplicator
+
+                    def skip_duplicate(path, reason):
+                        print(f"Skipping {path}, {reason}")
+                        progress.advance(task)
+
+                    deduplicator = Deduplicator(
+                        dedupe_processes,
+                        is_known=upload_journal.has_hash if dedupe_store and upload_journal is not None else None,
+                        on_skip=skip_duplicate,
+                    )
+                    files = deduplicator.filter(files)
+                if engine == "async":
+                    summary = upload_files_async(
+                        document_store.ref, url, token, files, external_data, concurrency, retries=retries,
+                        journal=upload_journal, on_done=lambda path: progress.advance(task), metrics=metrics,
+                        content_hash=deduplicator.content_hash if deduplicator is not None else None
+                    )
+                else:
+                    limiter = make_limiter(threads)
+                    summary = upload_files(
+                        document_store, files, external_data, threads, retries=retries, journal=upload_journal,
+                        on_done=lambda path: progress.advance(task), metrics=metrics, limiter=limiter,
+                        content_hash=deduplicator.content_hash if deduplicator is not None else None
+                    )
+                    if limiter is not None:
+                        print(f"Adaptive concurrency finished at {limiter.current} threads (peak {limiter.peak})")
 
-            def upload_file(path, external_data):
-                try:
-                    if external_data:
-                        external_data_path = f"{os.path.splitext(path)[0]}.json"
-                        if os.path.exists(external_data_path):
-                            with open(external_data_path, "r") as f:
-                                external_data = json.load(f)
-                                document_store.upload_file(path, external_data=external_data)
-                                return f"Successfully uploaded {path} with external data {json.dumps(external_data)}"
-                        else:
-                            return f"External data file not found for {path}"
-                    else:
-                        document_store.upload_file(path)
-                        return f"Successfully uploaded {path}"
-                except Exception as e:
-                    return f"Error uploading {path}: {e}"
-
-            from concurrent.futures import ThreadPoolExecutor
-
-            # Using ThreadPoolExecutor
-            with ThreadPoolExecutor(max_workers=threads) as executor:
-                upload_args = [(path, external_data) for path in paths]
-                for result in track(
-                        executor.map(lambda args: upload_file(*args), upload_args),
-                        total=len(paths),
-                        description="Uploading files",
-                ):
-                    print(result)
+            if upload_journal is not None:
+                upload_journal.close()
+            print(f"\nUploaded {summary.succeeded} files ({summary.failed} failed) in {summary.elapsed:.1f}s")
+            if deduplicator is not None:
+                print(
+                    f"Skipped {deduplicator.duplicates} duplicate files "
+                    f"({deduplicator.bytes_saved / (1024 * 1024):.1f} MB saved)"
+                )
+            if metrics_json is not None:
+                upload_metrics = metrics.to_dict()
+                if deduplicator is not None:
+                    upload_metrics["duplicates"] = deduplicator.duplicates
+                    upload_metrics["bytesSaved"] = deduplicator.bytes_saved
+                with open(metrics_json, "w") as f:
+                    json.dump(upload_metrics, f, indent=4)
+                print(f"Metrics written to {metrics_json}")
             print("Upload complete :tada:")
         else:
             print(f"{ref} is not a document store")
@@ -2160,14 +3073,18 @@ def upload(_: Info, ref: str, paths: list[str], token: str, url: str, threads: i
 @click.argument("files", nargs=-1)
 @click.option("--org", help="Organization slug")
 @click.option(
-    "--url", default=get_current_kodexa_url(), help="The URL to the Kodexa server"
+    "--url", default=get_current_kodexa_url, help="The URL to the Kodexa server"
 )
-@click.option("--token", default=get_current_access_token(), help="Access token")
+@click.option("--token", default=get_current_access_token, help="Access token")
 @click.option("--format", help="Format of input if from stdin (json, yaml)")
 @click.option("--update/--no-update", default=False, help="Update existing components")
 @click.option("--version", help="Override version for component")
 @click.option("--overlay", help="JSON/YAML file to overlay metadata")
 @click.option("--slug", help="Override slug for component")
+@click.option("--parallel", default=4, type=click.IntRange(1), help="Number of components deployed at once")
+@click.option("--skip-unchanged/--no-skip-unchanged", default=False,
+              help="Compare with the deployed components and only deploy those that changed")
+@click.option("--plan", "plan_only", is_flag=True, help="Show what would be created or updated, without deploying")
 @pass_info
 def deploy(
         _: Info,
@@ -2180,11 +3097,22 @@ def deploy(
         version: Optional[str] = None,
         overlay: Optional[str] = None,
         slug: Optional[str] = None,
+        parallel: int = 4,
+        skip_unchanged: bool = False,
+        plan_only: bool = False,
 ) -> None:
     """Deploy components to a Kodexa platform instance.
     
     Deploy one or more components (assistants, stores, models, etc.) from JSON/YAML
     files or stdin. Supports batch deployment and metadata overlays for customization.
+
+    Components are deployed concurrently (up to --parallel at once), each after the components
+    it references and those of the kinds it builds on (taxonomies and stores before data forms
+    and assistants, for instance). If a component fails, those depending on it are skipped.
+
+    With --skip-unchanged (or --plan), each component is first compared with the deployed one
+    and the plan of what will be created, updated or left unchanged is shown; unchanged
+    components are not sent again.
     
     Arguments:
         FILES: One or more component definition files (JSON/YAML). If omitted, reads from stdin.
@@ -2195,9 +3123,16 @@ def deploy(
         
         # Deploy multiple components
         kodexa deploy *.yaml --org my-org
+
+        # Deploy a whole environment, ten components at a time
+        kodexa deploy components/*.yaml --update --parallel 10
         
         # Update existing component
         kodexa deploy model.json --update
+
+        # Only update the components that changed, or just show what would change
+        kodexa deploy components/*.yaml --update --skip-unchanged
+        kodexa deploy components/*.yaml --plan
         
         # Deploy with version override
         kodexa deploy assistant.yaml --version 2.0.0
@@ -2212,100 +3147,103 @@ def deploy(
     if not config_check(url, token):
         return
 
-    client = KodexaClient(access_token=token, url=url)
+    from kodexa_cli.deployment import component_ref, deploy_components
 
-    def deploy_obj(obj):
-        if "deployed" in obj:
-            del obj["deployed"]
+    client = KodexaClient(access_token=token, url=url)
 
-        overlay_obj = None
+    def read_definition(source, file_format):
+        if file_format == "json":
+            return json.load(source)
+        if file_format in ("yaml", "yml"):
+            return yaml.safe_load(source)
+        raise Exception("Unsupported file type")
+
+    overlay_obj = None
+    if overlay is not None:
+        print("Reading overlay")
+        if not overlay.endswith(("json", "yaml", "yml")):
+            raise Exception(
+                "Unable to determine the format of the overlay file, must be .json or .yml/.yaml"
+            )
+        with open(overlay, "r", encoding="utf-8") as f:
+            overlay_obj = read_definition(f, overlay.rsplit(".", 1)[-1].lower())
 
-        if overlay is not None:
-            print("Reading overlay")
-            if overlay.endswith("yaml") or overlay.endswith("yml"):
-                overlay_obj = yaml.safe_load(sys.stdin.read())
-            elif overlay.endswith("json"):
-                overlay_obj = json.loads(sys.stdin.read())
-            else:
-                raise Exception(
-                    "Unable to determine the format of the overlay file, must be .json or .yml/.yaml"
-                )
+    components = []
 
+    def add_definition(obj):
         if isinstance(obj, list):
             print(f"Found {len(obj)} components")
-            for o in obj:
-                if overlay_obj:
-                    o = merge(o, overlay_obj)
+            definitions = obj
+        else:
+            definitions = [obj]
+        for definition in definitions:
+            definition.pop("deployed", None)
+            if overlay_obj:
+                definition = merge(definition, copy.deepcopy(overlay_obj))
+            if not isinstance(obj, list):
+                if version is not None:
+                    definition["version"] = version
+                if slug is not None:
+                    definition["slug"] = slug
+            if org is not None:
+                definition["orgSlug"] = org
+            components.append(definition)
 
-                component = client.deserialize(o)
-                if org is not None:
-                    component.org_slug = org
-                print(
-                    f"Deploying component {component.slug}:{component.version} to {client.get_url()}"
-                )
-                from datetime import datetime
+    if files:
+        for file in files:
+            with open(file, "r", encoding="utf-8") as f:
+                add_definition(read_definition(f, file.rsplit(".", 1)[-1].lower()))
+    else:
+        print("Reading from stdin")
+        if format not in ("json", "yaml", "yml"):
+            raise Exception("You must provide a format if using stdin")
+        add_definition(read_definition(sys.stdin, format))
 
-                start = datetime.now()
-                component.deploy(update=update)
-                from datetime import datetime
+    unchanged = set()
+    if skip_unchanged or plan_only:
+        from kodexa_cli.deployment import DeployPlanner, format_plan
+        from kodexa_cli.sessions import KeepAliveClient
 
-                print(
-                    f"Deployed at {datetime.now()}, took {datetime.now() - start} seconds"
-                )
+        plan = DeployPlanner(client, KeepAliveClient(url, token), parallel=parallel).plan(components)
+        for line in format_plan(plan):
+            print(line)
+        if plan_only:
+            return
+        unchanged = {id(definition) for definition, planned in zip(components, plan)
+                     if planned.action == "unchanged"}
 
-        else:
-            if overlay_obj:
-                obj = merge(obj, overlay_obj)
+    from rich.progress import Progress
 
-            component = client.deserialize(obj)
+    with Progress() as progress:
+        task = progress.add_task(f"Deploying {len(components)} components", total=len(components))
 
-            if version is not None:
-                component.version = version
-            if slug is not None:
-                component.slug = slug
-            if org is not None:
-                component.org_slug = org
-            print(f"Deploying component {component.slug}:{component.version}")
+        def deployed(definition, error):
+            progress.advance(task)
+            ref = component_ref(definition) or definition.get("name", "component")
+            if error is not None:
+                progress.console.print(f"[red]Failed to deploy {ref}: {error}[/red]")
+
+        def deploy_component(definition):
+            if id(definition) in unchanged:
+                return
+            component = client.deserialize(definition)
+            start = time.monotonic()
             log_details = component.deploy(update=update)
-            for log_detail in log_details:
-                print(log_detail)
+            ref = component_ref(definition) or definition.get("name", "component")
+            progress.console.print(f"Deployed {ref} to {url}, took {time.monotonic() - start:.2f}s")
+            for log_detail in log_details or []:
+                progress.console.print(log_detail)
 
-    if files is not None:
-        from rich.progress import track
+        summary = deploy_components(components, deploy_component, parallel=parallel, on_done=deployed)
 
-        for idx in track(
-                range(len(files)), description=f"Deploying {len(files)} files"
-        ):
-            obj = {}
-            file = files[idx]
-            with open(file, "r", encoding="utf-8") as f:
-                if file.lower().endswith(".json"):
-                    obj.update(json.load(f))
-                elif file.lower().endswith(".yaml") or file.lower().endswith(".yml"):
-                    obj.update(yaml.safe_load(f))
-                else:
-                    raise Exception("Unsupported file type")
-
-                deploy_obj(obj)
-    elif files is None:
-        print("Reading from stdin")
-        if format == "yaml" or format == "yml":
-            obj = yaml.safe_load(sys.stdin.read())
-        elif format == "json":
-            obj = json.loads(sys.stdin.read())
-        else:
-            raise Exception("You must provide a format if using stdin")
-
-        deploy_obj(obj)
-    else:
-        print("Reading from file", file)
-        with open(file, "r", encoding="utf-8") as f:
-            if file.lower().endswith(".json"):
-                obj = json.load(f)
-            elif file.lower().endswith(".yaml") or file.lower().endswith(".yml"):
-                obj = yaml.safe_load(f)
-            else:
-                raise Exception("Unsupported file type")
+    if summary.failed:
+        print_error_message(
+            "Deployment failed",
+            f"Deployed {summary.succeeded} of {len(components)} components, {summary.failed} failed or were "
+            f"skipped.",
+            "\n".join(f"{error['id']}: {error['error']}" for error in summary.errors),
+        )
+        sys.exit(1)
 
     print("Deployed :tada:")
 
@@ -2313,9 +3251,9 @@ def deploy(
 @cli.command()
 @click.argument("execution_id", required=True)
 @click.option(
-    "--url", default=get_current_kodexa_url(), help="The URL to the Kodexa server"
+    "--url", default=get_current_kodexa_url, help="The URL to the Kodexa server"
 )
-@click.option("--token", default=get_current_access_token(), help="Access token")
+@click.option("--token", default=get_current_access_token, help="Access token")
 @pass_info
 def logs(_: Info, execution_id: str, url: str, token: str) -> None:
     """Retrieve execution logs for debugging and monitoring.
@@ -2349,9 +3287,9 @@ def logs(_: Info, execution_id: str, url: str, token: str) -> None:
 @click.argument("ref", required=True)
 @click.argument("output_file", required=False, default="model_implementation")
 @click.option(
-    "--url", default=get_current_kodexa_url(), help="The URL to the Kodexa server"
+    "--url", default=get_current_kodexa_url, help="The URL to the Kodexa server"
 )
-@click.option("--token", default=get_current_access_token(), help="Access token")
+@click.option("--token", default=get_current_access_token, help="Access token")
 @pass_info
 def download_implementation(_: Info, ref: str, output_file: str, url: str, token: str) -> None:
     """Download the implementation package of a model store.
@@ -2393,9 +3331,9 @@ def download_implementation(_: Info, ref: str, output_file: str, url: str, token
 @cli.command()
 @click.argument("path", required=True)
 @click.option(
-    "--url", default=get_current_kodexa_url(), help="The URL to the Kodexa server"
+    "--url", default=get_current_kodexa_url, help="The URL to the Kodexa server"
 )
-@click.option("--token", default=get_current_access_token(), help="Access token")
+@click.option("--token", default=get_current_access_token, help="Access token")
 @pass_info
 def validate_manifest(_: Info, path: str, url: str, token: str) -> None:
     """Validate a Kodexa manifest file.
@@ -2448,12 +3386,12 @@ def validate_manifest(_: Info, path: str, url: str, token: str) -> None:
 )
 @click.option(
     "--url", 
-    default=get_current_kodexa_url(), 
+    default=get_current_kodexa_url,
     help="The URL to the Kodexa server"
 )
 @click.option(
     "--token", 
-    default=get_current_access_token(), 
+    default=get_current_access_token,
     help="Access token"
 )
 @pass_info
@@ -2617,9 +3555,9 @@ def model_costs(
 @cli.command()
 @click.argument("path", required=True)
 @click.option(
-    "--url", default=get_current_kodexa_url(), help="The URL to the Kodexa server"
+    "--url", default=get_current_kodexa_url, help="The URL to the Kodexa server"
 )
-@click.option("--token", default=get_current_access_token(), help="Access token")
+@click.option("--token", default=get_current_access_token, help="Access token")
 @pass_info
 def deploy_manifest(_: Info, path: str, url: str, token: str) -> None:
     """Deploy resources defined in a manifest file.
@@ -2655,9 +3593,9 @@ def deploy_manifest(_: Info, path: str, url: str, token: str) -> None:
 @cli.command()
 @click.argument("project_id", required=True)
 @click.option(
-    "--url", default=get_current_kodexa_url(), help="The URL to the Kodexa server"
+    "--url", default=get_current_kodexa_url, help="The URL to the Kodexa server"
 )
-@click.option("--token", default=get_current_access_token(), help="Access token")
+@click.option("--token", default=get_current_access_token, help="Access token")
 @pass_info
 def get_project_template(_: Info, project_id: str, url: str, token: str) -> None:
     """Get a project template.
@@ -2681,4 +3619,73 @@ def get_project_template(_: Info, project_id: str, url: str, token: str) -> None
             "Could not get project template for project ID: " + project_id,
             str(e)
         )
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+@cli.command()
+@click.option("--scenario", "scenarios", multiple=True, type=click.Choice(["get", "query", "upload", "deploy"]),
+              help="Scenario to run (repeat for several, defaults to all)")
+@click.option("--latency", default=20.0, type=click.FloatRange(0), help="Milliseconds added to every request")
+@click.option("--page-size", default=100, type=click.IntRange(1), help="Page size the listings are streamed with")
+@click.option("--items", default=1000, type=click.IntRange(1),
+              help="Number of objects listed by get and document families listed by query")
+@click.option("--files", default=100, type=click.IntRange(1), help="Number of files uploaded")
+@click.option("--file-size", default=64 * 1024, type=click.IntRange(0), help="Size in bytes of each uploaded file")
+@click.option("--components", default=20, type=click.IntRange(1), help="Number of components deployed")
+@click.option("--threads", default=5, type=click.IntRange(1), help="Number of threads the commands use")
+@click.option("--format", "output_format", default="table", type=click.Choice(["table", "json"]),
+              help="Output format")
+@click.option("--output-file", default=None, help="Also write the results as JSON to this file")
+@pass_info
+def bench(_: Info, scenarios: tuple[str], latency: float, page_size: int, items: int, files: int, file_size: int,
+          components: int, threads: int, output_format: str, output_file: Optional[str]) -> None:
+    """Measure the throughput and latency of the bulk commands against a local mock platform.
+
+    Each scenario runs a real command (get --stream, query --stream, upload or deploy) in-process against a
+    stand-in for the platform on localhost, which adds the given latency to every request.  Nothing is sent to a
+    real platform, so the numbers can be compared before and after tuning.
+
+    Examples:
+        kodexa bench
+        kodexa bench --scenario query --latency 50 --items 5000 --threads 10
+        kodexa bench --format json --output-file before.json
+    """
+    from kodexa_cli.bench import SCENARIOS, MockPlatform, run_scenario
+
+    results = []
+    try:
+        with MockPlatform(latency=latency / 1000, families=items, objects=items) as platform:
+            for scenario in scenarios or SCENARIOS:
+                result = run_scenario(scenario, platform, page_size=page_size, threads=threads, files=files,
+                                      file_size=file_size, components=components)
+                results.append(result.to_dict())
+    except Exception as e:
+        print_error_message("Benchmark failed", "Could not complete the benchmark.", str(e))
+        sys.exit(1)
+
+    if output_file:
+        with open(output_file, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if output_format == "json":
+        print(json.dumps(results, indent=2))
+        global GLOBAL_IGNORE_COMPLETE
+        GLOBAL_IGNORE_COMPLETE = True
+        return
+
+    from rich.table import Table
+
+    table = Table(title=f"Benchmark ({latency:g}ms latency)", title_style="bold blue")
+    for column in ("Scenario", "Items", "Seconds", "Items/s", "Requests", "Requests/s", "p50 ms", "p95 ms"):
+        table.add_column(column, justify="left" if column == "Scenario" else "right")
+    for result in results:
+        table.add_row(
+            result["scenario"],
+            f"{result['items']:,}",
+            f"{result['seconds']:.2f}",
+            f"{result['itemsPerSecond']:,.1f}",
+            f"{result['requests']:,}",
+            f"{result['requestsPerSecond']:,.1f}",
+            f"{result['latencyMs']['p50']:.1f}",
+            f"{result['latencyMs']['p95']:.1f}",
+        )
+    print(table)
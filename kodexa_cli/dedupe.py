@@ -0,0 +1,106 @@
+"""
+Content-hash deduplication of the files about to be uploaded.
+
+Files are hashed on a process pool, so hashing a large batch isn't held back by the GIL, reading through a
+memory map in blocks so even very large files are never loaded into memory.  The pool's processes are spawned
+rather than forked, as by the time it starts the upload is already running other threads (the directory walker
+and the progress display), and a forked child can deadlock on a lock one of them held.
+"""
+import hashlib
+import mmap
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
+
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def hash_file(path: str) -> tuple[str, int, str]:
+    """Compute the SHA-256 of a file through a memory map.
+
+    Returns:
+        tuple[str, int, str]: The path, its size in bytes and its hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, size, HASH_BLOCK_SIZE):
+                        digest.update(view[offset:offset + HASH_BLOCK_SIZE])
+                finally:
+                    view.release()
+    return path, size, digest.hexdigest()
+
+
+class Deduplicator:
+    """Filters a stream of paths down to the first file with each content hash."""
+
+    def __init__(self, processes: Optional[int] = None, is_known: Optional[Callable[[str], bool]] = None,
+                 on_skip: Optional[Callable[[str, str], None]] = None):
+        """
+        Args:
+            processes (Optional[int]): The number of hashing processes (defaults to the number of CPUs)
+            is_known (Optional[Callable[[str], bool]]): Given a hash, whether that content is already in the store
+            on_skip (Optional[Callable[[str, str], None]]): Called with each skipped path and the reason it was
+                skipped
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.is_known = is_known
+        self.on_skip = on_skip
+        self.seen: dict[str, str] = {}
+        self.hashes: dict[str, str] = {}
+        self.duplicates = 0
+        self.bytes_saved = 0
+
+    def _skip(self, path: str, size: int, reason: str) -> None:
+        self.duplicates += 1
+        self.bytes_saved += size
+        if self.on_skip is not None:
+            self.on_skip(path, reason)
+
+    def filter(self, paths: Iterable[str]) -> Iterator[str]:
+        """Hash the paths, in order, yielding each one whose content hasn't been seen before.
+
+        No more than a few hashes per process are in flight ahead of the consumer, so the paths can be a stream
+        of any length.
+        """
+        window = self.processes * 4
+        pending: deque[Future] = deque()
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.processes, mp_context=context) as executor:
+            for path in paths:
+                pending.append(executor.submit(hash_file, path))
+                if len(pending) >= window:
+                    yield from self._check(pending.popleft())
+            while pending:
+                yield from self._check(pending.popleft())
+
+    def _check(self, future: Future) -> Iterator[str]:
+        try:
+            path, size, content_hash = future.result()
+        except OSError as e:
+            # Leave unreadable files for the upload to report
+            yield e.filename
+            return
+        if content_hash in self.seen:
+            self._skip(path, size, f"duplicate of {self.seen[content_hash]}")
+        elif self.is_known is not None and self.is_known(content_hash):
+            self.seen[content_hash] = path
+            self._skip(path, size, "content already uploaded to the store")
+        else:
+            self.seen[content_hash] = path
+            self.hashes[path] = content_hash
+            yield path
+
+    def content_hash(self, path: str) -> Optional[str]:
+        """Take the hash computed for a path that was let through, so it needn't be hashed again.
+
+        Returns:
+            Optional[str]: The SHA-256 hex digest, or None if the path wasn't hashed (or was already taken)
+        """
+        return self.hashes.pop(path, None)
@@ -0,0 +1,329 @@
+"""
+Deploying many components at once, in dependency order.
+
+Components are deployed concurrently, but a component only starts once everything it depends on has been
+deployed.  A component depends on the others being deployed that it references (any ``org/slug:version``
+string naming one of them, wherever it appears in the definition).  The kind of component orders the work too,
+since some kinds are usually wired to others (stores and taxonomies before the data forms, assistants and
+project templates that use them), so a component also waits for the components of earlier kinds to finish.
+Only references are dependencies, though: if a component fails, whatever references it (directly or not) is
+skipped, while everything else carries on.
+
+Before an update, the components can be planned: the deployed version of each is fetched and compared with the
+local definition, so only those that actually changed are sent (deploying a component triggers work on the
+platform even when nothing changed).
+"""
+import re
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from kodexa_cli.bulk import BulkSummary
+
+# Components of each tier are deployed after every component of the earlier tiers has finished; kinds not listed
+# here go last
+DEPLOY_TIERS = (
+    ("extensionPack", "modelRuntime", "action"),
+    ("taxonomy",),
+    ("store", "dataForm", "guidance", "prompt", "knowledge-item-types", "knowledge-feature-types"),
+    ("pipeline", "assistant", "knowledge-sets", "knowledge-features", "knowledge-items"),
+    ("projectTemplate", "dashboard", "channel", "product"),
+)
+
+# Fields the platform sets on a deployed component, which a local definition never has to match
+SERVER_MANAGED_FIELDS = ("id", "uuid", "ref", "createdOn", "updatedOn", "changeSequence", "deployed")
+
+_REF_PATTERN = re.compile(r"^[\w.-]+/[\w.-]+(:[\w.-]+)?$")
+
+
+def component_ref(component: dict[str, Any]) -> Optional[str]:
+    """The ``org/slug:version`` reference of a component definition, or None if it doesn't have one."""
+    org, slug, version = component.get("orgSlug"), component.get("slug"), component.get("version")
+    if not org or not slug:
+        return None
+    return f"{org}/{slug}:{version}" if version else f"{org}/{slug}"
+
+
+def component_tier(component: dict[str, Any]) -> int:
+    component_type = component.get("type")
+    for tier, types in enumerate(DEPLOY_TIERS):
+        if component_type in types:
+            return tier
+    return len(DEPLOY_TIERS)
+
+
+def referenced_refs(value: Any) -> Iterator[str]:
+    """Find every string in a component definition that looks like a reference to another component."""
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from referenced_refs(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from referenced_refs(item)
+    elif isinstance(value, str) and _REF_PATTERN.match(value):
+        yield value
+
+
+def dependency_graph(components: list[dict[str, Any]]) -> list[set[int]]:
+    """Work out which of the components each one depends on, from the references they make to each other.
+
+    Args:
+        components (list[dict[str, Any]]): The component definitions being deployed
+
+    Returns:
+        list[set[int]]: For each component, the indexes of the components it references
+
+    Raises:
+        Exception: If the components depend on each other in a cycle, or one references a component of a later kind
+    """
+    by_ref: dict[str, int] = {}
+    for index, component in enumerate(components):
+        ref = component_ref(component)
+        if ref is not None:
+            by_ref[ref] = index
+            # References without a version name the component too
+            by_ref.setdefault(ref.split(":")[0], index)
+
+    dependencies = []
+    for index, component in enumerate(components):
+        dependencies.append({by_ref[ref] for ref in referenced_refs(component) if ref in by_ref} - {index})
+
+    _check_acyclic(components, deploy_order(components, dependencies))
+    return dependencies
+
+
+def deploy_order(components: list[dict[str, Any]], dependencies: list[set[int]]) -> list[set[int]]:
+    """Work out which of the components each one is deployed after: those it depends on, and those of earlier kinds.
+
+    Args:
+        components (list[dict[str, Any]]): The component definitions being deployed
+        dependencies (list[set[int]]): The components each one depends on, from ``dependency_graph``
+
+    Returns:
+        list[set[int]]: For each component, the indexes of the components that must finish before it starts
+    """
+    tiers = [component_tier(component) for component in components]
+    return [
+        depends_on | {other for other, tier in enumerate(tiers) if tier < tiers[index]}
+        for index, depends_on in enumerate(dependencies)
+    ]
+
+
+def _check_acyclic(components: list[dict[str, Any]], dependencies: list[set[int]]) -> None:
+    remaining = {index: set(depends_on) for index, depends_on in enumerate(dependencies)}
+    while remaining:
+        ready = [index for index, depends_on in remaining.items() if not depends_on]
+        if not ready:
+            cycle = ", ".join(str(component_ref(components[index]) or index) for index in sorted(remaining))
+            raise Exception(f"The components depend on each other in a cycle: {cycle}")
+        for index in ready:
+            del remaining[index]
+        for depends_on in remaining.values():
+            depends_on.difference_update(ready)
+
+
+def deploy_components(components: list[dict[str, Any]], deploy: Callable[[dict[str, Any]], Any],
+                      parallel: int = 4, on_done: Optional[Callable[[dict[str, Any], Optional[BaseException]], None]]
+                      = None) -> BulkSummary:
+    """Deploy components concurrently, each once the components it is deployed after have finished.
+
+    A component starts once the components of earlier kinds have finished, whether or not they were deployed,
+    and the components it references have been deployed.  If a component fails, the components that reference
+    it are skipped.
+
+    Args:
+        components (list[dict[str, Any]]): The component definitions to deploy
+        deploy (Callable[[dict[str, Any]], Any]): Deploys one component
+        parallel (int): The most components deployed at once
+        on_done (Optional[Callable[[dict[str, Any], Optional[BaseException]], None]]): Called on the calling
+            thread with each component once it is deployed, failed or skipped, and its error if any
+
+    Returns:
+        BulkSummary: The number of components deployed and failed (including skipped), and the errors
+    """
+    dependencies = dependency_graph(components)
+    order = deploy_order(components, dependencies)
+    dependents: list[set[int]] = [set() for _ in components]
+    followers: list[set[int]] = [set() for _ in components]
+    for index in range(len(components)):
+        for other in dependencies[index]:
+            dependents[other].add(index)
+        for other in order[index]:
+            followers[other].add(index)
+    waiting_on = [len(after) for after in order]
+
+    summary = BulkSummary("deploy")
+    start = time.monotonic()
+    finished: set[int] = set()
+    released: list[int] = []
+
+    def describe(index: int) -> str:
+        return component_ref(components[index]) or f"component {index + 1}"
+
+    def finish(index: int, error: Optional[BaseException] = None) -> None:
+        finished.add(index)
+        if error is None:
+            summary.succeeded += 1
+        else:
+            summary.failed += 1
+            summary.errors.append({"id": describe(index), "error": str(error)})
+        if on_done is not None:
+            on_done(components[index], error)
+        for follower in followers[index]:
+            waiting_on[follower] -= 1
+            if waiting_on[follower] == 0:
+                released.append(follower)
+        if error is not None:
+            for dependent in sorted(dependents[index]):
+                if dependent not in finished:
+                    finish(dependent, Exception(f"Skipped, as {describe(index)} could not be deployed"))
+
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as executor:
+        in_flight: dict[Future, int] = {}
+
+        def submit_ready(indexes) -> None:
+            for index in indexes:
+                if waiting_on[index] == 0 and index not in finished:
+                    in_flight[executor.submit(deploy, components[index])] = index
+
+        submit_ready(range(len(components)))
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                finish(in_flight.pop(future), future.exception())
+            submit_ready(sorted(released))
+            released.clear()
+
+    summary.elapsed = time.monotonic() - start
+    return summary
+
+
+def _without_nones(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _without_nones(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [_without_nones(item) for item in value]
+    return value
+
+
+def _restricted_to(deployed: Any, local: Any) -> Any:
+    """Keep only the parts of the deployed value the local definition sets, so server defaults aren't changes."""
+    if isinstance(deployed, dict) and isinstance(local, dict):
+        return {key: _restricted_to(item, local[key]) for key, item in deployed.items() if key in local}
+    if isinstance(deployed, list) and isinstance(local, list) and len(deployed) == len(local):
+        return [_restricted_to(item, local_item) for item, local_item in zip(deployed, local)]
+    return deployed
+
+
+def changed_paths(deployed: dict[str, Any], local: dict[str, Any]) -> list[str]:
+    """Compare a deployed component with its local definition.
+
+    Both are expected in the same normalized form (as the kodexa model dumps them).  Fields the platform
+    manages, and fields the local definition leaves unset, are not compared.
+
+    Args:
+        deployed (dict[str, Any]): The component as deployed
+        local (dict[str, Any]): The local definition
+
+    Returns:
+        list[str]: The paths of the fields that differ, empty if the component is unchanged
+    """
+    from deepdiff import DeepDiff
+
+    local = {key: item for key, item in _without_nones(local).items() if key not in SERVER_MANAGED_FIELDS}
+    deployed = _restricted_to(deployed, local)
+    diff = DeepDiff(deployed, local)
+    return sorted(path.replace("root", "", 1) for path in diff.affected_paths)
+
+
+@dataclass
+class PlannedComponent:
+    """What deploying a component will do."""
+
+    ref: str
+    component_type: str
+    action: str
+    changes: list[str] = field(default_factory=list)
+
+
+class DeployPlanner:
+    """Works out which components will be created, updated or left unchanged.
+
+    The deployed components are fetched concurrently over kept-alive connections, and each is only fetched once
+    per run however many times it is planned.
+    """
+
+    def __init__(self, client: Any, fetch_client: Any, parallel: int = 4):
+        """
+        Args:
+            client (Any): The kodexa client, used to normalize the definitions through the kodexa model
+            fetch_client (Any): The KeepAliveClient the deployed components are fetched with
+            parallel (int): The most components fetched at once
+        """
+        self.client = client
+        self.fetch_client = fetch_client
+        self.parallel = parallel
+        self.cache: dict[str, Optional[dict[str, Any]]] = {}
+        self.lock = threading.Lock()
+
+    def normalize(self, definition: dict[str, Any]) -> dict[str, Any]:
+        return self.client.deserialize(definition).model_dump(mode="json", by_alias=True)
+
+    def fetch_deployed(self, path: str) -> Optional[dict[str, Any]]:
+        """Fetch a deployed component, or None if it isn't deployed."""
+        with self.lock:
+            if path in self.cache:
+                return self.cache[path]
+        try:
+            deployed = self.fetch_client.get(path).json()
+        except Exception as e:
+            if not str(e).startswith("Not found"):
+                raise
+            deployed = None
+        with self.lock:
+            self.cache[path] = deployed
+        return deployed
+
+    def plan_component(self, definition: dict[str, Any]) -> PlannedComponent:
+        component = self.client.deserialize(definition)
+        ref = component_ref(definition)
+        if ref is None:
+            raise Exception(f"The {definition.get('type')} component {definition.get('name', '')} has no organization "
+                            f"or slug")
+        deployed = self.fetch_deployed(f"/api/{component.get_type()}/{ref.replace(':', '/')}")
+        if deployed is None:
+            return PlannedComponent(ref, definition.get("type", ""), "create")
+        try:
+            deployed = self.normalize(deployed)
+        except Exception:
+            # Compare what the platform returned as is, if the kodexa model can't read it
+            pass
+        changes = changed_paths(deployed, component.model_dump(mode="json", by_alias=True))
+        return PlannedComponent(ref, definition.get("type", ""), "update" if changes else "unchanged", changes)
+
+    def plan(self, components: list[dict[str, Any]]) -> list[PlannedComponent]:
+        """Plan the deployment of the components, in the order given."""
+        with ThreadPoolExecutor(max_workers=max(1, self.parallel)) as executor:
+            return list(executor.map(self.plan_component, components))
+
+
+def format_plan(plan: list[PlannedComponent], max_changes: int = 5) -> list[str]:
+    """Describe a plan, one line per component that will change, then a summary line."""
+    symbols = {"create": "[green]+[/green]", "update": "[yellow]~[/yellow]"}
+    lines = []
+    for planned in plan:
+        if planned.action == "unchanged":
+            continue
+        line = f"  {symbols[planned.action]} {planned.ref} ({planned.component_type})"
+        if planned.changes:
+            shown = ", ".join(planned.changes[:max_changes])
+            more = len(planned.changes) - max_changes
+            line += f": {shown}" + (f" and {more} more" if more > 0 else "")
+        lines.append(line)
+    counts = {action: sum(1 for planned in plan if planned.action == action)
+              for action in ("create", "update", "unchanged")}
+    lines.append(f"Plan: {counts['create']} to create, {counts['update']} to update, {counts['unchanged']} unchanged")
+    return lines
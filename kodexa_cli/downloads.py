@@ -0,0 +1,110 @@
+"""
+Downloading document family artifacts straight to disk.
+
+The kodexa client reads each response into memory (and ``get_document`` then parses the whole KDDB before
+writing it out again), so downloading large files costs as much memory as the files.  These helpers stream the
+content to disk in chunks instead, writing to a temporary file that is only moved into place once complete, so
+an interrupted download never leaves a partial artifact that looks finished.
+"""
+import hashlib
+import os
+from typing import Any, Optional
+
+CHUNK_SIZE = 1024 * 1024
+DEFAULT_SHARD_DEPTH = 2
+
+# The suffix each kind of artifact is saved with, next to the document family's path
+ARTIFACT_SUFFIXES = {
+    "download": ".kddb",
+    "download-native": ".native",
+    "download-extracted-data": "-extracted_data.json",
+}
+
+
+def output_path(family_id: str, family_path: str, suffix: str, output_dir: Optional[str] = None,
+                shard_depth: int = DEFAULT_SHARD_DEPTH) -> str:
+    """Work out where a document family's artifact is saved.
+
+    Without an output directory artifacts are saved next to the family's path, relative to the working
+    directory.  With one, they are spread over subdirectories named from a hash of the family id (so no
+    directory ends up with millions of entries, and a family always lands in the same place).
+
+    Args:
+        family_id (str): The id of the document family
+        family_path (str): The path of the document family in the store
+        suffix (str): The suffix of the artifact
+        output_dir (Optional[str]): The directory to save into
+        shard_depth (int): How many levels of two-character subdirectories to shard into (0 for none)
+
+    Returns:
+        str: The path of the artifact
+    """
+    if output_dir is None:
+        return family_path + suffix
+    digest = hashlib.sha1(family_id.encode("utf-8")).hexdigest()
+    shards = [digest[i * 2:i * 2 + 2] for i in range(shard_depth)]
+    return os.path.join(output_dir, *shards, family_path.lstrip("/\\") + suffix)
+
+
+def download_to_file(client: Any, path: str, destination: str, params: Optional[dict] = None,
+                     chunk_size: int = CHUNK_SIZE, digest: Optional[Any] = None) -> int:
+    """Stream a platform response into a file.
+
+    Args:
+        client (Any): The KeepAliveClient to download with
+        path (str): The path of the content on the platform
+        destination (str): The file to write
+        params (Optional[dict]): The query parameters
+        chunk_size (int): How much to read and write at a time
+        digest (Optional[Any]): A hashlib object to update with the content as it is written
+
+    Returns:
+        int: The number of bytes written
+    """
+    directory = os.path.dirname(destination)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    partial = destination + ".part"
+    written = 0
+    response = client.get(path, params=params, stream=True)
+    try:
+        with open(partial, "wb") as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                written += len(chunk)
+                if digest is not None:
+                    digest.update(chunk)
+        os.replace(partial, destination)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    finally:
+        response.close()
+    return written
+
+
+def content_path(doc_family: Any, content_object: Any) -> str:
+    """The path of a content object's content on the platform."""
+    return f"/api/stores/{doc_family.store_ref.replace(':', '/')}/families/{doc_family.id}/objects/" \
+           f"{content_object.id}/content"
+
+
+def native_content_object(doc_family: Any) -> Any:
+    """Find a document family's native content object, as ``get_native`` does."""
+    for content_object in doc_family.content_objects:
+        if content_object.content_type == "NATIVE":
+            return content_object
+    raise Exception(f"No native content object found on document family {doc_family.id}")
+
+
+def extracted_data_params() -> dict[str, str]:
+    """The data export parameters ``query --download-extracted-data`` has always used."""
+    return {
+        "format": "json",
+        "rootName": "",
+        "friendlyNames": "false",
+        "includeIds": "true",
+        "includeExceptions": "true",
+        "inlineAudits": "false",
+    }
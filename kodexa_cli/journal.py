@@ -0,0 +1,115 @@
+"""
+A local journal of the files uploaded to each document store, so re-running an upload skips what is already there.
+
+A file matches its journal entry only if its path, size, modification time and content hash are all unchanged;
+the size and modification time are compared first so a changed file is never read just to find it has changed.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from kodexa_cli.profiles import get_config_path
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def get_journal_path() -> str:
+    """
+    :return: the path of the upload journal, which lives next to the profile configuration
+    """
+    return os.path.join(os.path.dirname(get_config_path()), "journal", "uploads.db")
+
+
+def hash_file(path: str) -> str:
+    """Compute the SHA-256 of a file, reading it in blocks so large files aren't held in memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class FileFingerprint:
+    """What identifies one version of a local file."""
+
+    path: str
+    size: int
+    mtime: float
+
+    @classmethod
+    def of(cls, path: str) -> "FileFingerprint":
+        stat = os.stat(path)
+        return cls(os.path.abspath(path), stat.st_size, stat.st_mtime)
+
+
+class UploadJournal:
+    """Records the files uploaded to each store, backed by SQLite so concurrent uploads can share it."""
+
+    def __init__(self, url: str, store_ref: str, path: Optional[str] = None):
+        """
+        Args:
+            url (str): The URL of the platform
+            store_ref (str): The ref of the document store being uploaded to
+            path (Optional[str]): The journal database (defaults to one next to the profile configuration)
+        """
+        self.url = url
+        self.store_ref = store_ref
+        self.path = path if path is not None else get_journal_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS uploads ("
+                "url TEXT, store_ref TEXT, path TEXT, size INTEGER, mtime REAL, hash TEXT, family_id TEXT, "
+                "uploaded_at REAL, PRIMARY KEY (url, store_ref, path))"
+            )
+
+    def is_uploaded(self, fingerprint: FileFingerprint, content_hash: Optional[str] = None) -> Optional[str]:
+        """Check whether this version of the file has already been uploaded.
+
+        Args:
+            fingerprint (FileFingerprint): The file
+            content_hash (Optional[str]): The file's content hash, if it is already known (otherwise the file is
+                hashed when its size and modification time match)
+
+        Returns:
+            Optional[str]: The content hash if the file is unchanged since it was uploaded, otherwise None
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT size, mtime, hash FROM uploads WHERE url = ? AND store_ref = ? AND path = ?",
+                (self.url, self.store_ref, fingerprint.path),
+            ).fetchone()
+        if row is None or row[0] != fingerprint.size or row[1] != fingerprint.mtime:
+            return None
+        if content_hash is None:
+            content_hash = hash_file(fingerprint.path)
+        return content_hash if content_hash == row[2] else None
+
+    def has_hash(self, content_hash: str) -> bool:
+        """Check whether a file with this content, from any path, has already been uploaded to the store."""
+        with self.lock:
+            return self.connection.execute(
+                "SELECT 1 FROM uploads WHERE url = ? AND store_ref = ? AND hash = ? LIMIT 1",
+                (self.url, self.store_ref, content_hash),
+            ).fetchone() is not None
+
+    def record(self, fingerprint: FileFingerprint, family_id: Optional[str] = None,
+               content_hash: Optional[str] = None) -> None:
+        """Record a file as uploaded, hashing it unless its content hash is given."""
+        content_hash = content_hash if content_hash is not None else hash_file(fingerprint.path)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.url, self.store_ref, fingerprint.path, fingerprint.size, fingerprint.mtime, content_hash,
+                 family_id, time.time()),
+            )
+
+    def close(self) -> None:
+        self.connection.close()
@@ -0,0 +1,148 @@
+"""
+Throughput and latency metrics for uploads, shown live while they run and optionally written out as JSON.
+"""
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from rich.progress import Progress
+from rich.table import Table
+
+# Upper bounds, in seconds, of the latency histogram buckets (the last bucket is everything slower)
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HISTOGRAM_WIDTH = 30
+# The live display's percentiles are over the most recent uploads, so refreshing it stays cheap
+RECENT_LATENCIES = 10000
+# Beyond this many workers the live display summarizes them rather than showing a row for each
+MAX_WORKER_ROWS = 8
+
+# The worker running the current operation, for engines whose workers aren't threads (the async engine's slots)
+current_worker: ContextVar[Optional[str]] = ContextVar("current_worker", default=None)
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """The value below which the given fraction of the sorted values fall (nearest rank)."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))]
+
+
+class UploadMetrics:
+    """Collects the outcome, size and latency of each upload; safe to update from any number of workers."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.in_flight = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.bytes = 0
+        self.latencies: list[float] = []
+        self.recent_latencies: deque[float] = deque(maxlen=RECENT_LATENCIES)
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.workers: dict[str, dict[str, float]] = {}
+
+    @contextmanager
+    def track(self, size: int) -> Iterator[None]:
+        """Time the enclosed upload of ``size`` bytes, counting it as failed if it raises."""
+        worker = current_worker.get() or threading.current_thread().name
+        with self.lock:
+            self.in_flight += 1
+        start = time.monotonic()
+        succeeded = False
+        try:
+            yield
+            succeeded = True
+        finally:
+            latency = time.monotonic() - start
+            with self.lock:
+                self.in_flight -= 1
+                stats = self.workers.setdefault(worker, {"files": 0, "bytes": 0, "busySeconds": 0.0})
+                stats["busySeconds"] += latency
+                if succeeded:
+                    self.succeeded += 1
+                    self.bytes += size
+                    stats["files"] += 1
+                    stats["bytes"] += size
+                    self.latencies.append(latency)
+                    self.recent_latencies.append(latency)
+                    self.histogram[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+                else:
+                    self.failed += 1
+
+    def to_dict(self, recent: bool = False) -> dict[str, Any]:
+        """
+        Args:
+            recent (bool): Compute the latency percentiles over the most recent uploads only, rather than all
+
+        Returns:
+            dict[str, Any]: The metrics, as written to the --metrics-json file
+        """
+        with self.lock:
+            elapsed = max(time.monotonic() - self.started, 1e-9)
+            latencies = sorted(self.recent_latencies if recent else self.latencies)
+            return {
+                "elapsedSeconds": round(elapsed, 3),
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "inFlight": self.in_flight,
+                "bytes": self.bytes,
+                "megabytesPerSecond": round(self.bytes / elapsed / (1024 * 1024), 3),
+                "filesPerSecond": round(self.succeeded / elapsed, 3),
+                "latencySeconds": {
+                    "p50": round(percentile(latencies, 0.5), 4),
+                    "p95": round(percentile(latencies, 0.95), 4),
+                    "max": round(latencies[-1], 4) if latencies else 0.0,
+                },
+                "latencyHistogram": {
+                    label: count for label, count in zip(self._bucket_labels(), self.histogram)
+                },
+                "workers": {name: dict(stats) for name, stats in self.workers.items()},
+            }
+
+    @staticmethod
+    def _bucket_labels() -> list[str]:
+        return [f"<{bound}s" for bound in LATENCY_BUCKETS] + [f">={LATENCY_BUCKETS[-1]}s"]
+
+    def render(self) -> Table:
+        """Render the current metrics as a table for the live display."""
+        metrics = self.to_dict(recent=True)
+        table = Table(title="Upload Metrics", title_style="bold blue", show_header=False)
+        table.add_column("Metric")
+        table.add_column("Value")
+        table.add_row("Throughput", f"{metrics['megabytesPerSecond']:.2f} MB/s, {metrics['filesPerSecond']:.1f} files/s")
+        table.add_row("Files", f"{metrics['succeeded']} uploaded, {metrics['failed']} failed, "
+                               f"{metrics['inFlight']} in flight")
+        latency = metrics["latencySeconds"]
+        table.add_row("Latency", f"p50 {latency['p50']:.3f}s, p95 {latency['p95']:.3f}s, max {latency['max']:.3f}s")
+
+        largest = max(self.histogram) or 1
+        for label, count in metrics["latencyHistogram"].items():
+            table.add_row(f"  {label}", f"{'█' * round(HISTOGRAM_WIDTH * count / largest)} {count}")
+
+        workers = metrics["workers"]
+        if len(workers) <= MAX_WORKER_ROWS:
+            for name, stats in sorted(workers.items()):
+                table.add_row(f"Worker {name}", f"{int(stats['files'])} files, {stats['bytes'] / (1024 * 1024):.1f} MB, "
+                                                f"busy {stats['busySeconds']:.1f}s")
+        else:
+            files = [stats["files"] for stats in workers.values()]
+            table.add_row("Workers", f"{len(workers)} workers, {int(min(files))}-{int(max(files))} files each")
+        return table
+
+
+class MetricsProgress(Progress):
+    """A progress display with the upload metrics underneath the progress bars."""
+
+    def __init__(self, *columns, metrics: UploadMetrics, **kwargs):
+        # Set before initializing the progress, which may render straight away
+        self.metrics = metrics
+        super().__init__(*columns, **kwargs)
+
+    def get_renderables(self):
+        yield self.make_tasks_table(self.tasks)
+        yield self.metrics.render()
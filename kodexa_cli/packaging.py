@@ -0,0 +1,226 @@
+"""
+Packaging resources from their kodexa.yml definitions, including the implementation packages of model stores.
+
+A model's implementation is the set of files its metadata's ``contents`` globs match (less those its
+``ignoredContents`` match), relative to the directory of its kodexa.yml.  The package is fingerprinted from the
+model definition and the content of those files, and the fingerprint is kept in a build cache next to the
+packaged artifacts, so a model whose sources haven't changed isn't rebuilt.  The fingerprint is also used as the
+model's state hash, so the platform only sees a new state when the implementation actually changed.
+
+Packaging a resource never depends on the working directory (every path is resolved from the resource's
+kodexa.yml and the output directory, and each model gets its own output files), so ``package_resource`` can
+run for many resources at once in a process pool.
+"""
+import glob
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from shutil import copyfile
+from typing import Any, Optional
+
+from kodexa_cli.archive import CompressionPolicy, write_reproducible_zip
+
+BUILD_CACHE_NAME = ".kodexa-build-cache.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Parts of a model definition that don't affect what is built
+_UNBUILT_FIELDS = ("version",)
+_UNBUILT_METADATA_FIELDS = ("stateHash", "state_hash")
+
+
+def implementation_files(metadata: Any, root: str) -> list[tuple[str, str]]:
+    """Find the files that make up a model's implementation, as ``build_implementation_zip`` does.
+
+    Args:
+        metadata (Any): The model's ModelContentMetadata
+        root (str): The directory the contents are relative to (the directory of the model's kodexa.yml)
+
+    Returns:
+        list[tuple[str, str]]: The path of each file and its name in the package, ordered by name
+    """
+    def matches(patterns: Optional[list[str]]) -> list[str]:
+        hits = []
+        for pattern in patterns or []:
+            wildcard = os.path.join(metadata.base_dir, pattern) if metadata.base_dir else pattern
+            hits.extend(glob.glob(wildcard, root_dir=root, recursive=True))
+        return hits
+
+    ignored = set(matches(metadata.ignored_contents))
+    files = {}
+    for hit in matches(metadata.contents):
+        path = os.path.join(root, hit)
+        if hit in ignored or not os.path.isfile(path):
+            continue
+        name = hit.replace(metadata.base_dir + "/", "") if metadata.base_dir else hit
+        files[name.replace(os.sep, "/")] = path
+    return sorted(((path, name) for name, path in files.items()), key=lambda file: file[1])
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_fingerprint(metadata_obj: dict[str, Any], files: list[tuple[str, str]]) -> str:
+    """Fingerprint a model package from its definition and the content of its implementation files.
+
+    The version and state hash are left out, so repackaging unchanged sources under a new version gives the
+    same fingerprint.
+
+    Args:
+        metadata_obj (dict[str, Any]): The model definition, as loaded from its kodexa.yml
+        files (list[tuple[str, str]]): The implementation files, as ``implementation_files`` lists them
+
+    Returns:
+        str: A SHA-256 hex digest
+    """
+    definition = {key: value for key, value in metadata_obj.items() if key not in _UNBUILT_FIELDS}
+    if isinstance(definition.get("metadata"), dict):
+        definition["metadata"] = {
+            key: value for key, value in definition["metadata"].items() if key not in _UNBUILT_METADATA_FIELDS
+        }
+    digest = hashlib.sha256(json.dumps(definition, sort_keys=True, default=str).encode("utf-8"))
+    for path, name in files:
+        digest.update(f"\0{name}\0{file_digest(path)}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class BuildCache:
+    """Records the fingerprint each artifact in an output directory was built from."""
+
+    def __init__(self, output: str):
+        """
+        Args:
+            output (str): The directory the artifacts are packaged into
+        """
+        self.output = output
+        self.path = os.path.join(output, BUILD_CACHE_NAME)
+        self.artifacts: dict[str, dict[str, Any]] = {}
+        try:
+            with open(self.path) as f:
+                self.artifacts = json.load(f).get("artifacts", {})
+        except (OSError, ValueError):
+            pass
+
+    def lookup(self, fingerprint: str, preferred: Optional[str] = None) -> Optional[str]:
+        """Find an artifact built from the fingerprint that is still intact.
+
+        Args:
+            fingerprint (str): The fingerprint of the build
+            preferred (Optional[str]): The artifact to return if it matches, before trying any other
+
+        Returns:
+            Optional[str]: The path of the artifact, or None if there isn't one
+        """
+        names = sorted(self.artifacts, key=lambda name: name != os.path.basename(preferred or ""))
+        for name in names:
+            entry = self.artifacts[name]
+            path = os.path.join(self.output, name)
+            if entry["fingerprint"] == fingerprint and os.path.isfile(path) and os.path.getsize(path) == entry["size"]:
+                return path
+        return None
+
+    def record(self, fingerprint: str, artifact: str) -> None:
+        self.artifacts[os.path.basename(artifact)] = {"fingerprint": fingerprint, "size": os.path.getsize(artifact)}
+
+    def save(self) -> None:
+        partial = self.path + ".part"
+        with open(partial, "w") as f:
+            json.dump({"artifacts": self.artifacts}, f, indent=2, sort_keys=True)
+        os.replace(partial, self.path)
+
+
+def resource_name(metadata_obj: dict[str, Any]) -> str:
+    """The name a resource's packaged files are given, such as ``store-my-model-1.0.0``."""
+    return f"{metadata_obj['type']}-{metadata_obj['slug']}-{metadata_obj['version']}"
+
+
+def is_model_store(metadata_obj: dict[str, Any]) -> bool:
+    return metadata_obj["type"].upper() == "STORE" and metadata_obj["storeType"].upper() == "MODEL"
+
+
+@dataclass
+class PackagedResource:
+    """The outcome of packaging one resource."""
+
+    file: str
+    metadata_obj: dict[str, Any]
+    metadata_path: str
+    implementation: Optional[str] = None
+    fingerprint: Optional[str] = None
+    build_key: Optional[str] = None
+    messages: list[str] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.metadata_path)
+
+
+def build_key(fingerprint: str, policy: CompressionPolicy) -> str:
+    """The key an implementation zip is cached under: its fingerprint, and how it was compressed."""
+    return hashlib.sha256(f"{fingerprint}\0{policy.key()}".encode("utf-8")).hexdigest()
+
+
+def package_resource(file: str, metadata_obj: dict[str, Any], root: str, output: str,
+                     build_cache: Optional[BuildCache] = None, policy: Optional[CompressionPolicy] = None,
+                     compress_threads: int = 1) -> PackagedResource:
+    """Package one resource into the output directory.
+
+    Writes the resource's versioned JSON definition and, for a model store, its implementation zip (unless the
+    build cache has one built from the same fingerprint and compression).  The zip is reproducible, so packaging
+    the same sources always gives the same bytes.  Messages are returned rather than printed, since this
+    may run in another process.
+
+    Args:
+        file (str): The kodexa.yml the resource was loaded from, for messages
+        metadata_obj (dict[str, Any]): The resource definition, with its version already set
+        root (str): The directory of the resource's kodexa.yml
+        output (str): The directory to package into
+        build_cache (Optional[BuildCache]): The artifacts already built, to reuse
+        policy (Optional[CompressionPolicy]): How the implementation files are compressed
+        compress_threads (int): The number of threads compressing the blocks of large implementation files
+
+    Returns:
+        PackagedResource: The files written, the model's fingerprint and the messages to show
+    """
+    name = resource_name(metadata_obj)
+    result = PackagedResource(file, metadata_obj, os.path.join(output, f"{name}.json"))
+
+    if metadata_obj["type"] == "extensionPack":
+        if "source" in metadata_obj and "location" in metadata_obj["source"]:
+            metadata_obj["source"]["location"] = metadata_obj["source"]["location"].format(**metadata_obj)
+    elif is_model_store(metadata_obj):
+        from kodexa.model import ModelContentMetadata
+
+        model_content_metadata = ModelContentMetadata.model_validate(metadata_obj["metadata"])
+        files = implementation_files(model_content_metadata, root)
+
+        # The state hash only changes when the model or its implementation does
+        result.fingerprint = build_fingerprint(metadata_obj, files)
+        model_content_metadata.state_hash = result.fingerprint
+        metadata_obj["metadata"] = model_content_metadata.model_dump(by_alias=True)
+
+        policy = policy if policy is not None else CompressionPolicy()
+        result.build_key = build_key(result.fingerprint, policy)
+        result.implementation = os.path.join(output, f"{name}.zip")
+        cached = build_cache.lookup(result.build_key, preferred=result.implementation) if build_cache else None
+        if cached == result.implementation:
+            result.messages.append(f"Implementation is unchanged, reusing {cached}")
+        elif cached is not None:
+            result.messages.append(f"Implementation is unchanged, reusing {cached}")
+            copyfile(cached, result.implementation)
+        else:
+            result.messages.append(f"Building the implementation zip from {root}")
+            if write_reproducible_zip(files, result.implementation, policy, compress_threads) == 0:
+                result.messages.append(
+                    f"No files found for implementation in {model_content_metadata.base_dir} with "
+                    f"{model_content_metadata.contents}"
+                )
+
+    with open(result.metadata_path, "w") as outfile:
+        json.dump(metadata_obj, outfile)
+    return result
@@ -0,0 +1,62 @@
+"""
+The kodexa client, with the CLI's retry policy applied to its requests.
+
+Importing this module imports the kodexa library, so the CLI only loads it lazily, in the commands that talk to
+the platform.
+"""
+import os
+from typing import Any, Optional
+
+import requests
+from kodexa.platform.client import KodexaClient, process_response
+
+from kodexa_cli.retry import IDEMPOTENT_METHODS, RetryPolicy, get_policy, raise_for_retry_after
+
+
+class RetryingKodexaClient(KodexaClient):
+    """A KodexaClient whose GET, POST, PUT and DELETE requests retry transient failures.
+
+    The endpoints the client hands out make their requests through it, so commands get the retries without
+    changing how they use the client.  Requests that upload files are sent once, since the files can't be
+    re-read from the start; the upload command retries those itself.
+    """
+
+    def __init__(self, *args, policy: Optional[RetryPolicy] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.policy = policy if policy is not None else get_policy()
+
+    def _headers(self, content_type: bool = True) -> dict[str, str]:
+        headers = {
+            "x-access-token": self.access_token,
+            "cf-access-token": os.environ.get("CF_TOKEN", ""),
+            "X-Requested-With": "XMLHttpRequest",
+        }
+        if content_type:
+            headers["content-type"] = "application/json"
+        return headers
+
+    def _send(self, method: str, url: str, files: Optional[Any] = None, headers: Optional[dict[str, str]] = None,
+              **kwargs) -> requests.Response:
+        def send() -> requests.Response:
+            response = requests.request(
+                method, self.get_url(url), files=files, headers={**self._headers(files is None), **(headers or {})},
+                timeout=self.policy.timeout, **kwargs
+            )
+            raise_for_retry_after(response.status_code, response.headers, response.text)
+            return process_response(response)
+
+        if files is not None:
+            return send()
+        return self.policy.call(send, idempotent=method in IDEMPOTENT_METHODS)
+
+    def get(self, url, params=None, headers=None) -> requests.Response:
+        return self._send("GET", url, params=params, headers=headers)
+
+    def post(self, url, body=None, data=None, files=None, params=None) -> requests.Response:
+        return self._send("POST", url, files=files, json=body, data=data, params=params)
+
+    def put(self, url, body=None, data=None, files=None, params=None) -> requests.Response:
+        return self._send("PUT", url, files=files, json=body, data=data, params=params)
+
+    def delete(self, url, params=None) -> requests.Response:
+        return self._send("DELETE", url, params=params)
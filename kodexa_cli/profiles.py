@@ -0,0 +1,128 @@
+"""
+Fast, read-mostly access to the Kodexa profile configuration.
+
+The kodexa library keeps profiles (URL and access token per profile) in a JSON file under the user's config
+directory.  Reading them through ``kodexa.platform.kodexa.KodexaPlatform`` means importing the whole kodexa
+library, so the CLI reads the file itself, once per process, and only hands off to the library when a
+profile has to be written.
+"""
+import json
+import os
+from functools import lru_cache
+from typing import Any, Optional
+
+from appdirs import AppDirs
+
+CURRENT_PROFILE_KEY = "_current_profile_"
+
+
+def get_config_path() -> str:
+    """
+    :return: the path of the Kodexa profile configuration file
+    """
+    return os.path.join(AppDirs("Kodexa", "Kodexa").user_config_dir, ".kodexa.json")
+
+
+@lru_cache(maxsize=None)
+def load_profile_config() -> dict[str, Any]:
+    """Load the profile configuration, reading the file at most once per process.
+
+    Returns:
+        dict[str, Any]: The configuration, or an empty dict if no profile has been configured yet
+    """
+    path = get_config_path()
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as config_file:
+        return json.load(config_file)
+
+
+class ProfileStore:
+    """Mirrors the profile methods of kodexa's ``KodexaPlatform`` on top of the memoized configuration.
+
+    Lookups (including the ``KODEXA_URL`` and ``KODEXA_ACCESS_TOKEN`` environment overrides) behave like
+    the library's, while changes are delegated to the library and then invalidate the cached configuration.
+    """
+
+    @staticmethod
+    def _platform():
+        from kodexa.platform.kodexa import KodexaPlatform
+        return KodexaPlatform
+
+    @classmethod
+    def _profile_config(cls, profile: Optional[str]) -> dict[str, Any]:
+        config = load_profile_config()
+        name = cls.get_current_profile() if profile is None else profile
+        if not config:
+            return {"url": None, "access_token": None}
+        if name is None:
+            raise Exception("No profile set")
+        if name not in config:
+            raise Exception(f"Profile {name} does not exist")
+        return config[name]
+
+    @classmethod
+    def get_current_profile(cls) -> Optional[str]:
+        config = load_profile_config()
+        return config[CURRENT_PROFILE_KEY] if CURRENT_PROFILE_KEY in config else "default"
+
+    @classmethod
+    def list_profiles(cls) -> list[str]:
+        config = load_profile_config()
+        if not config:
+            return ["default"]
+        return [key for key in config if key != CURRENT_PROFILE_KEY]
+
+    @classmethod
+    def get_url(cls, profile: Optional[str] = None) -> str:
+        url = os.getenv("KODEXA_URL")
+        if url is None:
+            url = cls._profile_config(profile)["url"]
+        if url is None:
+            raise Exception("No URL set, please set KODEXA_URL or configure a profile (see https://developer.kodexa.ai/guides/cli/authentication)")
+        return url
+
+    @classmethod
+    def get_access_token(cls, profile: Optional[str] = None) -> str:
+        access_token = os.getenv("KODEXA_ACCESS_TOKEN")
+        return access_token if access_token is not None else cls._profile_config(profile)["access_token"]
+
+    @classmethod
+    def get_setting(cls, key: str, profile: Optional[str] = None) -> Any:
+        """Look up a CLI setting kept in the profile next to its URL and access token.
+
+        Returns:
+            Any: The setting, or None if it isn't set (or there is no such profile)
+        """
+        try:
+            return cls._profile_config(profile).get(key)
+        except Exception:
+            return None
+
+    @classmethod
+    def login(cls, kodexa_url: str, token: str, profile: Optional[str] = None) -> None:
+        try:
+            cls._platform().login(kodexa_url, token, profile)
+        finally:
+            load_profile_config.cache_clear()
+
+    @classmethod
+    def set_profile(cls, profile: str) -> None:
+        try:
+            cls._platform().set_profile(profile)
+        finally:
+            load_profile_config.cache_clear()
+
+    @classmethod
+    def clear_profile(cls, profile: Optional[str] = None) -> None:
+        try:
+            cls._platform().clear_profile(profile)
+        finally:
+            load_profile_config.cache_clear()
+
+    @classmethod
+    def delete_profile(cls, profile: str) -> None:
+        try:
+            cls._platform().delete_profile(profile)
+        finally:
+            load_profile_config.cache_clear()
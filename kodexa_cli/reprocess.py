@@ -0,0 +1,133 @@
+"""
+Batched reprocessing of document families.
+
+Reprocessing families one at a time costs a request per family (and the kodexa client's
+``reprocess_document_families`` fetches every family again first to check it isn't locked).  The store's
+reprocess endpoint takes any number of families, so the families are collected per assistant and submitted in
+batches, using the lock state the families were streamed with.
+"""
+import threading
+import time
+from typing import Any, Callable, Optional
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_POLL_INTERVAL = 5.0
+
+
+def failed_assistant(doc_family: Any) -> Optional[Any]:
+    """Find the assistant whose recent execution on a document family failed.
+
+    Returns:
+        Optional[Any]: The first failed assistant, or None if none of the recent executions failed
+    """
+    for execution in doc_family.statistics.recent_executions or []:
+        if execution.execution.status == "FAILED":
+            return execution.assistant
+    return None
+
+
+class ReprocessBatcher:
+    """Collects document families per assistant and submits them for reprocessing in batches.
+
+    Safe to add to from any number of workers; the worker that fills a batch submits it, so submissions to
+    different assistants can overlap.
+    """
+
+    def __init__(self, client: Any, batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_inflight_executions: Optional[int] = None,
+                 count_inflight_executions: Optional[Callable[[], int]] = None,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, summary: Optional[Any] = None,
+                 on_error: Optional[Callable[[str, list[str], BaseException], None]] = None):
+        """
+        Args:
+            client (Any): The KeepAliveClient to submit the batches with
+            batch_size (int): The most families submitted in one request
+            max_inflight_executions (Optional[int]): Hold back each batch while at least this many executions are
+                pending or running
+            count_inflight_executions (Optional[Callable[[], int]]): Counts the pending and running executions
+                (required with max_inflight_executions)
+            poll_interval (float): Seconds between counts of the executions while held back
+            summary (Optional[Any]): The BulkSummary to count the reprocessed families in
+            on_error (Optional[Callable[[str, list[str], BaseException], None]]): Called with the assistant id,
+                family ids and error of each batch that failed
+        """
+        if max_inflight_executions is not None and count_inflight_executions is None:
+            raise ValueError("Throttling on executions needs a way to count them")
+        self.client = client
+        self.batch_size = max(1, batch_size)
+        self.max_inflight_executions = max_inflight_executions
+        self.count_inflight_executions = count_inflight_executions
+        self.poll_interval = poll_interval
+        self.summary = summary
+        self.on_error = on_error
+        self.lock = threading.Lock()
+        self.pending: dict[tuple[str, str], list[tuple[str, Optional[Callable[[], None]]]]] = {}
+        self.submitted = 0
+        self.skipped_locked = 0
+        self.batches = 0
+
+    def add(self, doc_family: Any, assistant_id: str, on_submitted: Optional[Callable[[], None]] = None) -> bool:
+        """Queue a document family for reprocessing, submitting its batch if that fills it.
+
+        Args:
+            doc_family (Any): The document family, as streamed from the store
+            assistant_id (str): The id of the assistant to reprocess it with
+            on_submitted (Optional[Callable[[], None]]): Called once the family's batch has been accepted
+
+        Returns:
+            bool: False if the family is locked and was skipped
+        """
+        if getattr(doc_family, "locked", False) is True:
+            with self.lock:
+                self.skipped_locked += 1
+            return False
+
+        key = (doc_family.store_ref, assistant_id)
+        with self.lock:
+            batch = self.pending.setdefault(key, [])
+            batch.append((doc_family.id, on_submitted))
+            if len(batch) < self.batch_size:
+                return True
+            del self.pending[key]
+        self._submit(key, batch)
+        return True
+
+    def flush(self) -> None:
+        """Submit every partly filled batch."""
+        with self.lock:
+            batches = list(self.pending.items())
+            self.pending.clear()
+        for key, batch in batches:
+            self._submit(key, batch)
+
+    def _wait_for_capacity(self) -> None:
+        if self.max_inflight_executions is None:
+            return
+        while (inflight := self.count_inflight_executions()) >= self.max_inflight_executions:
+            print(f"Waiting for executions to finish ({inflight} pending or running)")
+            time.sleep(self.poll_interval)
+
+    def _submit(self, key: tuple[str, str], batch: list[tuple[str, Optional[Callable[[], None]]]]) -> None:
+        store_ref, assistant_id = key
+        family_ids = [family_id for family_id, _ in batch]
+        try:
+            self._wait_for_capacity()
+            self.client.put(
+                f"/api/stores/{store_ref.replace(':', '/')}/reprocess",
+                body={"assistantIds": [assistant_id], "familyIds": family_ids},
+            )
+        except Exception as e:
+            if self.summary is not None:
+                self.summary.count_operation("reprocess", "failed", len(batch))
+            if self.on_error is not None:
+                self.on_error(assistant_id, family_ids, e)
+            return
+
+        if self.summary is not None:
+            self.summary.count_operation("reprocess", "succeeded", len(batch))
+        with self.lock:
+            self.submitted += len(batch)
+            self.batches += 1
+        for _, on_submitted in batch:
+            if on_submitted is not None:
+                on_submitted()
@@ -0,0 +1,236 @@
+"""
+The retry policy shared by every command that talks to the platform.
+
+Transient failures (throttling, 5xx responses, dropped connections) are retried with exponential backoff and
+full jitter, waiting at least as long as the platform asks for in a ``Retry-After`` header.  Which failures
+are retried depends on whether the request is idempotent: a GET, PUT or DELETE can safely be sent again after
+any transient failure, but a POST is only retried when the platform can't have acted on it (it was throttled,
+unavailable, or the connection was never made), so a retry never creates something twice.
+
+A request that hangs is cut off after ``timeout`` seconds without connecting or receiving data, and the
+timeout is treated as a transient failure like any other.
+
+The policy comes from ``--retries``, ``--retry-max-wait`` and ``--timeout`` on the command line, or the
+``retries``, ``retry_max_wait`` and ``timeout`` settings of the profile.
+"""
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Optional
+
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0
+DEFAULT_MAX_WAIT = 30.0
+DEFAULT_TIMEOUT = 300.0
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+# Status codes it is worth trying again
+TRANSIENT_STATUSES = (429, 500, 502, 503, 504)
+
+# Of those, the ones that mean the platform turned the request away without acting on it
+UNPROCESSED_STATUSES = (429, 503)
+
+# Messages kodexa's process_response starts its errors with for the transient statuses, as those errors don't
+# carry the status code
+TRANSIENT_ERROR_MESSAGES = (
+    "Internal server error",
+    "Bad gateway",
+    "Service unavailable",
+    "Gateway timeout",
+    "Too Many Requests",
+)
+
+UNPROCESSED_ERROR_MESSAGES = (
+    "Service unavailable",
+    "Too Many Requests",
+)
+
+# Statuses whose Retry-After header is worth honoring
+RETRY_AFTER_STATUSES = (429, 503)
+
+
+class RetryableResponseError(Exception):
+    """A throttling or unavailable response, carrying how long the platform asked us to wait."""
+
+    def __init__(self, message: str, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header, given either as seconds or as an HTTP date.
+
+    Returns:
+        Optional[float]: The number of seconds to wait, or None if there is no usable value
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def raise_for_retry_after(status_code: int, headers: Any, text: str) -> None:
+    """Raise a RetryableResponseError for a throttling or unavailable response.
+
+    kodexa's process_response lets a 429 through as if it succeeded, and loses the ``Retry-After`` header of
+    both, so the clients check these statuses first.
+    """
+    if status_code not in RETRY_AFTER_STATUSES:
+        return
+    message = "Too Many Requests" if status_code == 429 else "Service unavailable"
+    raise RetryableResponseError(f"{message} ({text})", status_code, parse_retry_after(headers.get("retry-after")))
+
+
+def _is_connection_error(error: BaseException) -> bool:
+    import httpx
+    import requests
+
+    return isinstance(error, (requests.exceptions.ConnectionError, ConnectionError, httpx.NetworkError,
+                              httpx.RemoteProtocolError))
+
+
+def _was_never_sent(error: BaseException) -> bool:
+    """Determine whether an error means the request never reached the platform."""
+    import httpx
+    import requests
+
+    if isinstance(error, (requests.exceptions.ConnectTimeout, ConnectionRefusedError, httpx.ConnectError,
+                          httpx.ConnectTimeout, httpx.PoolTimeout)):
+        return True
+    message = str(error)
+    return _is_connection_error(error) and any(
+        reason in message for reason in ("NewConnectionError", "Connection refused", "Failed to establish")
+    )
+
+
+def status_code_of(error: BaseException) -> Optional[int]:
+    """The HTTP status code an error was raised for, if it carries one."""
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def is_transient_error(error: BaseException, idempotent: bool = True) -> bool:
+    """Determine whether an error is worth retrying.
+
+    Args:
+        error (BaseException): The error the request failed with
+        idempotent (bool): Whether the request can safely be repeated even if the platform acted on it
+
+    Returns:
+        bool: True for throttling, 5xx responses and connection problems (for non-idempotent requests, only those
+            where the platform can't have acted on the request)
+    """
+    import httpx
+    import requests
+
+    if isinstance(error, RetryableResponseError):
+        return True
+    status_code = status_code_of(error)
+    if status_code is not None:
+        return status_code in (TRANSIENT_STATUSES if idempotent else UNPROCESSED_STATUSES)
+    message = str(error)
+    if not idempotent:
+        return _was_never_sent(error) or message.startswith(UNPROCESSED_ERROR_MESSAGES)
+    if _is_connection_error(error) or isinstance(
+            error, (requests.exceptions.Timeout, requests.exceptions.ChunkedEncodingError, TimeoutError,
+                    httpx.TimeoutException)):
+        return True
+    return message.startswith(TRANSIENT_ERROR_MESSAGES)
+
+
+@dataclass
+class RetryPolicy:
+    """How long requests wait for the platform, and how transient failures are retried."""
+
+    retries: int = DEFAULT_RETRIES
+    backoff: float = DEFAULT_BACKOFF
+    max_wait: float = DEFAULT_MAX_WAIT
+    timeout: float = DEFAULT_TIMEOUT
+
+    def should_retry(self, error: BaseException, attempt: int, idempotent: bool = True) -> bool:
+        """Decide whether to retry after the given (zero-based) attempt failed."""
+        return attempt < self.retries and is_transient_error(error, idempotent)
+
+    def delay(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """Work out how long to wait before retrying after the given (zero-based) attempt.
+
+        The delay is drawn uniformly up to an exponentially growing bound (full jitter, so many clients backing
+        off together don't retry in lockstep), but is never shorter than a ``Retry-After`` the platform sent.
+        Neither is allowed to exceed ``max_wait``.
+        """
+        delay = random.uniform(0, min(self.max_wait, self.backoff * 2 ** attempt))
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return min(self.max_wait, delay)
+
+    def call(self, operation: Callable[[], Any], idempotent: bool = True,
+             on_retry: Optional[Callable[[BaseException, int, float], None]] = None) -> Any:
+        """Call an operation, retrying its transient failures.
+
+        Args:
+            operation (Callable[[], Any]): The operation to call
+            idempotent (bool): Whether the operation can safely be repeated even if the platform acted on it
+            on_retry (Optional[Callable[[BaseException, int, float], None]]): Called with the error, the number of
+                the retry about to be made and the delay before it
+
+        Returns:
+            Any: Whatever the operation returns
+        """
+        attempt = 0
+        while True:
+            try:
+                return operation()
+            except Exception as e:
+                if not self.should_retry(e, attempt, idempotent):
+                    raise
+                delay = self.delay(attempt, e)
+                if on_retry is not None:
+                    on_retry(e, attempt + 1, delay)
+                time.sleep(delay)
+                attempt += 1
+
+    async def call_async(self, operation: Callable[[], Awaitable[Any]], idempotent: bool = True,
+                         on_retry: Optional[Callable[[BaseException, int, float], None]] = None) -> Any:
+        """The asyncio counterpart of ``call``."""
+        import asyncio
+
+        attempt = 0
+        while True:
+            try:
+                return await operation()
+            except Exception as e:
+                if not self.should_retry(e, attempt, idempotent):
+                    raise
+                delay = self.delay(attempt, e)
+                if on_retry is not None:
+                    on_retry(e, attempt + 1, delay)
+                await asyncio.sleep(delay)
+                attempt += 1
+
+
+_policy = RetryPolicy()
+
+
+def get_policy() -> RetryPolicy:
+    """
+    :return: the retry policy configured for this run of the CLI
+    """
+    return _policy
+
+
+def set_policy(policy: RetryPolicy) -> None:
+    """Configure the retry policy every client in this run uses."""
+    global _policy
+    _policy = policy
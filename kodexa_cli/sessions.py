@@ -0,0 +1,78 @@
+"""
+A platform client that keeps its connections alive.
+
+The kodexa client calls ``requests.get``/``put``/... directly, opening (and, over TLS, handshaking) a new
+connection for every request.  For bulk operations that make many small requests that set-up is most of the
+cost, so this client sends the same requests over a ``requests.Session`` per thread, reusing connections.
+Transient failures are retried with the CLI's retry policy.
+"""
+import os
+import threading
+from typing import Any, Optional
+
+from kodexa_cli.retry import IDEMPOTENT_METHODS, RetryPolicy, get_policy, raise_for_retry_after
+
+
+class KeepAliveClient:
+    """Sends authenticated requests to the platform, as the kodexa client does, over pooled connections."""
+
+    def __init__(self, url: str, access_token: str, pool_size: int = 10, policy: Optional[RetryPolicy] = None):
+        """
+        Args:
+            url (str): The URL of the platform
+            access_token (str): The access token
+            pool_size (int): The most connections each thread keeps open
+            policy (Optional[RetryPolicy]): How to retry transient failures (defaults to the CLI's policy)
+        """
+        self.base_url = url.rstrip("/")
+        self.access_token = access_token
+        self.pool_size = pool_size
+        self.policy = policy if policy is not None else get_policy()
+        self.local = threading.local()
+
+    @property
+    def session(self) -> Any:
+        session = getattr(self.local, "session", None)
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({
+                "x-access-token": self.access_token,
+                "cf-access-token": os.environ.get("CF_TOKEN", ""),
+                "X-Requested-With": "XMLHttpRequest",
+            })
+            self.local.session = session
+        return session
+
+    def request(self, method: str, path: str, params: Optional[dict] = None, body: Optional[Any] = None,
+                stream: bool = False) -> Any:
+        """Send a request, retrying transient failures and raising kodexa's exceptions for error responses.
+
+        Returns:
+            requests.Response: The response
+        """
+        from kodexa.platform.client import process_response
+
+        def send() -> Any:
+            response = self.session.request(
+                method, f"{self.base_url}/{path.lstrip('/')}", params=params, json=body, stream=stream,
+                headers={"content-type": "application/json"}, timeout=self.policy.timeout,
+            )
+            raise_for_retry_after(response.status_code, response.headers, response.text)
+            return process_response(response)
+
+        return self.policy.call(send, idempotent=method in IDEMPOTENT_METHODS)
+
+    def get(self, path: str, params: Optional[dict] = None, stream: bool = False) -> Any:
+        return self.request("GET", path, params, stream=stream)
+
+    def put(self, path: str, params: Optional[dict] = None, body: Optional[Any] = None) -> Any:
+        return self.request("PUT", path, params, body)
+
+    def delete(self, path: str, params: Optional[dict] = None) -> Any:
+        return self.request("DELETE", path, params)
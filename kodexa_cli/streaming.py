@@ -0,0 +1,94 @@
+"""
+Helpers for streaming large result sets from the Kodexa platform.
+"""
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterator, Optional, Sequence
+
+DEFAULT_PREFETCH_PAGES = 4
+
+
+def prefetch_pages(fetch_page: Callable[[int], Optional[Sequence]], first_page: int = 1,
+                   prefetch: int = DEFAULT_PREFETCH_PAGES, page_size: Optional[int] = None) -> Iterator:
+    """Yield the items of consecutive pages, keeping up to ``prefetch`` page requests in flight.
+
+    Pages are requested in order on a small thread pool and their items are yielded in order, so the latency
+    of each page request overlaps with the consumer working through the previous pages.  No more than
+    ``prefetch`` pages are ever requested ahead of the consumer, which keeps memory bounded.
+
+    Args:
+        fetch_page (Callable[[int], Optional[Sequence]]): Returns the items on the given (1-based) page
+        first_page (int): The first page to fetch
+        prefetch (int): The number of pages to keep in flight (1 fetches pages one at a time)
+        page_size (Optional[int]): If given, a page with fewer items is treated as the last page
+
+    Yields:
+        The items of each page, in order, until an empty (or short) page is reached
+    """
+    prefetch = max(1, prefetch)
+    executor = ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix="kodexa-prefetch")
+    pending: deque[Future] = deque()
+    next_page = first_page
+    try:
+        while True:
+            while len(pending) < prefetch:
+                pending.append(executor.submit(fetch_page, next_page))
+                next_page += 1
+
+            items = pending.popleft().result()
+            if not items:
+                return
+            yield from items
+
+            if page_size is not None and len(items) < page_size:
+                return
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class StreamingObjectWriter:
+    """Writes objects to a file one at a time as they arrive, so memory use doesn't grow with the result size.
+
+    Supported formats are ``json`` (an array, written incrementally), ``jsonl`` (one object per line) and
+    ``yaml`` (one YAML document per object).  The file is flushed every ``flush_every`` objects so partial
+    results are visible, and usable, while a long export is still running.
+    """
+
+    FORMATS = ("json", "jsonl", "yaml")
+
+    def __init__(self, path: str, output_format: str = "jsonl", flush_every: int = 100):
+        if output_format not in self.FORMATS:
+            raise Exception(f"Unable to stream objects as {output_format}, must be one of {', '.join(self.FORMATS)}")
+        self.path = path
+        self.output_format = output_format
+        self.flush_every = flush_every
+        self.count = 0
+        self.file = None
+
+    def __enter__(self) -> "StreamingObjectWriter":
+        self.file = open(self.path, "w")
+        if self.output_format == "json":
+            self.file.write("[")
+        return self
+
+    def write(self, obj: dict) -> None:
+        import json
+
+        if self.output_format == "jsonl":
+            self.file.write(json.dumps(obj) + "\n")
+        elif self.output_format == "json":
+            separator = ",\n" if self.count else "\n"
+            self.file.write(separator + json.dumps(obj, indent=4))
+        else:
+            import yaml
+
+            self.file.write("---\n" + yaml.dump(obj, indent=4))
+
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self.file.flush()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self.output_format == "json":
+            self.file.write("\n]\n" if self.count else "]\n")
+        self.file.close()
@@ -0,0 +1,104 @@
+"""
+A manifest of the document families mirrored into a directory, so ``query --sync-to`` only fetches what changed.
+
+Each family is recorded with a version computed from what the store reports about it (its modified time,
+change sequence and content objects) along with the SHA-256 of every file saved for it.  A family whose
+version is unchanged, and whose files are all still there, is skipped on the next run.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+MANIFEST_NAME = ".kodexa-sync.db"
+
+
+def _timestamp(value: Any) -> Optional[str]:
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def family_version(doc_family: Any) -> str:
+    """Compute a version of a document family that changes whenever its content does.
+
+    Returns:
+        str: A hex digest of the family's modified time, change sequence and content objects
+    """
+    state = {
+        "modified": _timestamp(doc_family.modified),
+        "changeSequence": doc_family.change_sequence,
+        "contentObjects": [
+            [content_object.id, _timestamp(content_object.modified), content_object.size]
+            for content_object in doc_family.content_objects or []
+        ],
+    }
+    return hashlib.sha256(json.dumps(state, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class SyncManifest:
+    """Records the version and files of each document family mirrored into a directory.
+
+    Backed by SQLite in the directory itself, so the manifest travels with the mirror and concurrent workers
+    can share it.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory (str): The directory being synced to
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS families ("
+                "id TEXT PRIMARY KEY, path TEXT, modified TEXT, version TEXT, files TEXT, synced_at REAL)"
+            )
+
+    def is_current(self, doc_family: Any, kinds: list[str]) -> bool:
+        """Check whether the family's requested artifacts were saved at its current version and are still there.
+
+        Args:
+            doc_family (Any): The document family, as listed from the store
+            kinds (list[str]): The kinds of artifact being synced
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT version, files FROM families WHERE id = ?", (doc_family.id,)
+            ).fetchone()
+        if row is None or row[0] != family_version(doc_family):
+            return False
+        files = json.loads(row[1])
+        return all(
+            kind in files and os.path.isfile(files[kind]["path"])
+            and os.path.getsize(files[kind]["path"]) == files[kind]["size"]
+            for kind in kinds
+        )
+
+    def record(self, doc_family: Any, files: dict[str, dict[str, Any]]) -> None:
+        """Record the artifacts saved for a family.
+
+        Args:
+            doc_family (Any): The document family
+            files (dict[str, dict[str, Any]]): The path, size and sha256 of the file saved for each kind of artifact
+        """
+        version = family_version(doc_family)
+        with self.lock, self.connection:
+            row = self.connection.execute(
+                "SELECT version, files FROM families WHERE id = ?", (doc_family.id,)
+            ).fetchone()
+            if row is not None and row[0] == version:
+                # Keep the other kinds of artifact saved at this version by earlier runs
+                files = {**json.loads(row[1]), **files}
+            self.connection.execute(
+                "INSERT OR REPLACE INTO families VALUES (?, ?, ?, ?, ?, ?)",
+                (doc_family.id, doc_family.path, _timestamp(doc_family.modified), version,
+                 json.dumps(files, sort_keys=True), time.time()),
+            )
+
+    def close(self) -> None:
+        self.connection.close()
@@ -0,0 +1,110 @@
+"""
+Lazy enumeration of the files named on the command line, so commands can work through directories and glob
+patterns of any size without expanding them all up front (or hitting the shell's argument limit).
+"""
+import glob
+import os
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, Optional
+
+DEFAULT_QUEUE_SIZE = 10000
+
+_END = object()
+
+
+def walk_directory(path: str) -> Iterator[str]:
+    """Yield every file under a directory, depth first, using ``os.scandir``."""
+    stack = [path]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            directories = []
+            for entry in sorted(entries, key=lambda entry: entry.name):
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                elif entry.is_file():
+                    yield entry.path
+            stack.extend(reversed(directories))
+
+
+def iter_files(paths: Iterable[str], skip_json: bool = False) -> Iterator[str]:
+    """Expand paths into the files they name.
+
+    A directory expands to every file beneath it, and a glob pattern (quote it so the shell leaves it alone)
+    to every file it matches, with ``**`` matching any number of directories.  Anything else is passed through
+    as is, so a missing file is reported when it is used.
+
+    Args:
+        paths (Iterable[str]): Files, directories and glob patterns
+        skip_json (bool): Leave out the .json files found in directories and patterns (they hold the external
+            data for the files next to them)
+
+    Yields:
+        str: The path of each file
+    """
+    for path in paths:
+        path = os.path.expanduser(path)
+        if os.path.isdir(path):
+            files = walk_directory(path)
+        elif glob.has_magic(path):
+            files = (match for match in glob.iglob(path, recursive=True) if os.path.isfile(match))
+        else:
+            yield path
+            continue
+
+        for file in files:
+            if not (skip_json and file.lower().endswith(".json")):
+                yield file
+
+
+def enqueue_files(paths: Iterable[str], skip_json: bool = False, maxsize: int = DEFAULT_QUEUE_SIZE,
+                  on_found: Optional[Callable[[int], None]] = None) -> Iterator[str]:
+    """Expand paths on a background thread, feeding a bounded queue the consumer reads from.
+
+    The enumeration runs ahead of the consumer by at most ``maxsize`` files, so memory stays bounded while the
+    consumer (and any progress display) learns how many files there are as they are found.
+
+    Args:
+        paths (Iterable[str]): Files, directories and glob patterns, as for ``iter_files``
+        skip_json (bool): Leave out .json files found in directories and patterns
+        maxsize (int): The most files enumerated but not yet consumed
+        on_found (Optional[Callable[[int], None]]): Called with the running count each time a file is found
+
+    Yields:
+        str: The path of each file, in enumeration order
+    """
+    found: queue.Queue = queue.Queue(maxsize=maxsize)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                found.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def enumerate_files():
+        try:
+            for count, file in enumerate(iter_files(paths, skip_json), start=1):
+                if not put(file):
+                    return
+                if on_found is not None:
+                    on_found(count)
+            put(_END)
+        except BaseException as e:
+            put(e)
+
+    thread = threading.Thread(target=enumerate_files, name="kodexa-walk", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = found.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stopped.set()
@@ -0,0 +1,213 @@
+import asyncio
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+import requests
+from kodexa_cli.aio import AsyncPlatformClient, run_async_bulk
+from kodexa_cli.bulk import run_bulk
+from kodexa_cli.retry import RetryPolicy
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """A stub platform: 404 for paths containing 'missing', no response for 'hang', otherwise echo."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def respond(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.requests.append((self.command, self.path, self.headers.get("x-access-token"), body))
+
+        if "hang" in self.path:
+            time.sleep(1)
+            return
+        if "missing" in self.path:
+            self.send_response(404)
+            self.send_header("Content-Length", "7")
+            self.end_headers()
+            self.wfile.write(b"missing")
+        else:
+            content = f'{{"path": "{self.path}"}}'.encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+    do_GET = do_PUT = do_POST = do_DELETE = respond
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops the burst of connects a pool opens, stalling them for a SYN retry
+    request_queue_size = 128
+
+
+@pytest.fixture
+def stub_server():
+    """Run the stub platform on a free local port."""
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.requests = []
+    server.latency = 0.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_requests_reuse_pooled_connections(stub_server):
+    """Test many requests share a small number of keep-alive connections."""
+    client = AsyncPlatformClient(_url(stub_server), "token", max_connections=5)
+
+    async def fetch(item):
+        response = await client.get(f"/api/items/{item}")
+        assert response.json() == {"path": f"/api/items/{item}"}
+
+    summary = run_async_bulk("get", list(range(100)), fetch, str, concurrency=20, on_complete=client.close)
+    assert summary.succeeded == 100
+    assert stub_server.connections <= 5
+    assert all(token == "token" for _, _, token, _ in stub_server.requests)
+
+
+def test_error_responses(stub_server):
+    """Test error statuses raise kodexa's messages."""
+    client = AsyncPlatformClient(_url(stub_server), "token")
+
+    async def run():
+        try:
+            with pytest.raises(Exception, match="Not found"):
+                await client.get("/api/missing")
+            # The connection is still usable after an error response
+            assert (await client.put("/api/items/1", params={"label": "a b"})).status_code == 200
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+    assert stub_server.requests[-1][1] == "/api/items/1?label=a+b"
+
+
+def test_post_file(stub_server, tmp_path):
+    """Test uploads are streamed from disk as a multipart form, hashing the file as it is sent."""
+    import hashlib
+
+    client = AsyncPlatformClient(_url(stub_server), "token")
+    upload = tmp_path / "a.pdf"
+    upload.write_bytes(b"%PDF" * 300000)
+
+    async def run():
+        try:
+            return await client.post_file("/api/stores/org/store/fs", {"path": "a.pdf"}, {"externalData": "{}"},
+                                          "file", str(upload))
+        finally:
+            await client.close()
+
+    response, sent_hash = asyncio.run(run())
+    assert response.status_code == 200
+    assert sent_hash == hashlib.sha256(upload.read_bytes()).hexdigest()
+    method, path, _, body = stub_server.requests[0]
+    assert (method, path) == ("POST", "/api/stores/org/store/fs?path=a.pdf")
+    assert b'name="externalData"\r\n\r\n{}' in body
+    assert b'filename="a.pdf"' in body and upload.read_bytes() in body
+
+
+def test_downloads_are_streamed_to_a_file(stub_server, tmp_path):
+    """Test downloads only replace the destination once they are complete."""
+    client = AsyncPlatformClient(_url(stub_server), "token")
+    destination = tmp_path / "doc.pdf"
+    content = b'{"path": "/api/items/1"}'
+
+    async def run():
+        try:
+            assert await client.download("/api/items/1", str(destination)) == len(content)
+            with pytest.raises(Exception, match="Not found"):
+                await client.download("/api/missing", str(destination))
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+    assert destination.read_bytes() == content
+    assert not (tmp_path / "doc.pdf.part").exists()
+
+
+def test_requests_time_out(stub_server):
+    """Test a request the platform never answers fails once the timeout passes."""
+    client = AsyncPlatformClient(_url(stub_server), "token", policy=RetryPolicy(retries=0, timeout=0.2))
+
+    async def run():
+        try:
+            with pytest.raises(httpx.TimeoutException):
+                await client.get("/api/hang")
+        finally:
+            await client.close()
+
+    start = time.monotonic()
+    asyncio.run(run())
+    assert time.monotonic() - start < 1
+
+
+def test_failures_are_counted(stub_server):
+    """Test failed items are reported rather than stopping the run."""
+    client = AsyncPlatformClient(_url(stub_server), "token")
+
+    async def fetch(item):
+        await client.get(f"/api/{item}")
+
+    summary = run_async_bulk("get", ["a", "missing", "b"], fetch, str, retries=0, on_complete=client.close)
+    assert (summary.succeeded, summary.failed) == (2, 1)
+    assert summary.errors[0]["id"] == "missing"
+
+
+def test_engine_benchmark(stub_server):
+    """Compare the thread and async engines against the stub server at the same concurrency."""
+    stub_server.latency = 0.01
+    url = _url(stub_server)
+    items = list(range(200))
+    concurrency = 20
+
+    thread_summary = run_bulk("get", items, lambda item: requests.get(f"{url}/api/items/{item}").raise_for_status(),
+                              str, threads=concurrency, max_in_flight=concurrency)
+
+    client = AsyncPlatformClient(url, "token", max_connections=concurrency)
+
+    async def fetch(item):
+        await client.get(f"/api/items/{item}")
+
+    async_summary = run_async_bulk("get", items, fetch, str, concurrency=concurrency, on_complete=client.close)
+
+    for name, summary in (("threads", thread_summary), ("async", async_summary)):
+        print(f"{name}: {len(items) / summary.elapsed:.0f} requests/s")
+        assert summary.succeeded == len(items)
+
+
+def test_keep_alive_client_reuses_connections(stub_server):
+    """Test the thread engine's keep-alive client sends many requests over one connection per thread."""
+    from kodexa_cli.sessions import KeepAliveClient
+
+    client = KeepAliveClient(_url(stub_server), "token")
+    for item in range(20):
+        client.put(f"/api/stores/org/store/families/{item}/addLabel", params={"label": "reviewed"})
+    assert stub_server.connections == 1
+    assert stub_server.requests[-1][:3] == ("PUT", "/api/stores/org/store/families/19/addLabel?label=reviewed",
+                                            "token")
+    with pytest.raises(Exception, match="Not found"):
+        client.get("/api/missing")
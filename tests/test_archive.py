@@ -0,0 +1,100 @@
+import os
+import random
+import zipfile
+
+import pytest
+
+from kodexa_cli.archive import (DEFLATED, STORED, CompressionPolicy, ReproducibleZipWriter, dos_timestamp,
+                                write_reproducible_zip)
+
+
+@pytest.fixture
+def sources(tmp_path):
+    rng = random.Random(7)
+    contents = {
+        "model/__init__.py": b"",
+        "model/model.py": b"def infer(document):\n    return document\n" * 200,
+        "model/weights.bin": bytes(rng.getrandbits(8) for _ in range(200_000)) + b"\0" * 300_000,
+        "model/logo.png": b"\x89PNG" + bytes(rng.getrandbits(8) for _ in range(5000)),
+        "docs/über.txt": "unicode names".encode("utf-8"),
+    }
+    files = []
+    for i, (name, data) in enumerate(contents.items()):
+        path = tmp_path / f"source-{i}"
+        path.write_bytes(data)
+        files.append((str(path), name))
+    return files
+
+
+def _zip(files, destination, **kwargs):
+    write_reproducible_zip(files, str(destination), **kwargs)
+    return destination.read_bytes()
+
+
+def test_round_trip(sources, tmp_path):
+    destination = tmp_path / "out.zip"
+    assert write_reproducible_zip(sources, str(destination)) == len(sources)
+
+    with zipfile.ZipFile(destination) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == [name for _, name in sources]
+        for path, name in sources:
+            assert zf.read(name) == open(path, "rb").read()
+        info = zf.getinfo("model/model.py")
+        assert info.date_time == (1980, 1, 1, 0, 0, 0)
+        assert info.external_attr >> 16 == 0o100644
+    assert not (tmp_path / "out.zip.part").exists()
+
+
+def test_output_depends_only_on_inputs(sources, tmp_path):
+    first = _zip(sources, tmp_path / "first.zip")
+    for path, _ in sources:
+        os.utime(path, (1_700_000_000, 1_700_000_000))
+    # Compressing on several threads gives the same bytes as compressing on one
+    with open(tmp_path / "threaded.zip", "wb") as fp, ReproducibleZipWriter(fp, threads=4) as writer:
+        for path, name in sources:
+            writer.add_file(path, name)
+
+    assert _zip(sources, tmp_path / "second.zip") == first
+    assert (tmp_path / "threaded.zip").read_bytes() == first
+
+
+def test_parallel_blocks_decompress(sources, tmp_path):
+    destination = tmp_path / "blocks.zip"
+    with open(destination, "wb") as fp, ReproducibleZipWriter(fp, threads=3, block_size=4096) as writer:
+        for path, name in sources:
+            writer.add_file(path, name)
+
+    with zipfile.ZipFile(destination) as zf:
+        assert zf.testzip() is None
+        assert zf.read("model/weights.bin") == open(sources[2][0], "rb").read()
+
+
+def test_compression_policy(sources, tmp_path):
+    policy = CompressionPolicy(level=9, stored_suffixes=(".png", ".BIN"))
+    assert policy.compression_for("model/logo.png") == STORED
+    assert policy.compression_for("model/weights.bin") == STORED
+    assert policy.compression_for("model/model.py") == DEFLATED
+    assert CompressionPolicy(level=0).compression_for("model/model.py") == STORED
+    assert policy.key() != CompressionPolicy().key()
+
+    destination = tmp_path / "policy.zip"
+    write_reproducible_zip(sources, str(destination), policy)
+    with zipfile.ZipFile(destination) as zf:
+        assert zf.getinfo("model/logo.png").compress_type == zipfile.ZIP_STORED
+        assert zf.getinfo("model/model.py").compress_type == zipfile.ZIP_DEFLATED
+        assert zf.read("model/weights.bin") == open(sources[2][0], "rb").read()
+
+
+def test_source_date_epoch(monkeypatch):
+    assert dos_timestamp(0) == ((1 << 5) | 1, 0)
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    # 2023-11-14 22:13:20 UTC
+    assert dos_timestamp() == (((2023 - 1980) << 9) | (11 << 5) | 14, (22 << 11) | (13 << 5) | 10)
+
+
+def test_failed_write_leaves_no_partial_zip(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        write_reproducible_zip([(str(tmp_path / "missing"), "missing")], str(tmp_path / "out.zip"))
+
+    assert not list(tmp_path.iterdir())
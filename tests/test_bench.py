@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from kodexa_cli.bench import BENCH_STORE_REF, SCENARIOS, MockPlatform, run_scenario
+from kodexa_cli.cli import cli
+
+
+@pytest.fixture
+def platform():
+    with MockPlatform(latency=0.001, families=25, objects=30) as platform:
+        yield platform
+
+
+def test_mock_platform_pages_listings(platform):
+    status, page = platform.handle("GET", "/api/projects", {"page": "3", "pageSize": "10"}, b"")
+    assert status == 200
+    assert [o["id"] for o in page["content"]] == [f"project-{i}" for i in range(20, 30)]
+    assert page["last"] and page["totalElements"] == 30
+
+    store_path = "/api/stores/" + BENCH_STORE_REF.replace(":", "/") + "/families"
+    status, page = platform.handle("GET", store_path, {"page": "4", "pageSize": "10"}, b"")
+    assert status == 200 and page["empty"]
+
+
+def test_mock_platform_deploys_components(platform):
+    component = {"type": "store", "orgSlug": "bench", "slug": "s", "version": "1.0.0"}
+    assert platform.handle("GET", "/api/stores/bench/s/1.0.0", {}, b"")[0] == 404
+    assert platform.handle("POST", "/api/stores/bench", {}, json.dumps(component).encode())[0] == 200
+    assert platform.handle("GET", "/api/stores/bench/s/1.0.0", {}, b"") == (200, component)
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_scenarios(platform, scenario):
+    result = run_scenario(scenario, platform, page_size=10, threads=3, files=6, file_size=128, components=4)
+
+    assert result.exit_code == 0
+    assert result.items == {"get": 30, "query": 25, "upload": 6, "deploy": 4}[scenario]
+    assert result.requests == len(result.latencies) > 0
+    summary = result.to_dict()
+    assert summary["itemsPerSecond"] > 0
+    assert summary["latencyMs"]["p95"] >= summary["latencyMs"]["p50"] >= 1.0
+
+
+def test_scenarios_reach_the_platform(platform):
+    run_scenario("query", platform, page_size=10, threads=3)
+    run_scenario("upload", platform, threads=3, files=6, file_size=128)
+    run_scenario("deploy", platform, components=4)
+
+    assert platform.labels == 25
+    assert platform.uploads == 6
+    assert sorted(platform.components) == [f"bench/store-{i}:1.0.0" for i in range(4)]
+
+
+def test_bench_command(cli_runner, tmp_path):
+    output_file = tmp_path / "bench.json"
+    result = cli_runner.invoke(cli, [
+        "bench", "--scenario", "get", "--scenario", "deploy", "--latency", "0", "--items", "20",
+        "--page-size", "5", "--components", "3", "--format", "json", "--output-file", str(output_file),
+    ])
+
+    assert result.exit_code == 0, result.output
+    results = json.loads(output_file.read_text())
+    assert [r["scenario"] for r in results] == ["get", "deploy"]
+    assert [r["items"] for r in results] == [20, 3]
+    # get pages through the 4 full pages (prefetching may read a little past the end)
+    assert results[0]["requests"] >= 4
@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+from kodexa_cli import bulk
+from kodexa_cli.bulk import AdaptiveLimiter, BulkSummary, TokenBucket, call_with_retry, run_bulk
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Skip the backoff delays."""
+    monkeypatch.setattr(bulk.time, "sleep", lambda seconds: None)
+
+
+def test_token_bucket_limits_rate():
+    """Test the bucket only allows a burst of its capacity, then the configured rate."""
+    bucket = TokenBucket(50, capacity=1)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.09
+
+
+def test_call_with_retry_retries_transient_errors(no_sleep):
+    """Test transient errors are retried until the operation succeeds."""
+    attempts = []
+
+    def operation():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise Exception("Service unavailable (try later)")
+        return "done"
+
+    assert call_with_retry(operation, retries=3) == "done"
+    assert len(attempts) == 3
+
+
+def test_call_with_retry_does_not_retry_client_errors(no_sleep):
+    """Test errors that won't go away are raised straight away."""
+    attempts = []
+
+    def operation():
+        attempts.append(1)
+        raise Exception("Not found (missing)")
+
+    with pytest.raises(Exception, match="Not found"):
+        call_with_retry(operation, retries=3)
+    assert len(attempts) == 1
+
+
+def test_run_bulk_summary(no_sleep):
+    """Test the summary counts successes and failures."""
+    def action(item):
+        if item % 4 == 0:
+            raise Exception("Forbidden")
+
+    summary = run_bulk("delete", range(1, 21), action, str, threads=3)
+    assert summary.succeeded == 15
+    assert summary.failed == 5
+    assert {"id": "4", "error": "Forbidden"} in summary.to_dict()["errors"]
+
+
+def test_run_bulk_pulls_items_lazily():
+    """Test the stream is consumed only as workers free up."""
+    completed = []
+    ahead = []
+
+    def items():
+        for item in range(100):
+            ahead.append(item - len(completed))
+            yield item
+
+    summary = run_bulk("delete", items(), completed.append, str, threads=2)
+    assert summary.succeeded == 100
+    assert max(ahead) <= 4
+
+
+def test_run_bulk_tracks_operations():
+    """Test each tracked step is counted separately from the item outcome."""
+    summary = BulkSummary("query")
+
+    def action(item):
+        with summary.track("download"):
+            pass
+        with summary.track("label"):
+            if item == 2:
+                raise Exception("Not found")
+
+    run_bulk("query", range(4), action, str, threads=2, retries=0, summary=summary)
+    assert summary.succeeded == 3
+    assert summary.operations == {"download": {"succeeded": 4, "failed": 0}, "label": {"succeeded": 3, "failed": 1}}
+    assert summary.to_dict()["operations"]["label"]["failed"] == 1
+
+
+def test_adaptive_limiter_increases_and_backs_off():
+    """Test the limit grows while healthy, halves on throttling and ignores other errors."""
+    limiter = AdaptiveLimiter(initial=4, max_limit=16)
+    for _ in range(40):
+        limiter.observe(0.1)
+    assert limiter.current > 4
+
+    before = limiter.limit
+    limiter.observe(0.1, Exception("Not found (missing)"))
+    assert limiter.limit == before
+
+    limiter.observe(0.1, Exception("Too Many Requests"))
+    assert limiter.limit == before / 2
+    # A burst of errors within one round trip only backs off once
+    limiter.observe(0.1, Exception("Too Many Requests"))
+    assert limiter.limit == before / 2
+
+
+def test_run_bulk_with_adaptive_limiter():
+    """Test the limiter bounds concurrency and every item is still processed."""
+    limiter = AdaptiveLimiter(initial=2, max_limit=4)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def action(item):
+        with lock:
+            active.append(item)
+            peak.append(len(active))
+        time.sleep(0.005)
+        with lock:
+            active.remove(item)
+
+    summary = run_bulk("test", range(100), action, str, limiter=limiter)
+    assert summary.succeeded == 100
+    assert max(peak) <= 4
+    assert limiter.in_flight == 0
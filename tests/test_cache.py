@@ -0,0 +1,118 @@
+import pytest
+from kodexa_cli import cache as cache_module
+from kodexa_cli.cache import ObjectCache
+from kodexa_cli.cli import cli
+
+
+@pytest.fixture
+def object_cache(tmp_path):
+    """Create an object cache in a temporary directory."""
+    object_cache = ObjectCache(str(tmp_path / "objects.db"))
+    yield object_cache
+    object_cache.close()
+
+
+def test_fetch_hit_and_miss(object_cache):
+    """Test a fresh entry is served without calling the loader."""
+    calls = []
+
+    def load(validators):
+        calls.append(validators)
+        return {"slug": "my-store"}, '"v1"', None
+
+    assert object_cache.fetch("https://platform", "stores", "org/my-store", load) == {"slug": "my-store"}
+    assert object_cache.fetch("https://platform", "stores", "org/my-store", load) == {"slug": "my-store"}
+    assert calls == [{}]
+
+    stats = object_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_fetch_revalidates_stale_entry(object_cache):
+    """Test a stale entry is revalidated with its ETag and kept on 304."""
+    object_cache.put("https://platform", "stores", "org/my-store", {"slug": "my-store"}, etag='"v1"')
+    calls = []
+
+    def not_modified(validators):
+        calls.append(validators)
+        return None
+
+    assert object_cache.fetch("https://platform", "stores", "org/my-store", not_modified, ttl=0) == {"slug": "my-store"}
+    assert calls == [{"If-None-Match": '"v1"'}]
+    assert object_cache.stats()["revalidations"] == 1
+
+
+def test_entries_are_scoped_by_url(object_cache):
+    """Test the same ref on different platforms are different entries."""
+    object_cache.put("https://one", "stores", "org/my-store", {"from": "one"})
+    assert object_cache.get("https://two", "stores", "org/my-store") is None
+    assert object_cache.get("https://one", "stores", "org/my-store").data == {"from": "one"}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """Test the cache evicts the least recently used entries once it is over size."""
+    object_cache = ObjectCache(str(tmp_path / "objects.db"), max_bytes=60)
+    try:
+        object_cache.put("https://platform", "stores", "org/a", {"value": "a" * 10})
+        object_cache.put("https://platform", "stores", "org/b", {"value": "b" * 10})
+        object_cache.get("https://platform", "stores", "org/a")
+        object_cache.put("https://platform", "stores", "org/c", {"value": "c" * 10})
+
+        assert object_cache.get("https://platform", "stores", "org/b") is None
+        assert object_cache.get("https://platform", "stores", "org/a") is not None
+        assert object_cache.stats()["evictions"] == 1
+    finally:
+        object_cache.close()
+
+
+def test_cache_command(cli_runner, tmp_path, monkeypatch):
+    """Test the cache stats and clear commands."""
+    monkeypatch.setattr(cache_module, "get_cache_path", lambda: str(tmp_path / "objects.db"))
+    object_cache = ObjectCache()
+    object_cache.put("https://platform", "stores", "org/my-store", {"slug": "my-store"})
+    object_cache.close()
+
+    result = cli_runner.invoke(cli, ['cache', 'stats'])
+    assert result.exit_code == 0
+    assert "Object Cache" in result.output
+
+    result = cli_runner.invoke(cli, ['cache', 'clear'])
+    assert result.exit_code == 0
+    assert "Object cache cleared" in result.output
+
+
+def test_get_cached_object_fetches_through_the_client(tmp_path, monkeypatch):
+    """Test cached objects are fetched, and revalidated, through the client."""
+    from unittest.mock import MagicMock
+
+    from kodexa_cli.cli import get_cached_object
+
+    monkeypatch.setattr(cache_module, "get_cache_path", lambda: str(tmp_path / "objects.db"))
+    client = MagicMock()
+    client.get.return_value = MagicMock(status_code=200, headers={"ETag": '"v1"'})
+    client.get.return_value.json.return_value = {"slug": "my-store"}
+    build = lambda data: MagicMock(model_dump=lambda **kwargs: data)  # noqa: E731
+
+    args = ("https://platform", "stores", "org/my-store", "/api/stores/org/my-store", build)
+    assert get_cached_object(client, *args, 300) == {"slug": "my-store"}
+    client.get.assert_called_once_with("/api/stores/org/my-store", headers={})
+
+    client.get.return_value = MagicMock(status_code=304)
+    assert get_cached_object(client, *args, 0, max_bytes=1024) == {"slug": "my-store"}
+    client.get.assert_called_with("/api/stores/org/my-store", headers={"If-None-Match": '"v1"'})
+
+
+def test_cache_size_limit_comes_from_option_or_profile(cli_runner, mock_kodexa_platform, tmp_path, monkeypatch):
+    """Test the cache size limit can be set on the command line or in the profile."""
+    monkeypatch.setattr(cache_module, "get_cache_path", lambda: str(tmp_path / "objects.db"))
+    mock_kodexa_platform.get_setting.side_effect = lambda key, profile=None: {"cache_max_mb": "2"}.get(key)
+
+    result = cli_runner.invoke(cli, ['cache', 'stats'])
+    assert result.exit_code == 0, result.output
+    assert "2,097,152 bytes" in result.output
+
+    result = cli_runner.invoke(cli, ['cache', 'stats', '--cache-max-mb', '1'])
+    assert result.exit_code == 0, result.output
+    assert "1,048,576 bytes" in result.output
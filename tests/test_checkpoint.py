@@ -0,0 +1,52 @@
+import pytest
+from kodexa_cli.checkpoint import Checkpoint
+
+RUN = {"ref": "org/store", "query": "*", "filter": False, "startingOffset": None}
+
+
+def test_checkpoint_resume(tmp_path):
+    """Test completed families are reloaded when resuming."""
+    path = str(tmp_path / "progress.jsonl")
+    with Checkpoint(path, RUN) as checkpoint:
+        for position, family_id in ((1, "a"), (2, "b"), (4, "d")):
+            checkpoint.record(position, family_id)
+
+    checkpoint = Checkpoint(path, RUN, resume=True)
+    try:
+        assert checkpoint.is_completed("b")
+        assert not checkpoint.is_completed("c")
+        assert checkpoint.resume_offset() == 2
+    finally:
+        checkpoint.close()
+
+
+def test_checkpoint_batches_writes(tmp_path):
+    """Test records are buffered until a batch is full."""
+    path = tmp_path / "progress.jsonl"
+    checkpoint = Checkpoint(str(path), RUN, flush_every=3, flush_interval=3600)
+    checkpoint.record(1, "a")
+    checkpoint.record(2, "b")
+    assert len(path.read_text().splitlines()) == 1
+    checkpoint.record(3, "c")
+    assert len(path.read_text().splitlines()) == 4
+    checkpoint.close()
+
+
+def test_checkpoint_ignores_torn_line(tmp_path):
+    """Test a partially written final record doesn't stop a resume."""
+    path = tmp_path / "progress.jsonl"
+    with Checkpoint(str(path), RUN) as checkpoint:
+        checkpoint.record(1, "a")
+    with open(path, "a") as f:
+        f.write('{"position": 2, "i')
+
+    with Checkpoint(str(path), RUN, resume=True) as checkpoint:
+        assert checkpoint.completed_ids == {"a"}
+
+
+def test_checkpoint_rejects_different_query(tmp_path):
+    """Test a checkpoint can't be resumed for a different query."""
+    path = str(tmp_path / "progress.jsonl")
+    Checkpoint(path, RUN).close()
+    with pytest.raises(Exception, match="query"):
+        Checkpoint(path, {**RUN, "query": "other"}, resume=True)
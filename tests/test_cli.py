@@ -27,3 +27,14 @@ def test_global_profile_option_invalid(cli_runner, mock_kodexa_platform):
     assert result.exit_code == 1
     assert "Profile 'invalid' does not exist" in result.output
     assert "Available profiles: default,dev,prod" in result.output
+
+
+def test_thread_count_accepts_auto():
+    """Test --threads takes a number or 'auto'."""
+    import click
+    from kodexa_cli.cli import ThreadCount
+
+    assert ThreadCount().convert("auto", None, None) == "auto"
+    assert ThreadCount().convert("8", None, None) == 8
+    with pytest.raises(click.BadParameter):
+        ThreadCount().convert("lots", None, None)
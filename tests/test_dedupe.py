@@ -0,0 +1,57 @@
+import hashlib
+
+from kodexa_cli.dedupe import Deduplicator, hash_file
+
+
+def test_hash_file_matches_hashlib(tmp_path):
+    """Test the memory mapped hash matches a plain one, including for empty files."""
+    for name, content in (("empty.pdf", b""), ("scan.pdf", b"%PDF" * 100000)):
+        path = tmp_path / name
+        path.write_bytes(content)
+        assert hash_file(str(path)) == (str(path), len(content), hashlib.sha256(content).hexdigest())
+
+
+def test_duplicates_are_skipped(tmp_path):
+    """Test only the first file with each content is kept, in order, and the saving is counted."""
+    paths = []
+    for name, content in (("a.pdf", b"one"), ("b.pdf", b"two"), ("copy-of-a.pdf", b"one"), ("c.pdf", b"three")):
+        (tmp_path / name).write_bytes(content)
+        paths.append(str(tmp_path / name))
+
+    skipped = []
+    deduplicator = Deduplicator(2, on_skip=lambda path, reason: skipped.append((path, reason)))
+    assert list(deduplicator.filter(paths)) == [paths[0], paths[1], paths[3]]
+    assert skipped == [(paths[2], f"duplicate of {paths[0]}")]
+    assert (deduplicator.duplicates, deduplicator.bytes_saved) == (1, 3)
+    assert deduplicator.content_hash(paths[0]) == hashlib.sha256(b"one").hexdigest()
+    assert deduplicator.content_hash(paths[0]) is None
+    assert deduplicator.content_hash(paths[2]) is None
+
+
+def test_known_hashes_and_missing_files(tmp_path):
+    """Test content already in the store is skipped and unreadable files are passed through."""
+    (tmp_path / "a.pdf").write_bytes(b"one")
+    known = hashlib.sha256(b"one").hexdigest()
+    missing = str(tmp_path / "missing.pdf")
+
+    deduplicator = Deduplicator(1, is_known=lambda content_hash: content_hash == known)
+    assert list(deduplicator.filter([str(tmp_path / "a.pdf"), missing])) == [missing]
+    assert deduplicator.duplicates == 1
+
+
+def test_hashing_processes_are_spawned(tmp_path, monkeypatch):
+    """Test the hashing pool doesn't fork the (multithreaded) upload process."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    from kodexa_cli import dedupe
+
+    contexts = []
+
+    def executor(*args, **kwargs):
+        contexts.append(kwargs.get("mp_context"))
+        return ProcessPoolExecutor(*args, **kwargs)
+
+    monkeypatch.setattr(dedupe, "ProcessPoolExecutor", executor)
+    (tmp_path / "a.pdf").write_bytes(b"one")
+    assert list(Deduplicator(1).filter([str(tmp_path / "a.pdf")])) == [str(tmp_path / "a.pdf")]
+    assert [context.get_start_method() for context in contexts] == ["spawn"]
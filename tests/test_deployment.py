@@ -0,0 +1,194 @@
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from kodexa_cli.bench import MockPlatform
+from kodexa_cli.cli import cli
+from kodexa_cli.deployment import (PlannedComponent, changed_paths, component_ref, dependency_graph,
+                                   deploy_components, deploy_order, format_plan)
+
+
+def _component(component_type, slug, **extra):
+    return {"type": component_type, "orgSlug": "org", "slug": slug, "version": "1.0.0", **extra}
+
+
+def test_component_ref():
+    assert component_ref(_component("store", "s")) == "org/s:1.0.0"
+    assert component_ref({"type": "store", "orgSlug": "org", "slug": "s"}) == "org/s"
+    assert component_ref({"type": "store"}) is None
+
+
+def test_dependency_graph_follows_references():
+    components = [
+        _component("assistant", "a", options={"stores": ["org/s:1.0.0"]}),
+        _component("dataForm", "f", taxonomies=[{"ref": "org/t"}]),
+        _component("store", "s"),
+        _component("taxonomy", "t"),
+        _component("store", "s2", metadata={"copyOf": "org/s:1.0.0"}),
+    ]
+
+    dependencies = dependency_graph(components)
+
+    assert dependencies == [{2}, {3}, set(), set(), {2}]
+    # The kind of component only orders the work: the assistant still waits for the data form and both stores
+    assert deploy_order(components, dependencies) == [{1, 2, 3, 4}, {3}, {3}, set(), {2, 3}]
+
+
+def test_dependency_graph_rejects_cycles():
+    components = [
+        _component("store", "a", metadata={"ref": "org/b:1.0.0"}),
+        _component("store", "b", metadata={"ref": "org/a:1.0.0"}),
+    ]
+    with pytest.raises(Exception, match="cycle"):
+        dependency_graph(components)
+
+
+def test_dependency_graph_rejects_references_to_later_kinds():
+    components = [_component("store", "s", metadata={"assistant": "org/a:1.0.0"}), _component("assistant", "a")]
+    with pytest.raises(Exception, match="cycle"):
+        dependency_graph(components)
+
+
+def test_deploy_components_runs_independent_components_concurrently():
+    components = [_component("taxonomy", "t")] + [_component("store", f"s{i}") for i in range(4)]
+    lock = threading.Lock()
+    deployed = []
+    running = {"now": 0, "peak": 0}
+
+    def deploy(component):
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.05)
+        with lock:
+            running["now"] -= 1
+            deployed.append(component["slug"])
+
+    summary = deploy_components(components, deploy, parallel=4)
+
+    assert summary.succeeded == 5 and summary.failed == 0
+    assert deployed[0] == "t"
+    assert running["peak"] == 4
+
+
+def test_deploy_components_only_skips_components_referencing_failures():
+    components = [
+        _component("taxonomy", "t"),
+        _component("store", "s"),
+        _component("assistant", "a", options={"store": "org/s:1.0.0"}),
+        _component("projectTemplate", "p", assistants=["org/a:1.0.0"]),
+        _component("assistant", "b"),
+        _component("extensionPack", "e"),
+    ]
+    order = []
+    outcomes = {}
+
+    def deploy(component):
+        order.append(component["slug"])
+        if component["slug"] == "s":
+            raise Exception("Bad store")
+
+    summary = deploy_components(components, deploy, parallel=2,
+                                on_done=lambda component, error: outcomes.update({component["slug"]: error}))
+
+    assert summary.succeeded == 3
+    assert summary.failed == 3
+    assert outcomes["t"] is None and outcomes["e"] is None and outcomes["b"] is None
+    assert str(outcomes["s"]) == "Bad store"
+    assert str(outcomes["a"]) == "Skipped, as org/s:1.0.0 could not be deployed"
+    assert str(outcomes["p"]) == "Skipped, as org/a:1.0.0 could not be deployed"
+    # The assistant that doesn't use the store is still deployed after it
+    assert order.index("b") > order.index("s")
+    assert "a" not in order and "p" not in order
+
+
+def test_deploy_command_deploys_in_dependency_order(cli_runner, mock_kodexa_client, mock_config_check, tmp_path):
+    order = []
+
+    def deserialize(definition):
+        component = MagicMock()
+        component.deploy.side_effect = lambda update: order.append((definition["slug"], update)) or []
+        return component
+
+    mock_kodexa_client.deserialize.side_effect = deserialize
+    (tmp_path / "assistant.json").write_text(json.dumps(_component("assistant", "a")))
+    (tmp_path / "stores.json").write_text(json.dumps([_component("store", "s1"), _component("store", "s2")]))
+    (tmp_path / "taxonomy.yaml").write_text("type: taxonomy\norgSlug: org\nslug: t\nversion: 1.0.0\n")
+
+    result = cli_runner.invoke(cli, [
+        "deploy", str(tmp_path / "assistant.json"), str(tmp_path / "stores.json"), str(tmp_path / "taxonomy.yaml"),
+        "--update", "--parallel", "2",
+    ])
+
+    assert result.exit_code == 0, result.output
+    assert order[0] == ("t", True)
+    assert sorted(order[1:3]) == [("s1", True), ("s2", True)]
+    assert order[3] == ("a", True)
+
+
+def test_deploy_command_fails_when_a_component_fails(cli_runner, mock_kodexa_client, mock_config_check, tmp_path):
+    mock_kodexa_client.deserialize.return_value.deploy.side_effect = Exception("Rejected")
+    (tmp_path / "store.json").write_text(json.dumps(_component("store", "s")))
+
+    result = cli_runner.invoke(cli, ["deploy", str(tmp_path / "store.json")])
+
+    assert result.exit_code == 1
+    assert "Rejected" in result.output
+
+
+def test_changed_paths_ignores_server_fields_and_unset_fields():
+    deployed = {"id": "1", "createdOn": "today", "name": "S", "description": "Set on the platform",
+                "metadata": {"a": 1, "b": [1, 2]}}
+
+    assert changed_paths(deployed, {"name": "S", "description": None, "metadata": {"a": 1, "b": [1, 2]}}) == []
+    assert changed_paths(deployed, {"id": "2", "name": "S", "metadata": {"a": 1, "b": [1, 3]}}) == [
+        "['metadata']['b'][1]"
+    ]
+    assert changed_paths(deployed, {"name": "T", "labels": ["x"]}) == ["['labels']", "['name']"]
+
+
+def test_format_plan():
+    lines = format_plan([
+        PlannedComponent("org/a:1.0.0", "store", "create"),
+        PlannedComponent("org/b:1.0.0", "taxonomy", "update", ["['name']"]),
+        PlannedComponent("org/c:1.0.0", "store", "unchanged"),
+    ])
+
+    assert lines == [
+        "  [green]+[/green] org/a:1.0.0 (store)",
+        "  [yellow]~[/yellow] org/b:1.0.0 (taxonomy): ['name']",
+        "Plan: 1 to create, 1 to update, 1 unchanged",
+    ]
+
+
+def test_deploy_skip_unchanged_only_sends_changes(cli_runner, tmp_path):
+    files = []
+    for i in range(3):
+        path = tmp_path / f"store-{i}.json"
+        path.write_text(json.dumps(_component("store", f"s{i}", storeType="DOCUMENT", name=f"Store {i}")))
+        files.append(str(path))
+
+    with MockPlatform() as platform:
+        connection = ["--url", platform.url, "--token", "token"]
+        result = cli_runner.invoke(cli, ["deploy", *files[:2], *connection])
+        assert result.exit_code == 0, result.output
+
+        (tmp_path / "store-1.json").write_text(
+            json.dumps(_component("store", "s1", storeType="DOCUMENT", name="Renamed")))
+        result = cli_runner.invoke(cli, ["deploy", *files, *connection, "--plan"])
+        assert result.exit_code == 0, result.output
+        assert "Plan: 1 to create, 1 to update, 1 unchanged" in result.output
+        assert "~ org/s1:1.0.0 (store): ['name']" in result.output
+        assert platform.components["org/s1:1.0.0"]["name"] == "Store 1"
+
+        platform.reset_stats()
+        result = cli_runner.invoke(cli, ["deploy", *files, *connection, "--update", "--skip-unchanged"])
+        assert result.exit_code == 0, result.output
+        assert "Deployed org/s0:1.0.0" not in result.output
+        assert "Deployed org/s1:1.0.0" in result.output
+        assert "Deployed org/s2:1.0.0" in result.output
+        assert platform.components["org/s1:1.0.0"]["name"] == "Renamed"
+        assert "org/s2:1.0.0" in platform.components
@@ -22,3 +22,149 @@ def test_upload_file_with_profile(cli_runner, mock_kodexa_client, mock_kodexa_pl
     assert result.exit_code == 0
     mock_kodexa_client.get_object_by_ref.assert_called_once_with('store', 'store/test')
 
+
+def _mock_store(mock_kodexa_client, families):
+    """Make the mock client return a document store streaming the given families."""
+    from unittest.mock import MagicMock
+    from kodexa.platform.client import DocumentStoreEndpoint
+
+    store = MagicMock(spec=DocumentStoreEndpoint)
+    pages = [families[i:i + 10] for i in range(0, len(families), 10)]
+    store.query.side_effect = lambda query, page, page_size, sort: MagicMock(
+        content=pages[page - 1] if page <= len(pages) else [])
+    mock_kodexa_client.get_object_by_ref.return_value = store
+    return store
+
+@pytest.fixture
+def labelled(monkeypatch):
+    """Record the families labelled over the keep-alive client, failing those in labelled.failing."""
+    from types import SimpleNamespace
+    from kodexa_cli.sessions import KeepAliveClient
+
+    labels = SimpleNamespace(calls=[], failing=set())
+
+    def put(self, path, params=None, body=None):
+        family_id = path.split("/")[-2]
+        if family_id in labels.failing:
+            raise Exception("Not found")
+        labels.calls.append((family_id, path.split("/")[-1], params["label"]))
+
+    monkeypatch.setattr(KeepAliveClient, "put", put)
+    return labels
+
+def _families(count):
+    from unittest.mock import MagicMock
+
+    return [MagicMock(id=str(i), path=f"doc-{i}.pdf", store_ref="org/store:1.0.0") for i in range(count)]
+
+def test_query_stream_reports_failures(cli_runner, mock_kodexa_client, mock_config_check, labelled):
+    """Test failures in a streamed operation are counted and fail the command."""
+    _mock_store(mock_kodexa_client, _families(25))
+    labelled.failing.add("3")
+
+    result = cli_runner.invoke(cli, ['query', 'org/store', '--stream', '--add-label', 'reviewed'])
+    assert result.exit_code == 1
+    assert "Processed 24 document families (1 failed)" in result.output
+    assert sorted(int(family_id) for family_id, _, _ in labelled.calls) == [i for i in range(25) if i != 3]
+
+def test_query_stream_labels(cli_runner, mock_kodexa_client, mock_config_check, labelled):
+    """Test labels are added and removed through the store's family endpoints."""
+    _mock_store(mock_kodexa_client, _families(3))
+
+    result = cli_runner.invoke(cli, ['query', 'org/store', '--stream', '--add-label', 'new', '--remove-label', 'old'])
+    assert result.exit_code == 0
+    assert sorted(labelled.calls) == sorted(
+        [(str(i), "addLabel", "new") for i in range(3)] + [(str(i), "removeLabel", "old") for i in range(3)]
+    )
+    assert "Per second" in result.output
+
+def test_query_stream_checkpoint_resume(cli_runner, mock_kodexa_client, mock_config_check, tmp_path, labelled):
+    """Test a resumed run skips the families completed by the first run."""
+    checkpoint = str(tmp_path / "progress.jsonl")
+    _mock_store(mock_kodexa_client, _families(15))
+    labelled.failing.add("12")
+    cli_runner.invoke(cli, ['query', 'org/store', '--stream', '--add-label', 'a', '--checkpoint', checkpoint])
+
+    labelled.failing.clear()
+    labelled.calls.clear()
+    result = cli_runner.invoke(cli, ['query', 'org/store', '--stream', '--add-label', 'a',
+                                     '--checkpoint', checkpoint, '--resume'])
+    assert result.exit_code == 0
+    assert [family_id for family_id, _, _ in labelled.calls] == ["12"]
+
+def test_query_stream_reprocess_failed_in_batches(cli_runner, mock_kodexa_client, mock_config_check, monkeypatch):
+    """Test failed families are submitted in one batch per failed assistant."""
+    from unittest.mock import MagicMock
+    from kodexa_cli.sessions import KeepAliveClient
+
+    families = _families(6)
+    for i, family in enumerate(families):
+        failed = MagicMock(execution=MagicMock(status="FAILED"), assistant=MagicMock(id=f"assistant-{i % 2}"))
+        family.statistics.recent_executions = [failed] if i < 5 else []
+    _mock_store(mock_kodexa_client, families)
+    batches = []
+    monkeypatch.setattr(KeepAliveClient, "put", lambda self, path, params=None, body=None: batches.append(body))
+
+    result = cli_runner.invoke(cli, ['query', 'org/store', '--stream', '--reprocess', 'failed'])
+    assert result.exit_code == 0
+    assert sorted((b["assistantIds"][0], sorted(b["familyIds"])) for b in batches) == [
+        ("assistant-0", ["0", "2", "4"]), ("assistant-1", ["1", "3"])
+    ]
+    assert "Submitted 5 document families for reprocessing in 2 batches" in result.output
+
+def test_query_stream_downloads_to_output_dir(cli_runner, mock_kodexa_client, mock_config_check, monkeypatch,
+                                              tmp_path):
+    """Test native files and extracted data are streamed into the sharded output directory."""
+    from unittest.mock import MagicMock
+    from kodexa_cli.downloads import output_path
+    from kodexa_cli.sessions import KeepAliveClient
+
+    families = _families(3)
+    for family in families:
+        family.content_objects = [MagicMock(id=f"native-{family.id}", content_type="NATIVE")]
+    _mock_store(mock_kodexa_client, families)
+
+    def get(self, path, params=None, stream=False):
+        return MagicMock(iter_content=lambda chunk_size: [path.encode()])
+
+    monkeypatch.setattr(KeepAliveClient, "get", get)
+    result = cli_runner.invoke(cli, ['query', 'org/store', '--stream', '--download-native',
+                                     '--download-extracted-data', '--output-dir', str(tmp_path)])
+    assert result.exit_code == 0
+    for family in families:
+        native = output_path(family.id, family.path, ".native", str(tmp_path))
+        extracted = output_path(family.id, family.path, "-extracted_data.json", str(tmp_path))
+        assert open(native).read() == f"/api/stores/org/store/1.0.0/families/{family.id}/objects/native-{family.id}/content"
+        assert open(extracted).read() == f"/api/document-families/{family.id}/data"
+
+def test_query_sync_only_fetches_changed_families(cli_runner, mock_kodexa_client, mock_config_check, monkeypatch,
+                                                  tmp_path):
+    """Test a second sync skips the families unchanged since the first."""
+    from datetime import datetime
+    from unittest.mock import MagicMock
+    from kodexa_cli.sessions import KeepAliveClient
+
+    families = _families(4)
+    for family in families:
+        family.modified = datetime(2024, 1, 1)
+        family.change_sequence = 1
+        family.content_objects = [MagicMock(id=f"native-{family.id}", content_type="NATIVE", modified=None, size=1)]
+    _mock_store(mock_kodexa_client, families)
+    fetched = []
+
+    def get(self, path, params=None, stream=False):
+        fetched.append(path)
+        return MagicMock(iter_content=lambda chunk_size: [b"native"])
+
+    monkeypatch.setattr(KeepAliveClient, "get", get)
+    mirror = str(tmp_path / "mirror")
+    result = cli_runner.invoke(cli, ['query', 'org/store', '--stream', '--download-native', '--sync-to', mirror])
+    assert result.exit_code == 0
+    assert len(fetched) == 4
+
+    fetched.clear()
+    families[2].modified = datetime(2024, 1, 2)
+    result = cli_runner.invoke(cli, ['query', 'org/store', '--stream', '--download-native', '--sync-to', mirror])
+    assert result.exit_code == 0
+    assert fetched == ["/api/stores/org/store/1.0.0/families/2/objects/native-2/content"]
+    assert "unchanged" in result.output
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from kodexa_cli.downloads import download_to_file, output_path
+
+
+class StreamingResponse:
+    def __init__(self, chunks, fail_after=None):
+        self.chunks = chunks
+        self.fail_after = fail_after
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for i, chunk in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise ConnectionError("Connection reset")
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+class StreamingClient:
+    def __init__(self, response):
+        self.response = response
+        self.requests = []
+
+    def get(self, path, params=None, stream=False):
+        self.requests.append((path, params, stream))
+        return self.response
+
+
+def test_output_path_defaults_next_to_family_path():
+    assert output_path("1", "folder/doc.pdf", ".native") == "folder/doc.pdf.native"
+
+
+def test_output_path_shards_by_family_id(tmp_path):
+    path = output_path("family-1", "/folder/doc.pdf", ".kddb", str(tmp_path))
+    relative = os.path.relpath(path, tmp_path).split(os.sep)
+    assert len(relative[0]) == 2 and len(relative[1]) == 2
+    assert relative[2:] == ["folder", "doc.pdf.kddb"]
+    assert path == output_path("family-1", "/folder/doc.pdf", ".kddb", str(tmp_path))
+    assert output_path("family-1", "doc.pdf", ".kddb", str(tmp_path), shard_depth=0) == str(tmp_path / "doc.pdf.kddb")
+
+
+def test_download_streams_to_file(tmp_path):
+    response = StreamingResponse([b"abc", b"def"])
+    client = StreamingClient(response)
+    destination = str(tmp_path / "a" / "b" / "doc.native")
+
+    assert download_to_file(client, "/content", destination) == 6
+    assert open(destination, "rb").read() == b"abcdef"
+    assert client.requests == [("/content", None, True)]
+    assert response.closed
+
+
+def test_interrupted_download_leaves_nothing(tmp_path):
+    destination = str(tmp_path / "doc.native")
+    with pytest.raises(ConnectionError):
+        download_to_file(StreamingClient(StreamingResponse([b"abc", b"def"], fail_after=1)), "/content", destination)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,86 @@
+import os
+from unittest.mock import MagicMock
+
+import pytest
+from kodexa_cli import journal as journal_module
+from kodexa_cli.cli import cli
+from kodexa_cli.journal import FileFingerprint, UploadJournal
+
+
+@pytest.fixture
+def upload_journal(tmp_path):
+    """Create an upload journal in a temporary directory."""
+    upload_journal = UploadJournal("https://platform", "org/store:1.0.0", str(tmp_path / "uploads.db"))
+    yield upload_journal
+    upload_journal.close()
+
+
+def test_unchanged_file_is_uploaded(upload_journal, tmp_path):
+    """Test a recorded file matches until it changes."""
+    path = tmp_path / "invoice.pdf"
+    path.write_bytes(b"%PDF-1")
+    assert upload_journal.is_uploaded(FileFingerprint.of(str(path))) is None
+
+    upload_journal.record(FileFingerprint.of(str(path)), "family-1")
+    assert upload_journal.is_uploaded(FileFingerprint.of(str(path))) is not None
+
+
+def test_changed_content_is_detected(upload_journal, tmp_path):
+    """Test a file with the same size and modification time but new content is uploaded again."""
+    path = tmp_path / "invoice.pdf"
+    path.write_bytes(b"%PDF-1")
+    upload_journal.record(FileFingerprint.of(str(path)), "family-1")
+    stat = os.stat(path)
+
+    path.write_bytes(b"%PDF-2")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert upload_journal.is_uploaded(FileFingerprint.of(str(path))) is None
+
+
+def test_known_hashes_are_not_recomputed(upload_journal, tmp_path, monkeypatch):
+    """Test a content hash that is already known is used instead of hashing the file again."""
+    path = tmp_path / "invoice.pdf"
+    path.write_bytes(b"%PDF-1")
+    monkeypatch.setattr(journal_module, "hash_file", MagicMock(side_effect=AssertionError("hashed again")))
+
+    upload_journal.record(FileFingerprint.of(str(path)), "family-1", "abc")
+    assert upload_journal.is_uploaded(FileFingerprint.of(str(path)), "abc") == "abc"
+    assert upload_journal.is_uploaded(FileFingerprint.of(str(path)), "def") is None
+
+
+def test_journal_is_scoped_by_store(upload_journal, tmp_path):
+    """Test an upload to one store doesn't count for another."""
+    path = tmp_path / "invoice.pdf"
+    path.write_bytes(b"%PDF-1")
+    upload_journal.record(FileFingerprint.of(str(path)), "family-1")
+
+    other = UploadJournal("https://platform", "org/other:1.0.0", upload_journal.path)
+    try:
+        assert other.is_uploaded(FileFingerprint.of(str(path))) is None
+    finally:
+        other.close()
+
+
+def test_upload_skips_journaled_files_and_retries(cli_runner, mock_kodexa_client, mock_config_check, tmp_path,
+                                                  monkeypatch):
+    """Test a transient failure is retried and a second run skips the uploaded file."""
+    from kodexa.platform.client import DocumentStoreEndpoint
+
+    monkeypatch.setattr(journal_module, "get_journal_path", lambda: str(tmp_path / "journal" / "uploads.db"))
+    monkeypatch.setattr("kodexa_cli.bulk.time.sleep", lambda seconds: None)
+    path = tmp_path / "invoice.pdf"
+    path.write_bytes(b"%PDF-1")
+
+    store = MagicMock(spec=DocumentStoreEndpoint)
+    store.ref = "org/store:1.0.0"
+    store.upload_file.side_effect = [Exception("Service unavailable"), MagicMock(id="family-1")]
+    mock_kodexa_client.get_object_by_ref.return_value = store
+
+    result = cli_runner.invoke(cli, ['upload', 'org/store', str(path)])
+    assert result.exit_code == 0
+    assert "Successfully uploaded" in result.output
+    assert store.upload_file.call_count == 2
+
+    result = cli_runner.invoke(cli, ['upload', 'org/store', str(path)])
+    assert "already uploaded" in result.output
+    assert store.upload_file.call_count == 2
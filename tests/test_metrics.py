@@ -0,0 +1,80 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from rich.console import Console
+from kodexa_cli.cli import cli
+from kodexa_cli.metrics import UploadMetrics, percentile
+
+
+def test_percentile():
+    """Test nearest rank percentiles."""
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 0.5) == 50.0
+    assert percentile(values, 0.95) == 95.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_track_counts_bytes_and_failures():
+    """Test successful uploads count their bytes and latency, and failed ones don't."""
+    metrics = UploadMetrics()
+    with metrics.track(1024):
+        pass
+    with pytest.raises(Exception):
+        with metrics.track(2048):
+            raise Exception("Service unavailable")
+
+    data = metrics.to_dict()
+    assert (data["succeeded"], data["failed"], data["inFlight"], data["bytes"]) == (1, 1, 0, 1024)
+    assert sum(data["latencyHistogram"].values()) == 1
+    worker = next(iter(data["workers"].values()))
+    assert (worker["files"], worker["bytes"]) == (1, 1024)
+
+
+def test_async_uploads_are_tracked_per_slot():
+    """Test uploads on the async engine are counted against its slots, not the event loop's thread."""
+    import asyncio
+
+    from kodexa_cli.aio import run_async_bulk
+
+    metrics = UploadMetrics()
+
+    async def upload(item):
+        with metrics.track(10):
+            await asyncio.sleep(0.01)
+
+    summary = run_async_bulk("upload", list(range(9)), upload, str, concurrency=3)
+
+    assert summary.succeeded == 9
+    workers = metrics.to_dict()["workers"]
+    assert set(workers) == {"async-1", "async-2", "async-3"}
+    assert sum(worker["files"] for worker in workers.values()) == 9
+
+
+def test_render():
+    """Test the live panel renders."""
+    metrics = UploadMetrics()
+    with metrics.track(1024):
+        pass
+    console = Console(record=True, width=120)
+    console.print(metrics.render())
+    assert "files/s" in console.export_text()
+
+
+def test_upload_writes_metrics_json(cli_runner, mock_kodexa_client, mock_config_check, tmp_path):
+    """Test the metrics are written at the end of an upload."""
+    from kodexa.platform.client import DocumentStoreEndpoint
+
+    for name in ("a.pdf", "b.pdf"):
+        (tmp_path / name).write_bytes(b"%PDF")
+    store = MagicMock(spec=DocumentStoreEndpoint)
+    store.ref = "org/store:1.0.0"
+    mock_kodexa_client.get_object_by_ref.return_value = store
+
+    metrics_path = tmp_path / "metrics.json"
+    result = cli_runner.invoke(cli, ['upload', 'org/store', str(tmp_path / "a.pdf"), str(tmp_path / "b.pdf"),
+                                     '--no-journal', '--metrics-json', str(metrics_path)])
+    assert result.exit_code == 0
+    data = json.loads(metrics_path.read_text())
+    assert (data["succeeded"], data["bytes"]) == (2, 8)
+    assert set(data["latencySeconds"]) == {"p50", "p95", "max"}
@@ -0,0 +1,183 @@
+import json
+import os
+import zipfile
+
+import pytest
+
+from kodexa_cli.cli import cli
+from kodexa_cli.packaging import BUILD_CACHE_NAME, BuildCache, build_fingerprint, implementation_files
+
+MODEL_YAML = """type: store
+storeType: MODEL
+orgSlug: org
+slug: my-model
+name: My Model
+metadata:
+  type: model
+  contents:
+    - model/**/*.py
+    - requirements.txt
+  ignoredContents:
+    - model/scratch.py
+"""
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    (tmp_path / "kodexa.yml").write_text(MODEL_YAML)
+    (tmp_path / "requirements.txt").write_text("kodexa\n")
+    (tmp_path / "model" / "utils").mkdir(parents=True)
+    (tmp_path / "model" / "__init__.py").write_text("")
+    (tmp_path / "model" / "model.py").write_text("def infer(document):\n    return document\n")
+    (tmp_path / "model" / "utils" / "helpers.py").write_text("VALUE = 1\n")
+    (tmp_path / "model" / "scratch.py").write_text("print('not packaged')\n")
+    (tmp_path / "model" / "notes.txt").write_text("not packaged either\n")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _metadata(**overrides):
+    from kodexa.model import ModelContentMetadata
+
+    return ModelContentMetadata.model_validate({
+        "contents": ["model/**/*.py", "requirements.txt"], "ignoredContents": ["model/scratch.py"], **overrides
+    })
+
+
+def test_implementation_files(model_dir):
+    files = implementation_files(_metadata(), str(model_dir))
+
+    assert [name for _, name in files] == [
+        "model/__init__.py", "model/model.py", "model/utils/helpers.py", "requirements.txt"
+    ]
+    assert all(os.path.isfile(path) for path, _ in files)
+
+
+def test_implementation_files_relative_to_base_dir(model_dir):
+    files = implementation_files(_metadata(baseDir="model", contents=["**/*.py"]), str(model_dir))
+
+    assert [name for _, name in files] == ["__init__.py", "model.py", "scratch.py", "utils/helpers.py"]
+
+
+def test_build_fingerprint_tracks_content_not_version(model_dir):
+    files = implementation_files(_metadata(), str(model_dir))
+    definition = {"slug": "my-model", "version": "1.0.0", "metadata": {"contents": ["x"], "stateHash": "a"}}
+
+    fingerprint = build_fingerprint(definition, files)
+    assert build_fingerprint({**definition, "version": "2.0.0", "metadata": {"contents": ["x"]}}, files) == fingerprint
+
+    (model_dir / "model" / "model.py").write_text("def infer(document):\n    return None\n")
+    assert build_fingerprint(definition, files) != fingerprint
+    assert build_fingerprint({**definition, "name": "Renamed"}, files) != fingerprint
+
+
+def test_build_cache_round_trip(tmp_path):
+    artifact = tmp_path / "store-a-1.0.0.zip"
+    artifact.write_bytes(b"zip")
+    cache = BuildCache(str(tmp_path))
+    cache.record("abc", str(artifact))
+    cache.save()
+
+    cache = BuildCache(str(tmp_path))
+    assert cache.lookup("abc") == str(artifact)
+    assert cache.lookup("def") is None
+
+    artifact.write_bytes(b"truncated zip")
+    assert cache.lookup("abc") is None
+
+
+def _package(cli_runner, model_dir, version, *args):
+    result = cli_runner.invoke(cli, [
+        "package", "--path", str(model_dir), "--output", str(model_dir / "dist"), "--version", version, *args
+    ])
+    assert result.exit_code == 0, result.output
+    return result
+
+
+def _state_hash(model_dir, version):
+    with open(model_dir / "dist" / f"store-my-model-{version}.json") as f:
+        return json.load(f)["metadata"]["stateHash"]
+
+
+def test_package_model_reuses_unchanged_implementation(cli_runner, model_dir):
+    _package(cli_runner, model_dir, "1.0.0")
+    zip_path = model_dir / "dist" / "store-my-model-1.0.0.zip"
+    with zipfile.ZipFile(zip_path) as zf:
+        assert sorted(zf.namelist()) == [
+            "model/__init__.py", "model/model.py", "model/utils/helpers.py", "requirements.txt"
+        ]
+    assert (model_dir / "dist" / BUILD_CACHE_NAME).exists()
+    assert not (model_dir / "implementation.zip").exists()
+
+    result = _package(cli_runner, model_dir, "1.0.1")
+    assert "Implementation is unchanged" in result.output
+    assert (model_dir / "dist" / "store-my-model-1.0.1.zip").read_bytes() == zip_path.read_bytes()
+    assert _state_hash(model_dir, "1.0.1") == _state_hash(model_dir, "1.0.0")
+
+    (model_dir / "model" / "model.py").write_text("def infer(document):\n    return None\n")
+    result = _package(cli_runner, model_dir, "1.0.2")
+    assert "Implementation is unchanged" not in result.output
+    assert _state_hash(model_dir, "1.0.2") != _state_hash(model_dir, "1.0.0")
+
+
+def test_package_model_without_cache_rebuilds(cli_runner, model_dir):
+    _package(cli_runner, model_dir, "1.0.0")
+    result = _package(cli_runner, model_dir, "1.0.0", "--no-cache")
+
+    assert "Implementation is unchanged" not in result.output
+
+
+def _write_model(directory, slug, source):
+    (directory / "model").mkdir(parents=True)
+    (directory / "kodexa.yml").write_text(MODEL_YAML.replace("my-model", slug))
+    (directory / "requirements.txt").write_text("kodexa\n")
+    (directory / "model" / "model.py").write_text(source)
+
+
+def test_package_models_in_parallel_from_another_directory(cli_runner, tmp_path, monkeypatch):
+    for i in range(3):
+        _write_model(tmp_path / "models" / f"m{i}", f"model-{i}", f"VALUE = {i}\n")
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+
+    output = tmp_path / "dist"
+    files = [f"models/m{i}/kodexa.yml" for i in range(3)]
+    result = cli_runner.invoke(cli, [
+        "package", "--path", str(tmp_path), "--output", str(output), "--version", "1.0.0", "--jobs", "3", *files
+    ])
+
+    assert result.exit_code == 0, result.output
+    assert os.getcwd() == str(elsewhere)
+    assert not list(elsewhere.iterdir())
+    for i in range(3):
+        with zipfile.ZipFile(output / f"store-model-{i}-1.0.0.zip") as zf:
+            assert zf.read("model/model.py") == f"VALUE = {i}\n".encode()
+        assert f"Model has been prepared store-model-{i}-1.0.0" in result.output
+    # The unversioned definition is the last resource's, as when packaging one at a time
+    assert json.loads((output / "kodexa.json").read_text())["slug"] == "model-2"
+    assert len(json.loads((output / BUILD_CACHE_NAME).read_text())["artifacts"]) == 3
+
+
+def test_package_model_zip_is_reproducible(cli_runner, model_dir):
+    _package(cli_runner, model_dir, "1.0.0", "--no-cache")
+    first = (model_dir / "dist" / "store-my-model-1.0.0.zip").read_bytes()
+    for source in (model_dir / "model").rglob("*"):
+        os.utime(source, (1_700_000_000, 1_700_000_000))
+
+    _package(cli_runner, model_dir, "1.0.0", "--no-cache", "--compress-threads", "2")
+
+    assert (model_dir / "dist" / "store-my-model-1.0.0.zip").read_bytes() == first
+
+
+def test_package_model_compression_options(cli_runner, model_dir):
+    _package(cli_runner, model_dir, "1.0.0", "--store-suffix", ".py")
+    with zipfile.ZipFile(model_dir / "dist" / "store-my-model-1.0.0.zip") as zf:
+        assert zf.getinfo("model/model.py").compress_type == zipfile.ZIP_STORED
+        assert zf.getinfo("requirements.txt").compress_type == zipfile.ZIP_DEFLATED
+
+    # A different compression isn't served from the cache
+    result = _package(cli_runner, model_dir, "1.0.0", "--compression-level", "0")
+    assert "Implementation is unchanged" not in result.output
+    with zipfile.ZipFile(model_dir / "dist" / "store-my-model-1.0.0.zip") as zf:
+        assert zf.getinfo("requirements.txt").compress_type == zipfile.ZIP_STORED
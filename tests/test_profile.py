@@ -1,4 +1,8 @@
+import json
+from unittest.mock import patch
+
 import pytest
+from kodexa_cli import profiles
 from kodexa_cli.cli import cli, profile, get_current_kodexa_profile, get_current_kodexa_url, get_current_access_token
 
 def test_profile_list(cli_runner, mock_kodexa_platform):
@@ -70,4 +74,38 @@ def test_profiles_command_error(cli_runner, mock_kodexa_platform):
     assert result.exit_code == 1
     assert "Profile Error" in result.output
     assert "Could not list profiles" in result.output
-    assert "Test error" in result.output
\ No newline at end of file
+    assert "Test error" in result.output
+
+def test_profile_override_applies_to_url_and_token_defaults(cli_runner, mock_kodexa_platform):
+    """Test --profile is honoured when resolving the --url/--token defaults."""
+    mock_kodexa_platform.get_url.side_effect = lambda p: f'https://{p}.kodexa.ai'
+    mock_kodexa_platform.get_access_token.side_effect = lambda p: f'{p}-token'
+
+    with patch('kodexa_cli.cli.KodexaClient') as mock_client:
+        result = cli_runner.invoke(cli, ['--profile', 'dev', 'logs', 'exec-1'])
+
+    assert result.exit_code == 0
+    mock_client.assert_called_once_with(url='https://dev.kodexa.ai', access_token='dev-token')
+
+
+def test_profile_config_is_read_once(tmp_path, monkeypatch):
+    """Test the profile configuration file is only read once per process."""
+    config_path = tmp_path / ".kodexa.json"
+    config_path.write_text(json.dumps({
+        "_current_profile_": "dev",
+        "dev": {"url": "https://dev.kodexa.ai", "access_token": "dev-token"},
+    }))
+    monkeypatch.setattr(profiles, "get_config_path", lambda: str(config_path))
+    monkeypatch.delenv("KODEXA_URL", raising=False)
+    monkeypatch.delenv("KODEXA_ACCESS_TOKEN", raising=False)
+    profiles.load_profile_config.cache_clear()
+
+    try:
+        assert profiles.ProfileStore.get_current_profile() == "dev"
+        assert profiles.ProfileStore.get_url() == "https://dev.kodexa.ai"
+
+        config_path.unlink()
+        assert profiles.ProfileStore.get_access_token("dev") == "dev-token"
+        assert profiles.ProfileStore.list_profiles() == ["dev"]
+    finally:
+        profiles.load_profile_config.cache_clear()
@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from kodexa_cli.bulk import BulkSummary
+from kodexa_cli.reprocess import ReprocessBatcher, failed_assistant
+
+
+class RecordingClient:
+    """Records the reprocess batches submitted, failing those for assistants in failing."""
+
+    def __init__(self):
+        self.batches = []
+        self.failing = set()
+
+    def put(self, path, params=None, body=None):
+        if body["assistantIds"][0] in self.failing:
+            raise Exception("Service unavailable")
+        self.batches.append((path, body["assistantIds"], body["familyIds"]))
+
+
+def _family(family_id, locked=False, store_ref="org/store:1.0.0"):
+    return SimpleNamespace(id=family_id, locked=locked, store_ref=store_ref)
+
+
+def test_batches_per_assistant():
+    client = RecordingClient()
+    summary = BulkSummary("query")
+    batcher = ReprocessBatcher(client, batch_size=2, summary=summary)
+    for i in range(5):
+        batcher.add(_family(str(i)), "a" if i % 2 == 0 else "b")
+    assert len(client.batches) == 2
+    batcher.flush()
+
+    assert sorted(client.batches) == [
+        ("/api/stores/org/store/1.0.0/reprocess", ["a"], ["0", "2"]),
+        ("/api/stores/org/store/1.0.0/reprocess", ["a"], ["4"]),
+        ("/api/stores/org/store/1.0.0/reprocess", ["b"], ["1", "3"]),
+    ]
+    assert batcher.submitted == 5
+    assert batcher.batches == 3
+    assert summary.operations["reprocess"] == {"succeeded": 5, "failed": 0}
+
+
+def test_skips_locked_families():
+    client = RecordingClient()
+    batcher = ReprocessBatcher(client)
+    assert batcher.add(_family("1", locked=True), "a") is False
+    assert batcher.add(_family("2"), "a") is True
+    batcher.flush()
+    assert client.batches == [("/api/stores/org/store/1.0.0/reprocess", ["a"], ["2"])]
+    assert batcher.skipped_locked == 1
+
+
+def test_failed_batch_is_counted_and_reported():
+    client = RecordingClient()
+    client.failing.add("a")
+    summary = BulkSummary("query")
+    errors = []
+    submitted = []
+    batcher = ReprocessBatcher(client, summary=summary, on_error=lambda a, ids, e: errors.append((a, ids)))
+    batcher.add(_family("1"), "a", on_submitted=lambda: submitted.append("1"))
+    batcher.add(_family("2"), "b", on_submitted=lambda: submitted.append("2"))
+    batcher.flush()
+
+    assert errors == [("a", ["1"])]
+    assert submitted == ["2"]
+    assert summary.operations["reprocess"] == {"succeeded": 1, "failed": 1}
+    assert summary.operations_failed == 1
+
+
+def test_waits_for_inflight_executions(monkeypatch):
+    counts = iter([10, 7, 3])
+    sleeps = []
+    monkeypatch.setattr("kodexa_cli.reprocess.time.sleep", sleeps.append)
+    client = RecordingClient()
+    batcher = ReprocessBatcher(client, max_inflight_executions=5, count_inflight_executions=lambda: next(counts),
+                               poll_interval=1.5)
+    batcher.add(_family("1"), "a")
+    batcher.flush()
+    assert sleeps == [1.5, 1.5]
+    assert len(client.batches) == 1
+
+
+def test_throttle_needs_a_counter():
+    with pytest.raises(ValueError):
+        ReprocessBatcher(RecordingClient(), max_inflight_executions=5)
+
+
+def test_failed_assistant():
+    def execution(status, name):
+        return MagicMock(execution=MagicMock(status=status), assistant=MagicMock(id=name))
+
+    family = MagicMock()
+    family.statistics.recent_executions = [execution("SUCCEEDED", "a"), execution("FAILED", "b"),
+                                           execution("FAILED", "c")]
+    assert failed_assistant(family).id == "b"
+    family.statistics.recent_executions = None
+    assert failed_assistant(family) is None
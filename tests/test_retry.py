@@ -0,0 +1,142 @@
+from email.utils import formatdate
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+import requests
+
+from kodexa_cli import retry
+from kodexa_cli.retry import (RetryableResponseError, RetryPolicy, is_transient_error, parse_retry_after,
+                              raise_for_retry_after)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the backoff delays instead of sleeping."""
+    delays = []
+    monkeypatch.setattr(retry.time, "sleep", delays.append)
+    return delays
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert 8 < parse_retry_after(formatdate(retry.time.time() + 10, usegmt=True)) <= 10
+
+
+def test_throttled_responses_carry_retry_after():
+    with pytest.raises(RetryableResponseError) as error:
+        raise_for_retry_after(429, {"retry-after": "7"}, "slow down")
+    assert error.value.retry_after == 7.0
+    assert "Too Many Requests" in str(error.value)
+    raise_for_retry_after(500, {}, "oops")
+
+
+def test_non_idempotent_requests_only_retry_unprocessed_failures():
+    assert is_transient_error(Exception("Internal server error (oops)"))
+    assert not is_transient_error(Exception("Internal server error (oops)"), idempotent=False)
+    assert is_transient_error(Exception("Service unavailable (later)"), idempotent=False)
+    assert is_transient_error(requests.exceptions.ReadTimeout())
+    assert not is_transient_error(requests.exceptions.ReadTimeout(), idempotent=False)
+    assert is_transient_error(requests.exceptions.ConnectTimeout(), idempotent=False)
+    assert is_transient_error(ConnectionRefusedError(), idempotent=False)
+    assert not is_transient_error(Exception("Not found (missing)"))
+    assert is_transient_error(httpx.ConnectError("refused"), idempotent=False)
+    assert is_transient_error(httpx.ReadTimeout("slow"))
+    assert not is_transient_error(httpx.ReadTimeout("slow"), idempotent=False)
+
+
+def test_errors_are_classified_by_status_code_not_message_text():
+    from kodexa_cli.aio import ResponseError
+
+    assert not is_transient_error(Exception("Conflict (family 14290 already exists)"), idempotent=False)
+    assert not is_transient_error(Exception("Bad request (page 429 is out of range)"))
+    assert is_transient_error(ResponseError("Bad gateway (upstream)", 502))
+    assert not is_transient_error(ResponseError("Bad gateway (upstream)", 502), idempotent=False)
+    assert not is_transient_error(ResponseError("Conflict (Service unavailable was the old name)", 409))
+
+    response = requests.Response()
+    response.status_code = 429
+    assert is_transient_error(requests.exceptions.HTTPError("throttled", response=response), idempotent=False)
+
+
+def test_delay_honors_retry_after_within_max_wait():
+    policy = RetryPolicy(retries=3, backoff=1.0, max_wait=10.0)
+    assert 0 <= policy.delay(2) <= 4.0
+    assert policy.delay(0, RetryableResponseError("Too Many Requests", 429, retry_after=6.0)) >= 6.0
+    assert policy.delay(0, RetryableResponseError("Too Many Requests", 429, retry_after=60.0)) == 10.0
+
+
+def test_call_retries_until_success(sleeps):
+    attempts = []
+    retried = []
+
+    def operation():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RetryableResponseError("Too Many Requests", 429, retry_after=2.0)
+        return "done"
+
+    policy = RetryPolicy(retries=3, max_wait=5.0)
+    assert policy.call(operation, on_retry=lambda e, n, delay: retried.append(n)) == "done"
+    assert retried == [1, 2]
+    assert all(delay >= 2.0 for delay in sleeps)
+
+
+def test_call_gives_up_after_retries(sleeps):
+    operation = MagicMock(side_effect=Exception("Bad gateway"))
+    with pytest.raises(Exception, match="Bad gateway"):
+        RetryPolicy(retries=2).call(operation)
+    assert operation.call_count == 3
+
+
+def test_keep_alive_client_retries_throttled_requests(monkeypatch, sleeps):
+    from kodexa_cli.sessions import KeepAliveClient
+
+    responses = [
+        MagicMock(status_code=429, headers={"retry-after": "1"}, text="slow down"),
+        MagicMock(status_code=200, headers={}, text="{}"),
+    ]
+    client = KeepAliveClient("https://platform", "token", policy=RetryPolicy(retries=2))
+    session = MagicMock()
+    session.request.side_effect = responses
+    monkeypatch.setattr(KeepAliveClient, "session", session)
+
+    assert client.put("/api/thing", params={"label": "a"}).status_code == 200
+    assert session.request.call_count == 2
+    assert sleeps[0] >= 1.0
+
+
+def test_retrying_kodexa_client_does_not_resend_posts_the_platform_may_have_acted_on(monkeypatch, sleeps):
+    from kodexa_cli.platform import RetryingKodexaClient
+
+    request = MagicMock(return_value=MagicMock(status_code=502, headers={}, text="bad gateway"))
+    monkeypatch.setattr(requests, "request", request)
+    client = RetryingKodexaClient(url="https://platform", access_token="token", policy=RetryPolicy(retries=2))
+
+    with pytest.raises(Exception, match="Bad gateway"):
+        client.post("/api/things", body={})
+    assert request.call_count == 1
+
+    request.reset_mock()
+    with pytest.raises(Exception, match="Bad gateway"):
+        client.get("/api/things")
+    assert request.call_count == 3
+
+
+def test_cli_configures_retries_from_options_or_profile(cli_runner, mock_kodexa_platform, monkeypatch):
+    from kodexa_cli.cli import cli
+
+    monkeypatch.setattr(retry, "_policy", retry.get_policy())
+
+    mock_kodexa_platform.get_setting.side_effect = lambda key, profile=None: {"retries": 7}.get(key)
+    cli_runner.invoke(cli, ['version'])
+    assert (retry.get_policy().retries, retry.get_policy().max_wait) == (7, retry.DEFAULT_MAX_WAIT)
+
+    cli_runner.invoke(cli, ['--retries', '1', '--retry-max-wait', '2.5', 'version'])
+    assert (retry.get_policy().retries, retry.get_policy().max_wait) == (1, 2.5)
+    assert retry.get_policy().timeout == retry.DEFAULT_TIMEOUT
+
+    cli_runner.invoke(cli, ['--timeout', '5', 'version'])
+    assert retry.get_policy().timeout == 5
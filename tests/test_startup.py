@@ -0,0 +1,66 @@
+import subprocess
+import sys
+
+# Generous enough for a cold CI runner, but well below the >1s it takes to import the kodexa library
+IMPORT_BUDGET_MICROSECONDS = 500_000
+
+
+def _import_times(code):
+    """Run code in a fresh interpreter with -X importtime and return {module: cumulative microseconds}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_does_not_load_kodexa():
+    """Importing the CLI must not pull in the kodexa library."""
+    times = _import_times("import kodexa_cli.cli")
+    assert "kodexa" not in times
+    assert "kodexa_cli.cli" in times
+
+
+def test_cli_import_time_budget():
+    """Catch start-up regressions, i.e. a heavy module imported at the top of the CLI."""
+    times = _import_times("import kodexa_cli.cli")
+    assert times["kodexa_cli"] < IMPORT_BUDGET_MICROSECONDS
+
+
+def test_help_and_version_do_not_load_kodexa():
+    """Commands that don't talk to the platform should never import the kodexa library."""
+    code = (
+        "import sys\n"
+        "from click.testing import CliRunner\n"
+        "from kodexa_cli.cli import cli\n"
+        "for args in (['--help'], ['version'], ['get', '--help']):\n"
+        "    assert CliRunner().invoke(cli, args).exit_code == 0, args\n"
+        "print('kodexa' in sys.modules)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_entry_point_version_does_not_load_kodexa():
+    """The console script resolves the profile banner without importing the kodexa library."""
+    code = (
+        "import sys\n"
+        "from kodexa_cli.cli import safe_entry_point\n"
+        "sys.argv = ['kodexa', 'version']\n"
+        "try:\n"
+        "    safe_entry_point()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print('kodexa' in sys.modules)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == "False"
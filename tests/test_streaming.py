@@ -0,0 +1,105 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import yaml
+
+from kodexa_cli.cli import delete_objects, stream_document_families, stream_objects
+from kodexa_cli.streaming import StreamingObjectWriter, prefetch_pages
+
+
+def test_prefetch_pages_preserves_order():
+    """Test items come back in page order even when later pages return first."""
+    def fetch_page(page):
+        time.sleep(0.01 * (5 - page) if page < 5 else 0)
+        return [f"{page}-{i}" for i in range(3)] if page <= 4 else []
+
+    items = list(prefetch_pages(fetch_page, prefetch=4))
+    assert items == [f"{page}-{i}" for page in range(1, 5) for i in range(3)]
+
+
+def test_prefetch_pages_bounds_in_flight_requests():
+    """Test no more than the prefetch count of pages are requested ahead of the consumer."""
+    requested = []
+    lock = threading.Lock()
+
+    def fetch_page(page):
+        with lock:
+            requested.append(page)
+        return [page] if page <= 100 else []
+
+    stream = prefetch_pages(fetch_page, prefetch=3)
+    assert next(stream) == 1
+    time.sleep(0.05)
+    assert max(requested) <= 4
+    stream.close()
+
+
+def test_prefetch_pages_stops_on_short_page():
+    """Test a short page is treated as the last page."""
+    pages = {1: [1, 2], 2: [3]}
+    assert list(prefetch_pages(lambda page: pages.get(page, []), prefetch=2, page_size=2)) == [1, 2, 3]
+
+
+def test_stream_document_families_offset_and_limit():
+    """Test the starting offset and limit are applied across pages."""
+    families = list(range(23))
+    calls = []
+
+    def query(query, page, page_size, sort):
+        calls.append((page, sort))
+        return SimpleNamespace(content=families[(page - 1) * page_size:page * page_size])
+
+    store = SimpleNamespace(query=query)
+    result = list(stream_document_families(store, "*", False, None, 5, 2, limit=6, starting_offset=7))
+    assert result == list(range(7, 13))
+    assert calls[0] == (2, "id")
+
+
+def test_streaming_writer_formats(tmp_path):
+    """Test each streaming format can be read back."""
+    objects = [{"id": str(i), "name": f"object {i}"} for i in range(3)]
+    for output_format, load in (
+            ("json", lambda f: json.load(f)),
+            ("jsonl", lambda f: [json.loads(line) for line in f]),
+            ("yaml", lambda f: list(yaml.safe_load_all(f))),
+    ):
+        path = tmp_path / f"objects.{output_format}"
+        with StreamingObjectWriter(str(path), output_format, flush_every=2) as writer:
+            for obj in objects:
+                writer.write(obj)
+        assert writer.count == 3
+        with open(path) as f:
+            assert load(f) == objects
+
+
+def test_streaming_writer_empty_json(tmp_path):
+    """Test an empty stream still produces a valid JSON array."""
+    path = tmp_path / "objects.json"
+    with StreamingObjectWriter(str(path), "json"):
+        pass
+    assert json.loads(path.read_text()) == []
+
+
+def test_streamed_deletes_skip_nothing():
+    """Test deleting a stream removes every object, even though each delete shrinks the pages still to be read."""
+    remaining = list(range(50))
+    lock = threading.Lock()
+
+    class Obj:
+        def __init__(self, id):
+            self.id = id
+
+        def delete(self):
+            with lock:
+                remaining.remove(self.id)
+
+    def list_objects(query, page, page_size, sort):
+        with lock:
+            content = [Obj(id) for id in remaining[(page - 1) * page_size:page * page_size]]
+        return SimpleNamespace(content=content)
+
+    endpoint = SimpleNamespace(list=list_objects)
+    delete_objects(stream_objects(endpoint, "*", False, None, 5, 4), threads=8, max_rps=None)
+    assert remaining == []
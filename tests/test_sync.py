@@ -0,0 +1,61 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from kodexa_cli.sync import SyncManifest, family_version
+
+
+def _family(modified=datetime(2024, 1, 1), content_objects=None):
+    return SimpleNamespace(
+        id="family-1", path="doc.pdf", modified=modified, change_sequence=1,
+        content_objects=content_objects if content_objects is not None else [
+            SimpleNamespace(id="co-1", modified=datetime(2024, 1, 1), size=10)
+        ],
+    )
+
+
+def _saved(tmp_path, name, content=b"content"):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return {"path": str(path), "size": len(content), "sha256": "0" * 64}
+
+
+def test_version_follows_content():
+    assert family_version(_family()) == family_version(_family())
+    assert family_version(_family()) != family_version(_family(modified=datetime(2024, 1, 2)))
+    assert family_version(_family()) != family_version(_family(content_objects=[]))
+
+
+def test_unchanged_family_is_current(tmp_path):
+    manifest = SyncManifest(str(tmp_path / "mirror"))
+    family = _family()
+    assert not manifest.is_current(family, ["download-native"])
+    manifest.record(family, {"download-native": _saved(tmp_path, "doc.pdf.native")})
+
+    assert manifest.is_current(family, ["download-native"])
+    assert not manifest.is_current(_family(modified=datetime(2024, 1, 2)), ["download-native"])
+    assert not manifest.is_current(family, ["download-native", "download"])
+    manifest.close()
+
+
+def test_missing_or_changed_file_is_not_current(tmp_path):
+    manifest = SyncManifest(str(tmp_path))
+    family = _family()
+    saved = _saved(tmp_path, "doc.pdf.native")
+    manifest.record(family, {"download-native": saved})
+
+    (tmp_path / "doc.pdf.native").write_bytes(b"truncated")
+    assert not manifest.is_current(family, ["download-native"])
+    (tmp_path / "doc.pdf.native").unlink()
+    assert not manifest.is_current(family, ["download-native"])
+
+
+def test_record_keeps_other_artifacts_at_the_same_version(tmp_path):
+    manifest = SyncManifest(str(tmp_path))
+    family = _family()
+    manifest.record(family, {"download-native": _saved(tmp_path, "doc.pdf.native")})
+    manifest.record(family, {"download": _saved(tmp_path, "doc.pdf.kddb")})
+    assert manifest.is_current(family, ["download", "download-native"])
+
+    changed = _family(modified=datetime(2024, 1, 2))
+    manifest.record(changed, {"download": _saved(tmp_path, "doc.pdf.kddb")})
+    assert not manifest.is_current(changed, ["download", "download-native"])
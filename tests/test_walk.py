@@ -0,0 +1,52 @@
+import os
+import threading
+
+import pytest
+from kodexa_cli.walk import enqueue_files, iter_files
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Create a small directory tree of documents and external data files."""
+    for name in ("a.pdf", "a.json", "sub/b.pdf", "sub/deeper/c.pdf", "sub/c.txt"):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+    return tmp_path
+
+
+def test_directories_are_walked(tree):
+    """Test a directory expands to every file beneath it."""
+    files = [os.path.relpath(path, tree) for path in iter_files([str(tree)])]
+    assert files == ["a.json", "a.pdf", "sub/b.pdf", "sub/c.txt", "sub/deeper/c.pdf"]
+
+
+def test_recursive_glob_and_json_skipping(tree):
+    """Test ** patterns match in subdirectories and external data files can be left out."""
+    assert sorted(iter_files([f"{tree}/**/*.pdf"])) == sorted(
+        [str(tree / "a.pdf"), str(tree / "sub/b.pdf"), str(tree / "sub/deeper/c.pdf")]
+    )
+    assert str(tree / "a.json") not in iter_files([str(tree)], skip_json=True)
+
+
+def test_plain_paths_pass_through(tree):
+    """Test paths that are neither directories nor patterns are left for the caller to report."""
+    assert list(iter_files(["missing.pdf"])) == ["missing.pdf"]
+
+
+def test_enqueue_runs_ahead_of_the_consumer(tree):
+    """Test the enumeration reports files as found, but no more than the queue size ahead."""
+    found = []
+    ready = threading.Event()
+
+    def on_found(count):
+        found.append(count)
+        if count == 3:
+            ready.set()
+
+    files = enqueue_files([str(tree)], maxsize=2, on_found=on_found)
+    assert next(files) == str(tree / "a.json")
+    assert ready.wait(5)
+    assert max(found) <= 3
+    assert len(list(files)) == 4
+    assert max(found) == 5